@@ -25,7 +25,12 @@ class Settings:
         # Load multiple Gemini API keys from environment variables
         # Format in .env:
         # GEMINI_API_KEYS=key1,key2,key3,...
+        # LLM backend: "gemini", or "fake" for offline benchmarks and load tests
+        # (the fake needs no real keys; placeholders feed the key pool)
+        self.LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
         api_keys_raw = os.getenv("GEMINI_API_KEYS", "")
+        if not api_keys_raw and self.LLM_PROVIDER == "fake":
+            api_keys_raw = "fake-key-1,fake-key-2,fake-key-3"
         if not api_keys_raw:
             raise ValueError(
                 "❌ GEMINI_API_KEYS not found in .env file.\n"
@@ -42,8 +47,88 @@ class Settings:
         self.GEMINI_API_KEY = self.api_keys[self.current_key_index]
 
         # Other settings
-        self.UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
         self.MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB default
+        # Uploads stay in memory up to this size, then spill to an anonymous temp file
+        self.UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", "2097152"))  # 2MB
+        self.EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", str(BASE_DIR / "cache"))
+        # Sentence-embedding backend for the classifier: "torch" (sentence-transformers)
+        # or "onnx" (onnxruntime on a model exported under ONNX_MODEL_DIR, int8 unless ONNX_QUANTIZED=false)
+        self.CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch").lower()
+        self.ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", str(Path(self.EMBEDDING_CACHE_DIR) / "onnx"))
+        self.ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "true").lower() == "true"
+        self.ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = onnxruntime default
+        # Optional shared classifier process (app/services/classifier_server.py); empty socket = in-process.
+        # While the socket is unreachable it is retried after RETRY_SECONDS; FALLBACK=true makes the
+        # worker load its own model meanwhile instead of answering 503 (costs one model copy per worker)
+        self.CLASSIFIER_SIDECAR_SOCKET = os.getenv("CLASSIFIER_SIDECAR_SOCKET", "")
+        self.CLASSIFIER_SIDECAR_FALLBACK = os.getenv("CLASSIFIER_SIDECAR_FALLBACK", "false").lower() == "true"
+        self.CLASSIFIER_SIDECAR_TIMEOUT = float(os.getenv("CLASSIFIER_SIDECAR_TIMEOUT", "30"))
+        self.CLASSIFIER_SIDECAR_RETRY_SECONDS = float(os.getenv("CLASSIFIER_SIDECAR_RETRY_SECONDS", "5"))
+        self.CLASSIFIER_SIDECAR_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_SIDECAR_MAX_WAIT_MS", "5"))
+        self.CLASSIFIER_SIDECAR_MAX_BATCH = int(os.getenv("CLASSIFIER_SIDECAR_MAX_BATCH", "64"))
+        self.CLASSIFIER_SIDECAR_MAX_QUEUE = int(os.getenv("CLASSIFIER_SIDECAR_MAX_QUEUE", "4096"))
+        # Question embedding LRU cache (entry and memory caps)
+        self.EMBEDDING_LRU_MAX_ENTRIES = int(os.getenv("EMBEDDING_LRU_MAX_ENTRIES", "10000"))
+        self.EMBEDDING_LRU_MAX_MB = int(os.getenv("EMBEDDING_LRU_MAX_MB", "32"))
+        # /reclassify-question micro-batching
+        self.RECLASSIFY_MAX_WAIT_MS = float(os.getenv("RECLASSIFY_MAX_WAIT_MS", "5"))
+        self.RECLASSIFY_MAX_BATCH = int(os.getenv("RECLASSIFY_MAX_BATCH", "32"))
+        self.RECLASSIFY_MAX_QUEUE = int(os.getenv("RECLASSIFY_MAX_QUEUE", "256"))
+        # Per-key Gemini quotas (requests/tokens per minute) and error cooldowns
+        self.GEMINI_KEY_RPM = int(os.getenv("GEMINI_KEY_RPM", "10"))
+        self.GEMINI_KEY_TPM = int(os.getenv("GEMINI_KEY_TPM", "250000"))
+        self.GEMINI_QUOTA_COOLDOWN = float(os.getenv("GEMINI_QUOTA_COOLDOWN", "60"))
+        self.GEMINI_AUTH_COOLDOWN = float(os.getenv("GEMINI_AUTH_COOLDOWN", "600"))
+        self.GEMINI_KEY_WAIT_TIMEOUT = float(os.getenv("GEMINI_KEY_WAIT_TIMEOUT", "30"))
+        # Fake LLM provider: seconds before the first token, output tokens/s
+        # (0 = instant), injected 500 and 429 rates, recorded responses to replay
+        self.FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.8"))
+        self.FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "250"))
+        self.FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+        self.FAKE_LLM_QUOTA_ERROR_RATE = float(os.getenv("FAKE_LLM_QUOTA_ERROR_RATE", "0"))
+        self.FAKE_LLM_RESPONSES = os.getenv("FAKE_LLM_RESPONSES", "")
+        self.FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED")) if os.getenv("FAKE_LLM_SEED") else None
+        # Whole-document generation: prompt budget per chunk and max parallel chunks
+        self.GENERATION_CHUNK_TOKENS = int(os.getenv("GENERATION_CHUNK_TOKENS", "1000"))
+        self.GENERATION_MAX_CHUNKS = int(os.getenv("GENERATION_MAX_CHUNKS", "8"))
+        # Per-stage concurrency limits (PDF parsing, Gemini calls, BERT inference)
+        self.PDF_STAGE_CONCURRENCY = int(os.getenv("PDF_STAGE_CONCURRENCY", "2"))
+        self.LLM_STAGE_CONCURRENCY = int(os.getenv("LLM_STAGE_CONCURRENCY", "8"))
+        self.CLASSIFIER_STAGE_CONCURRENCY = int(os.getenv("CLASSIFIER_STAGE_CONCURRENCY", "2"))
+        # Seconds a request waits for the background BERT load before returning 503
+        self.CLASSIFIER_READY_TIMEOUT = float(os.getenv("CLASSIFIER_READY_TIMEOUT", "30"))
+        # Background BERT load attempts before giving up, and the first retry delay (doubles each time)
+        self.CLASSIFIER_LOAD_ATTEMPTS = int(os.getenv("CLASSIFIER_LOAD_ATTEMPTS", "5"))
+        self.CLASSIFIER_LOAD_RETRY_SECONDS = float(os.getenv("CLASSIFIER_LOAD_RETRY_SECONDS", "5"))
+        # Generated-quiz result cache (SQLite, keyed by PDF hash + question counts)
+        self.RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+        self.RESULT_CACHE_PATH = os.getenv(
+            "RESULT_CACHE_PATH", str(Path(self.EMBEDDING_CACHE_DIR) / "quiz_results.sqlite3")
+        )
+        self.RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+        self.RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "604800"))  # 7 days
+        # PDF extraction backends in preference order; later ones are fallbacks
+        # (pypdfium2 and pdfminer are only used when installed)
+        self.PDF_BACKENDS = [
+            b.strip() for b in os.getenv("PDF_BACKENDS", "pypdf2,pypdfium2,pdfminer").split(",") if b.strip()
+        ]
+        # Whole-document PDF extraction in a process pool (workers <= 1 disables it)
+        self.PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))
+        self.PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+        self.PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "10"))
+        # Extracted/cleaned PDF text LRU cache, keyed by PDF hash
+        self.TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "64"))
+        self.TEXT_CACHE_MAX_MB = int(os.getenv("TEXT_CACHE_MAX_MB", "64"))
+        # Background quiz jobs: SQLite-backed queue, worker count, depth limits
+        self.JOB_DB_PATH = os.getenv("JOB_DB_PATH", str(Path(self.EMBEDDING_CACHE_DIR) / "quiz_jobs.sqlite3"))
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+        self.JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+        self.JOB_MAX_QUEUED_PER_USER = int(os.getenv("JOB_MAX_QUEUED_PER_USER", "5"))
+        # Times a job is started before it counts as failed (restarts mid-job requeue it)
+        self.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "86400"))  # 1 day
+        # A running job is requeued if its process stops renewing the lease for this long
+        self.JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
         self.DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
         if self.DEBUG:
@@ -1,17 +1,290 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import os
-import shutil
+import asyncio
+import hashlib
+import io
+import json
+import tempfile
+import time
 from app.config.settings import settings
-from app.utils.pdf_extractor import extract_text_from_pdf
-from app.services.gemini_service import generate_quiz_from_text, format_quiz_for_frontend
-from app.services.bert_classifier import classify_multiple_questions, get_detailed_classification
+from app.services.gemini_service import (
+    generate_quiz_from_text_async, generate_quiz_events, format_quiz_for_frontend,
+    PROMPT_VERSION, PROMPT_TEXT_CHARS
+)
+from app.services.bert_classifier import classify_multiple_questions
+from app.services.classification_batcher import reclassify_batcher, BatcherQueueFull
+from app.services.model_registry import registry
+from app.services.classifier_client import classifier_client, SidecarError, SidecarUnavailable
+from app.services.embedding_cache import embedding_cache
+from app.services.stage_executors import pdf_stage, classifier_stage, stage_stats
+from app.services.key_pool import key_pool
+from app.services.result_cache import result_cache, make_cache_key
+from app.services.text_cache import text_cache, load_document_text
+from app.services.job_queue import job_queue, JobQueueFull, PRIORITIES, TERMINAL_STATES
+from app.services.metrics import metrics, track_request
+from app.utils.pdf_backends import backend_stats
+from app.utils.question_validator import question_validator
+from app.utils.upload_limit import file_too_large
 
 router = APIRouter()
 
-# Ensure uploads directory exists
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+# Seconds between keep-alive events on an idle job stream
+JOB_STREAM_HEARTBEAT = 15
+
+# cache_mode values: "prefer" serves a cached quiz when one exists,
+# "refresh" always regenerates (and updates the cache), "bypass" skips the cache
+CACHE_MODES = ("prefer", "refresh", "bypass")
+
+
+def _spool_upload(upload: UploadFile) -> tuple:
+    """
+    Copy the upload into a private spooled buffer - in memory up to
+    UPLOAD_SPOOL_MAX_MEMORY, then an anonymous temp file - hashing it on the
+    way (blocking - run on the PDF stage). No named file is ever created.
+    Returns (buffer rewound to the start, SHA-256 hex digest).
+    Raises 413 as soon as the copy passes MAX_FILE_SIZE.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MAX_MEMORY)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        block = upload.file.read(1024 * 1024)
+        if not block:
+            break
+        size += len(block)
+        if size > settings.MAX_FILE_SIZE:
+            buffer.close()
+            raise file_too_large(settings.MAX_FILE_SIZE)
+        digest.update(block)
+        buffer.write(block)
+    buffer.seek(0)
+    return buffer, digest.hexdigest()
+
+
+def _check_cache_mode(cache_mode: str):
+    if cache_mode not in CACHE_MODES:
+        raise HTTPException(status_code=400, detail=f"cache_mode must be one of {', '.join(CACHE_MODES)}")
+
+
+async def read_cached_quiz(cache_key: str, cache_mode: str, title: str, request_stats: dict):
+    """Cached quiz for this upload (retitled for this request), or None."""
+    if not settings.RESULT_CACHE_ENABLED or cache_mode != "prefer":
+        return None
+    started = time.perf_counter()
+    quiz = await asyncio.to_thread(result_cache.get, cache_key)
+    request_stats["result_cache"] = {
+        "hit": quiz is not None,
+        "lookup_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if quiz is not None:
+        quiz["title"] = title
+    return quiz
+
+
+async def store_cached_quiz(cache_key: str, cache_mode: str, quiz: dict):
+    if settings.RESULT_CACHE_ENABLED and cache_mode != "bypass":
+        await asyncio.to_thread(result_cache.put, cache_key, quiz)
+
+
+def classifier_not_ready_detail(status: dict, name: str = "BERT classifier") -> str:
+    """503 message for a classifier that isn't ready; only suggests retrying when that can help."""
+    if status["state"] == "failed":
+        if status.get("retry_in_seconds") is not None:
+            return f"{name} failed to load; retrying in {status['retry_in_seconds']:g}s"
+        return f"{name} failed to load and will not be retried: {status.get('error')}"
+    if status["state"] == "unavailable":
+        return f"{name} is unavailable"
+    return f"{name} is still loading, please try again shortly"
+
+
+def classifier_failed(status: dict) -> bool:
+    """A load failure with no retry pending: the service can't classify until restarted."""
+    return status["state"] == "failed" and status.get("retry_in_seconds") is None
+
+
+async def wait_for_classifier():
+    """
+    Wait (bounded) for the background BERT load instead of blocking the process.
+    With a classifier sidecar configured this waits on the sidecar's model;
+    the model is only loaded in this worker if the sidecar can't be reached
+    and CLASSIFIER_SIDECAR_FALLBACK is on.
+    Raises 503 if the model is still loading or failed to load.
+    """
+    if classifier_client.enabled:
+        ready = await asyncio.to_thread(classifier_client.wait_until_ready, settings.CLASSIFIER_READY_TIMEOUT)
+        if ready:
+            return
+        if ready is False:
+            status = await asyncio.to_thread(classifier_client.status) or {"state": "unavailable"}
+            raise HTTPException(
+                status_code=503,
+                detail=classifier_not_ready_detail(status, "BERT classifier sidecar")
+            )
+        if not classifier_client.fallback:
+            raise HTTPException(status_code=503, detail="BERT classifier sidecar is unavailable")
+        # Sidecar unreachable and fallback enabled: classify in-process until it comes back
+        registry.start_background_load()
+
+    ready = await asyncio.to_thread(registry.wait_until_ready, settings.CLASSIFIER_READY_TIMEOUT)
+    if not ready:
+        raise HTTPException(status_code=503, detail=classifier_not_ready_detail(registry.status()))
+
+
+def sidecar_http_error(error: SidecarError) -> HTTPException:
+    """
+    503 for a classification the sidecar couldn't serve. wait_for_classifier
+    only catches an unreachable sidecar before the request starts; it can
+    also go away (or fill its queue) while the request runs.
+    """
+    if isinstance(error, SidecarUnavailable):
+        return HTTPException(status_code=503, detail=str(error))
+    return HTTPException(status_code=503, detail=f"BERT classifier sidecar could not classify: {error}")
+
+
+def classifier_status() -> tuple:
+    """
+    (registry status, mode) of the model this worker classifies with:
+    "sidecar" when a sidecar is configured, "in-process" otherwise or while
+    falling back (blocking). Never starts a model load.
+    """
+    if classifier_client.enabled:
+        status = classifier_client.status()
+        if status is not None:
+            return status, "sidecar"
+        if not classifier_client.fallback:
+            return {"state": "unavailable", "socket": classifier_client.socket_path}, "sidecar"
+    return registry.status(), "in-process"
+
+
+def classification_stats(questions: list) -> dict:
+    """LOTS/HOTS counts and percentages for a list of classified questions."""
+    lots_count = sum(1 for q in questions if q.get('bloom_classification') == 'LOTS')
+    hots_count = sum(1 for q in questions if q.get('bloom_classification') == 'HOTS')
+    total = len(questions)
+    
+    return {
+        'total_questions': total,
+        'lots_count': lots_count,
+        'hots_count': hots_count,
+        'lots_percentage': round((lots_count / total) * 100, 2) if total > 0 else 0,
+        'hots_percentage': round((hots_count / total) * 100, 2) if total > 0 else 0,
+    }
+
+
+async def run_quiz_generation(pdf_source, pdf_sha256: str, filename: str, title: str,
+                              num_multiple_choice: int, num_true_false: int, num_identification: int,
+                              full_document: bool = False, sample_pages: int = 0,
+                              cache_mode: str = "prefer", progress=None,
+                              include_timings: bool = False, pipeline: str = "generate") -> dict:
+    """
+    The /generate-from-pdf pipeline for a buffered upload: result cache, text
+    extraction, Gemini generation and BERT classification. Shared with the
+    background job workers; progress(stage) is awaited at each stage when given.
+    Returns the response fields (quiz, cached, stats, message), plus the
+    per-stage timing breakdown with include_timings.
+    """
+    with track_request(pipeline) as timings:
+        result = await _generate_quiz(
+            pdf_source, pdf_sha256, filename, title,
+            num_multiple_choice, num_true_false, num_identification,
+            full_document, sample_pages, cache_mode, progress
+        )
+    if include_timings:
+        result["timings"] = timings.breakdown()
+    return result
+
+
+async def _generate_quiz(pdf_source, pdf_sha256: str, filename: str, title: str,
+                         num_multiple_choice: int, num_true_false: int, num_identification: int,
+                         full_document: bool, sample_pages: int, cache_mode: str, progress) -> dict:
+    """Body of run_quiz_generation (timed as one request)."""
+    async def report(stage: str):
+        if progress is not None:
+            await progress(stage)
+
+    cache_key = make_cache_key(
+        pdf_sha256, num_multiple_choice, num_true_false, num_identification,
+        PROMPT_VERSION, full_document, sample_pages
+    )
+    request_stats = {}
+    cached_quiz = await read_cached_quiz(cache_key, cache_mode, title, request_stats)
+    if cached_quiz is not None:
+        print(f"♻️ Serving cached quiz for {filename}")
+        return {
+            "quiz": cached_quiz,
+            "cached": True,
+            "stats": request_stats,
+            "message": "Quiz loaded from cache"
+        }
+    
+    # Extract and clean text (cached per PDF, independent of question counts)
+    await report("extracting")
+    print("📖 Extracting text from PDF...")
+    document, request_stats["text_cache"] = await pdf_stage.run(
+        load_document_text, pdf_source, pdf_sha256,
+        max_chars=None if full_document else PROMPT_TEXT_CHARS,
+        sample_pages=sample_pages
+    )
+    
+    if document is None:
+        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+    
+    print(f"✓ Extracted {len(document.text)} characters from {len(document.pages)} pages")
+    
+    await wait_for_classifier()
+    
+    # Generate quiz using Gemini
+    await report("generating")
+    print(f"🤖 Generating quiz (MC: {num_multiple_choice}, TF: {num_true_false}, ID: {num_identification})...")
+    quiz_data = await generate_quiz_from_text_async(
+        document.cleaned_text,
+        num_multiple_choice,
+        num_true_false,
+        num_identification,
+        full_document=full_document,
+        already_cleaned=True
+    )
+    
+    # Format for frontend
+    formatted_quiz = format_quiz_for_frontend(quiz_data, title)
+    
+    # ⭐ NEW: Classify questions using BERT ⭐
+    questions = formatted_quiz.get('questions', [])
+    
+    if questions:
+        # Reuse the classification computed while rebalancing; only
+        # questions without one go through BERT again
+        unclassified = [q for q in questions if 'bloom_classification' not in q]
+        
+        if unclassified:
+            await report("classifying")
+            print(f"🧠 Classifying {len(unclassified)} questions with BERT (LOTS/HOTS)...")
+            classifications = await classifier_stage.run(
+                classify_multiple_questions, [q['question'] for q in unclassified]
+            )
+            
+            # Add classification to each question
+            for question, (classification, confidence) in zip(unclassified, classifications):
+                question['bloom_classification'] = classification
+                question['classification_confidence'] = round(confidence, 4)
+        else:
+            print("🧠 Reusing BERT classification from the generation pipeline")
+        
+        # Calculate statistics
+        stats = classification_stats(questions)
+        formatted_quiz['classification_stats'] = stats
+        
+        print(f"✓ Classification complete: {stats['lots_count']} LOTS, {stats['hots_count']} HOTS")
+    
+    await store_cached_quiz(cache_key, cache_mode, formatted_quiz)
+    
+    return {
+        "quiz": formatted_quiz,
+        "cached": False,
+        "stats": request_stats,
+        "message": "Quiz generated successfully with BERT classification"
+    }
 
 
 @router.post("/generate-from-pdf")
@@ -20,85 +293,46 @@ async def generate_quiz_from_pdf(
     title: str = Form("Generated Quiz"),
     num_multiple_choice: int = Form(5),
     num_true_false: int = Form(5),
-    num_identification: int = Form(5)
+    num_identification: int = Form(5),
+    full_document: bool = Form(False),
+    sample_pages: int = Form(0),
+    cache_mode: str = Form("prefer"),
+    include_timings: bool = Form(False)
 ):
     """
     Generate quiz from uploaded PDF using Gemini AI with BERT LOTS/HOTS classification.
+    Set full_document to draw questions from the whole PDF (chunked, parallel
+    generation) instead of its first 4,000 characters.
+    Otherwise only enough pages to fill the prompt are extracted; set
+    sample_pages to take them from that many pages spread across the PDF.
+    cache_mode: "prefer" (default) reuses a quiz generated earlier from the
+    same PDF and counts, "refresh" forces a new one, "bypass" skips the cache.
+    include_timings adds "timings": milliseconds spent per pipeline stage
+    (extract, clean, llm, parse, validate, classify) and the total.
     """
-    file_path = None
+    pdf_buffer = None
     try:
         # Validate file type
         if not file.filename.endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        _check_cache_mode(cache_mode)
         
         print(f"📄 Processing file: {file.filename}")
         
-        # Save uploaded file
-        file_path = os.path.join(settings.UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Extract text from PDF
-        print("📖 Extracting text from PDF...")
-        extracted_text = extract_text_from_pdf(file_path)
-        
-        if not extracted_text:
-            raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
-        
-        print(f"✓ Extracted {len(extracted_text)} characters")
+        # Buffer the upload in memory/anonymous temp storage
+        pdf_buffer, pdf_sha256 = await pdf_stage.run(_spool_upload, file)
         
-        # Generate quiz using Gemini
-        print(f"🤖 Generating quiz (MC: {num_multiple_choice}, TF: {num_true_false}, ID: {num_identification})...")
-        quiz_data = generate_quiz_from_text(
-            extracted_text,
-            num_multiple_choice,
-            num_true_false,
-            num_identification
+        result = await run_quiz_generation(
+            pdf_buffer, pdf_sha256, file.filename, title,
+            num_multiple_choice, num_true_false, num_identification,
+            full_document, sample_pages, cache_mode, include_timings=include_timings
         )
-        
-        # Format for frontend
-        formatted_quiz = format_quiz_for_frontend(quiz_data, title)
-        
-        # ⭐ NEW: Classify questions using BERT ⭐
-        print("🧠 Classifying questions with BERT (LOTS/HOTS)...")
-        questions = formatted_quiz.get('questions', [])
-        
-        if questions:
-            # Extract question texts
-            question_texts = [q['question'] for q in questions]
-            
-            # Batch classify all questions (efficient)
-            classifications = classify_multiple_questions(question_texts)
-            
-            # Add classification to each question
-            for i, question in enumerate(questions):
-                classification, confidence = classifications[i]
-                question['bloom_classification'] = classification
-                question['classification_confidence'] = round(confidence, 4)
-            
-            # Calculate statistics
-            lots_count = sum(1 for q in questions if q.get('bloom_classification') == 'LOTS')
-            hots_count = sum(1 for q in questions if q.get('bloom_classification') == 'HOTS')
-            total = len(questions)
-            
-            formatted_quiz['classification_stats'] = {
-                'total_questions': total,
-                'lots_count': lots_count,
-                'hots_count': hots_count,
-                'lots_percentage': round((lots_count / total) * 100, 2) if total > 0 else 0,
-                'hots_percentage': round((hots_count / total) * 100, 2) if total > 0 else 0,
-            }
-            
-            print(f"✓ Classification complete: {lots_count} LOTS, {hots_count} HOTS")
-        
-        return JSONResponse(content={
-            "success": True,
-            "quiz": formatted_quiz,
-            "message": "Quiz generated successfully with BERT classification"
-        })
+        return JSONResponse(content={"success": True, **result})
         
     except HTTPException as he:
         raise he
+    except SidecarError as e:
+        raise sidecar_http_error(e)
     except Exception as e:
         print(f"❌ Error generating quiz: {e}")
         import traceback
@@ -112,13 +346,300 @@ async def generate_quiz_from_pdf(
             }
         )
     finally:
-        # Clean up uploaded file
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"🗑️ Cleaned up: {file.filename}")
-            except:
-                pass
+        if pdf_buffer is not None:
+            pdf_buffer.close()
+
+
+def _encode_event(event: dict, sse: bool) -> str:
+    """Serialize one stream event as an NDJSON line or an SSE message."""
+    data = json.dumps(event)
+    if sse:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _quiz_event_stream(pdf_buffer, filename: str, title: str,
+                             num_multiple_choice: int, num_true_false: int,
+                             num_identification: int, sse: bool,
+                             pdf_sha256: str, sample_pages: int,
+                             cache_key: str, cache_mode: str, include_timings: bool = False):
+    """Run the streaming pipeline for a saved upload, emitting encoded events."""
+    events = _quiz_events(
+        pdf_buffer, filename, title, num_multiple_choice, num_true_false,
+        num_identification, pdf_sha256, sample_pages, cache_key, cache_mode
+    )
+    with track_request("stream") as timings:
+        try:
+            async for event in events:
+                if include_timings and event["event"] == "done":
+                    event["timings"] = timings.breakdown()
+                yield _encode_event(event, sse)
+        finally:
+            # Client disconnects stop here; close the pipeline (and its upload) too
+            await events.aclose()
+
+
+async def _quiz_events(pdf_buffer, filename: str, title: str,
+                       num_multiple_choice: int, num_true_false: int, num_identification: int,
+                       pdf_sha256: str, sample_pages: int, cache_key: str, cache_mode: str):
+    """Event dicts of the streaming pipeline (closes pdf_buffer when done)."""
+    try:
+        request_stats = {}
+        cached_quiz = await read_cached_quiz(cache_key, cache_mode, title, request_stats)
+        if cached_quiz is not None:
+            print(f"♻️ Serving cached quiz for {filename}")
+            for question in cached_quiz["questions"]:
+                yield {"event": "question", "question": question}
+            yield {"event": "done", "quiz": cached_quiz, "cached": True, "stats": request_stats}
+            return
+
+        yield {"event": "progress", "stage": "extracting"}
+        document, request_stats["text_cache"] = await pdf_stage.run(
+            load_document_text, pdf_buffer, pdf_sha256,
+            max_chars=PROMPT_TEXT_CHARS, sample_pages=sample_pages
+        )
+        if document is None:
+            yield {"event": "error", "message": "Failed to extract text from PDF"}
+            return
+        yield {
+            "event": "progress",
+            "stage": "extracted",
+            "characters": len(document.text),
+            "pages": len(document.pages),
+            "text_cache": request_stats["text_cache"]
+        }
+
+        await wait_for_classifier()
+
+        async for event in generate_quiz_events(
+            document.cleaned_text, title, num_multiple_choice, num_true_false, num_identification,
+            already_cleaned=True
+        ):
+            if event["event"] == "done":
+                event["quiz"]["classification_stats"] = classification_stats(event["quiz"]["questions"])
+                event["cached"] = False
+                event["stats"] = request_stats
+                await store_cached_quiz(cache_key, cache_mode, event["quiz"])
+            yield event
+
+    except HTTPException as he:
+        yield {"event": "error", "message": he.detail}
+    except SidecarError as e:
+        yield {"event": "error", "message": sidecar_http_error(e).detail}
+    except Exception as e:
+        print(f"❌ Error streaming quiz: {e}")
+        yield {"event": "error", "message": str(e)}
+    finally:
+        pdf_buffer.close()
+
+
+@router.post("/generate-from-pdf/stream")
+async def generate_quiz_from_pdf_stream(
+    file: UploadFile = File(...),
+    title: str = Form("Generated Quiz"),
+    num_multiple_choice: int = Form(5),
+    num_true_false: int = Form(5),
+    num_identification: int = Form(5),
+    stream_format: str = Form("ndjson"),
+    sample_pages: int = Form(0),
+    cache_mode: str = Form("prefer"),
+    include_timings: bool = Form(False)
+):
+    """
+    Streaming variant of /generate-from-pdf.
+    Emits progress events, then each question as soon as it is parsed,
+    validated and classified, then a final "done" event with the full quiz.
+    stream_format: "ndjson" (default) or "sse".
+    sample_pages, cache_mode, include_timings: same as /generate-from-pdf
+    (the timings arrive on the "done" event).
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+    _check_cache_mode(cache_mode)
+    
+    print(f"📄 Streaming quiz for file: {file.filename}")
+    
+    # Take our own copy before streaming starts (the request's form is closed afterwards)
+    pdf_buffer, pdf_sha256 = await pdf_stage.run(_spool_upload, file)
+    cache_key = make_cache_key(
+        pdf_sha256, num_multiple_choice, num_true_false, num_identification, PROMPT_VERSION,
+        sample_pages=sample_pages
+    )
+    
+    sse = stream_format == "sse"
+    return StreamingResponse(
+        _quiz_event_stream(
+            pdf_buffer, file.filename, title,
+            num_multiple_choice, num_true_false, num_identification, sse,
+            pdf_sha256, sample_pages, cache_key, cache_mode, include_timings
+        ),
+        media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
+
+
+def _read_upload(upload: UploadFile) -> tuple:
+    """The whole upload as bytes plus its SHA-256 (blocking - run on the PDF stage)."""
+    buffer, pdf_sha256 = _spool_upload(upload)
+    try:
+        return buffer.read(), pdf_sha256
+    finally:
+        buffer.close()
+
+
+async def _run_quiz_job(params: dict, pdf_bytes: bytes, progress) -> dict:
+    """Job queue handler: the /generate-from-pdf pipeline on a stored upload."""
+    return await run_quiz_generation(io.BytesIO(pdf_bytes), progress=progress, pipeline="job", **params)
+
+
+job_queue.set_handler(_run_quiz_job)
+
+_PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+
+def _job_response(job: dict) -> dict:
+    """Public view of a job (no user id or stored input)."""
+    response = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "priority": _PRIORITY_NAMES.get(job["priority"], job["priority"]),
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == "queued":
+        response["position"] = job.get("position")
+    if job["status"] == "done":
+        response["result"] = job["result"]
+    if job["error"]:
+        response["error"] = job["error"]
+    return response
+
+
+@router.post("/jobs")
+async def submit_quiz_job(
+    request: Request,
+    file: UploadFile = File(...),
+    title: str = Form("Generated Quiz"),
+    num_multiple_choice: int = Form(5),
+    num_true_false: int = Form(5),
+    num_identification: int = Form(5),
+    full_document: bool = Form(False),
+    sample_pages: int = Form(0),
+    cache_mode: str = Form("prefer"),
+    priority: str = Form("normal"),
+    user_id: str = Form(None),
+    include_timings: bool = Form(False)
+):
+    """
+    Queue a quiz generation job and return its id immediately (202).
+    Same fields as /generate-from-pdf, plus priority ("low", "normal",
+    "high") and user_id (per-user queue limit and fair scheduling; defaults
+    to the client address). Poll GET /jobs/{job_id} or stream
+    GET /jobs/{job_id}/stream for status and the result (which carries
+    the timing breakdown when include_timings is set).
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    _check_cache_mode(cache_mode)
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {', '.join(PRIORITIES)}")
+    user_id = user_id or (request.client.host if request.client else "anonymous")
+
+    pdf_bytes, pdf_sha256 = await pdf_stage.run(_read_upload, file)
+    params = {
+        "pdf_sha256": pdf_sha256,
+        "filename": file.filename,
+        "title": title,
+        "num_multiple_choice": num_multiple_choice,
+        "num_true_false": num_true_false,
+        "num_identification": num_identification,
+        "full_document": full_document,
+        "sample_pages": sample_pages,
+        "cache_mode": cache_mode,
+        "include_timings": include_timings,
+    }
+    try:
+        job_id = await job_queue.submit(user_id, PRIORITIES[priority], params, pdf_bytes)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429 if e.per_user else 503, detail=str(e), headers={"Retry-After": "30"})
+
+    print(f"📋 Queued job {job_id} for {file.filename} (priority {priority})")
+    job = await job_queue.get(job_id)
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        **_job_response(job),
+        "status_url": f"/api/quiz/jobs/{job_id}",
+        "stream_url": f"/api/quiz/jobs/{job_id}/stream"
+    })
+
+
+@router.get("/jobs/{job_id}")
+async def get_quiz_job(job_id: str):
+    """Job status; includes the queue position while queued and the result once done."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse(content={"success": True, **_job_response(job)})
+
+
+async def _job_event_stream(job_id: str, sse: bool):
+    """A "status" event whenever the job changes, until it finishes."""
+    last = None
+    last_sent = time.monotonic()
+    while True:
+        job = await job_queue.get(job_id)
+        if job is None:
+            yield _encode_event({"event": "error", "message": "Job not found"}, sse)
+            return
+        snapshot = (job["status"], job["stage"], job.get("position"))
+        if snapshot != last:
+            last = snapshot
+            last_sent = time.monotonic()
+            yield _encode_event({"event": "status", **_job_response(job)}, sse)
+        elif time.monotonic() - last_sent >= JOB_STREAM_HEARTBEAT:
+            last_sent = time.monotonic()
+            yield _encode_event({"event": "heartbeat"}, sse)
+        if job["status"] in TERMINAL_STATES:
+            return
+        await job_queue.wait_for_update(timeout=JOB_STREAM_HEARTBEAT)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_quiz_job(job_id: str, stream_format: str = "ndjson"):
+    """
+    Stream job status changes as NDJSON (default) or SSE ("?stream_format=sse");
+    the last event carries the result or the error.
+    """
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    sse = stream_format == "sse"
+    return StreamingResponse(
+        _job_event_stream(job_id, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_quiz_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return JSONResponse(content={"success": True, "job_id": job_id, "status": "cancelled"})
+
+
+@router.get("/job-stats")
+async def get_job_stats():
+    """Job queue depth, worker usage and outcome counters."""
+    return JSONResponse(content=await asyncio.to_thread(job_queue.stats))
 
 
 @router.post("/reclassify-question")
@@ -129,17 +650,71 @@ async def reclassify_question(data: dict):
     try:
         question_text = data.get('question')
         
-        if not question_text:
+        if not question_text or not question_text.strip():
             raise HTTPException(status_code=400, detail="Question text is required")
         
-        # Get detailed classification
-        result = get_detailed_classification(question_text)
+        await wait_for_classifier()
+        
+        # Get detailed classification (batched with concurrent requests)
+        try:
+            result = await reclassify_batcher.submit(question_text)
+        except BatcherQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
         
         return JSONResponse(content={
             "success": True,
             "classification": result
         })
         
+    except HTTPException as he:
+        raise he
+    except SidecarError as e:
+        raise sidecar_http_error(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "message": str(e)
+            }
+        )
+
+
+@router.post("/validate-questions")
+async def validate_questions(data: dict):
+    """
+    Check an imported question bank for questions that reference document
+    structure (lesson/figure/section numbers etc.). Accepts frontend-format
+    questions; choices may be strings or {"text": ...} objects.
+    """
+    try:
+        questions = data.get('questions')
+        if not isinstance(questions, list):
+            raise HTTPException(status_code=400, detail="'questions' must be a list")
+
+        items = []
+        for question in questions:
+            if not isinstance(question, dict):
+                raise HTTPException(status_code=400, detail="Each question must be an object")
+            choices = [
+                choice.get("text", "") if isinstance(choice, dict) else choice
+                for choice in question.get("choices") or []
+            ]
+            items.append({"question": question.get("question", ""), "choices": choices})
+
+        results = await pdf_stage.run(question_validator.validate_batch, items)
+        rejected = [
+            {"index": index, "question": items[index]["question"], **rejection}
+            for index, rejection in enumerate(results) if rejection
+        ]
+
+        return JSONResponse(content={
+            "success": True,
+            "total": len(items),
+            "valid": len(items) - len(rejected),
+            "rejected": rejected
+        })
+
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -177,9 +752,87 @@ async def get_classification_keywords():
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint: 503 "unhealthy" once the classifier failed for good."""
+    status, mode = await asyncio.to_thread(classifier_status)
+    unhealthy = classifier_failed(status)
+    return JSONResponse(
+        status_code=503 if unhealthy else 200,
+        content={
+            "status": "unhealthy" if unhealthy else "healthy",
+            "service": "quiz-generator",
+            "bert_classifier": status["state"],
+            "classifier_error": status.get("error"),
+            "classifier_mode": mode,
+            "stages": stage_stats(),
+            "gemini_keys": key_pool.stats(),
+            "pdf_backends": backend_stats(settings.PDF_BACKENDS)
+        }
+    )
+
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the BERT classifier is loaded, 503 while loading or failed."""
+    status, mode = await asyncio.to_thread(classifier_status)
+    return JSONResponse(
+        status_code=200 if status["state"] == "ready" else 503,
+        content={
+            "ready": status["state"] == "ready",
+            "classifier_mode": mode,
+            "detail": None if status["state"] == "ready" else classifier_not_ready_detail(status),
+            "bert_classifier": status
+        }
+    )
+
+
+@router.get("/classifier-stats")
+async def classifier_stats():
+    """Embedding cache, reclassify micro-batcher and classifier sidecar counters."""
+    return {
+        "bert_classifier": registry.state,
+        "embedding_cache": embedding_cache.stats(),
+        "reclassify_batcher": reclassify_batcher.stats(),
+        "classifier_sidecar": classifier_client.stats()
+    }
+
+
+@router.get("/cache-stats")
+async def cache_stats():
+    """Generated-quiz result cache and extracted-text cache counters."""
     return {
-        "status": "healthy", 
-        "service": "quiz-generator",
-        "bert_classifier": "enabled"
-    }
\ No newline at end of file
+        "result_cache": await asyncio.to_thread(result_cache.stats),
+        "text_cache": text_cache.stats()
+    }
+
+
+def pipeline_gauges() -> list:
+    """Current queue depths and cache sizes as /metrics gauges (blocking - reads SQLite)."""
+    stages = stage_stats()
+    keys = key_pool.stats()
+    caches = {
+        "text": text_cache.stats(),
+        "result": result_cache.stats(),
+        "embedding": embedding_cache.stats(),
+    }
+    jobs = job_queue.stats()
+    return [
+        ("quiz_stage_in_flight", "Calls running on each stage executor.",
+         [({"stage": name}, stats["in_flight"]) for name, stats in stages.items()]),
+        ("quiz_stage_queued", "Calls waiting for a free worker on each stage executor.",
+         [({"stage": name}, stats["queued"]) for name, stats in stages.items()]),
+        ("quiz_gemini_key_in_flight", "Gemini calls in flight per API key.",
+         [({"key": str(key["index"])}, key["in_flight"]) for key in keys]),
+        ("quiz_gemini_key_cooldown_seconds", "Seconds until each API key leaves cooldown.",
+         [({"key": str(key["index"])}, key["cooldown_seconds"]) for key in keys]),
+        ("quiz_cache_entries", "Entries held by each cache.",
+         [({"cache": name}, stats["entries"]) for name, stats in caches.items()]),
+        ("quiz_cache_bytes", "Bytes held by each cache.",
+         [({"cache": name}, stats["bytes"]) for name, stats in caches.items()]),
+        ("quiz_jobs", "Background jobs by status.",
+         [({"status": status}, count) for status, count in sorted(jobs["jobs"].items())]),
+        ("quiz_reclassify_queue_depth", "Questions waiting in the reclassify batcher.",
+         [({}, reclassify_batcher.stats()["queue_depth"])]),
+    ]
+
+
+metrics.add_collector(pipeline_gauges)
@@ -3,68 +3,124 @@ BERT-based Bloom's Taxonomy Classification Service
 Classifies questions into 6 cognitive levels with LOTS/HOTS grouping
 """
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-import sys
-import os
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.blooms_taxonomy import (
-    get_remembering_keywords, get_understanding_keywords, get_application_keywords,
-    get_analysis_keywords, get_evaluation_keywords, get_creating_keywords,
-    get_lots_keywords, get_hots_keywords, get_difficulty_mapping, get_lots_hots_mapping
-)
+from app.utils.blooms_taxonomy import get_difficulty_mapping, get_lots_hots_mapping
+from app.services.model_registry import registry, normalize_rows
+from app.services.embedding_cache import embedding_cache, normalize_question_text
+from app.services.metrics import timed, classifier_batch_size
+from app.services.classifier_client import classifier_client
 
-# Load BERT model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# The model itself is loaded in the background at startup (see main.py);
+# callers should wait on registry.wait_until_ready() before classifying.
+# With CLASSIFIER_SIDECAR_SOCKET set, the batch functions below classify
+# through the shared sidecar process and only load the model here if it
+# can't be reached.
 
-# Precompute embeddings for all 6 levels
-remembering_embeddings = model.encode(get_remembering_keywords(), convert_to_numpy=True)
-understanding_embeddings = model.encode(get_understanding_keywords(), convert_to_numpy=True)
-application_embeddings = model.encode(get_application_keywords(), convert_to_numpy=True)
-analysis_embeddings = model.encode(get_analysis_keywords(), convert_to_numpy=True)
-evaluation_embeddings = model.encode(get_evaluation_keywords(), convert_to_numpy=True)
-creating_embeddings = model.encode(get_creating_keywords(), convert_to_numpy=True)
 
-# Also keep LOTS/HOTS embeddings for backwards compatibility
-lots_embeddings = model.encode(get_lots_keywords(), convert_to_numpy=True)
-hots_embeddings = model.encode(get_hots_keywords(), convert_to_numpy=True)
+def encode_questions(questions_list):
+    """
+    Embed questions through the shared LRU cache.
+    Only texts not already cached are encoded, in a single batch.
+    Returns: (N x d) array in input order
+    """
+    keys = [normalize_question_text(q) for q in questions_list]
+    embeddings = [embedding_cache.get(key) for key in keys]
 
+    missing = list(dict.fromkeys(key for key, emb in zip(keys, embeddings) if emb is None))
+    if missing:
+        encoded = registry.model.encode(missing, convert_to_numpy=True)
+        fresh = dict(zip(missing, encoded))
+        for key, embedding in fresh.items():
+            embedding_cache.put(key, embedding)
+        embeddings = [fresh[key] if emb is None else emb for key, emb in zip(keys, embeddings)]
 
-def classify_question_detailed(question_text):
+    return np.vstack(embeddings)
+
+
+def _classify_batch(op, questions_list, classify_locally):
     """
-    Classify a question into one of 6 Bloom's levels
-    Returns: (level, difficulty, lots_or_hots, confidence, all_scores)
+    One timed pass of the "classify" stage: through the sidecar when one is
+    configured, else (or when it falls back) with classify_locally, so the
+    stage metrics and per-request timings are the same either way.
+    Returns: one result tuple per question
     """
-    if not question_text or not question_text.strip():
-        return "remembering", "easy", "LOTS", 0.5, {}
-
-    question_embedding = model.encode([question_text], convert_to_numpy=True)[0]
-
-    # Calculate similarity scores for all 6 levels
-    scores = {
-        "remembering": float(np.mean(cosine_similarity([question_embedding], remembering_embeddings))),
-        "understanding": float(np.mean(cosine_similarity([question_embedding], understanding_embeddings))),
-        "application": float(np.mean(cosine_similarity([question_embedding], application_embeddings))),
-        "analysis": float(np.mean(cosine_similarity([question_embedding], analysis_embeddings))),
-        "evaluation": float(np.mean(cosine_similarity([question_embedding], evaluation_embeddings))),
-        "creating": float(np.mean(cosine_similarity([question_embedding], creating_embeddings)))
-    }
+    with timed("classify"):
+        classifier_batch_size.observe(len(questions_list))
+        remote = classifier_client.classify(op, questions_list)
+        if remote is not None:
+            return [tuple(result) for result in remote]
+        return classify_locally(questions_list)
 
-    # Get the level with highest score
-    cognitive_level = max(scores, key=scores.get)
-    confidence = scores[cognitive_level]
-    
-    # Get difficulty and LOTS/HOTS classification
+
+def _level_score_matrix(question_embeddings):
+    """
+    Score a batch of question embeddings against all 6 levels at once.
+    Equivalent to the mean cosine similarity against each level's keywords,
+    computed as one product with the precomputed level centroids.
+    Returns: (N x 6) array ordered like registry.levels
+    """
+    return normalize_rows(question_embeddings) @ registry.level_centroids.T
+
+
+def _lots_hots_score_matrix(question_embeddings):
+    """
+    Mean cosine similarity against the LOTS and HOTS keyword lists.
+    Returns: (N x 2) array of [lots_score, hots_score]
+    """
+    return _level_score_matrix(question_embeddings) @ registry.lots_hots_weights
+
+
+def _classify_detailed_batch(questions_list):
+    """
+    Batched core of the detailed classifiers.
+    Returns: list of (level, difficulty, lots_or_hots, confidence, all_scores)
+    """
+    results = [("remembering", "easy", "LOTS", 0.5, {})] * len(questions_list)
+
+    # Empty questions keep the default classification
+    indices = [i for i, q in enumerate(questions_list) if q and q.strip()]
+    if not indices:
+        return results
+
+    classified = _classify_batch("detailed", [questions_list[i] for i in indices], _classify_detailed_locally)
+    for i, result in zip(indices, classified):
+        results[i] = result
+    return results
+
+
+def _classify_detailed_locally(questions_list):
+    """In-process detailed classification of non-empty questions."""
+    score_matrix = _level_score_matrix(encode_questions(questions_list))
+
+    levels = registry.levels
     difficulty_map = get_difficulty_mapping()
     lots_hots_map = get_lots_hots_mapping()
-    
-    difficulty = difficulty_map[cognitive_level]
-    lots_or_hots = lots_hots_map[cognitive_level]
 
-    return cognitive_level, difficulty, lots_or_hots, confidence, scores
+    results = []
+    for row in score_matrix:
+        scores = {level: float(score) for level, score in zip(levels, row)}
+
+        # Get the level with highest score
+        cognitive_level = levels[int(np.argmax(row))]
+        confidence = scores[cognitive_level]
+
+        results.append((
+            cognitive_level,
+            difficulty_map[cognitive_level],
+            lots_hots_map[cognitive_level],
+            confidence,
+            scores
+        ))
+    return results
+
+
+def classify_question_detailed(question_text):
+    """
+    Classify a question into one of 6 Bloom's levels
+    Returns: (level, difficulty, lots_or_hots, confidence, all_scores)
+    """
+    return _classify_detailed_batch([question_text])[0]
 
 
 def classify_question(question_text):
@@ -75,14 +131,7 @@ def classify_question(question_text):
     if not question_text or not question_text.strip():
         return "LOTS", 0.5
 
-    question_embedding = model.encode([question_text], convert_to_numpy=True)[0]
-
-    lots_score = np.mean(cosine_similarity([question_embedding], lots_embeddings))
-    hots_score = np.mean(cosine_similarity([question_embedding], hots_embeddings))
-
-    if hots_score > lots_score:
-        return "HOTS", float(hots_score)
-    return "LOTS", float(lots_score)
+    return classify_multiple_questions([question_text])[0]
 
 
 def classify_multiple_questions(questions_list):
@@ -93,16 +142,15 @@ def classify_multiple_questions(questions_list):
     if not questions_list:
         return []
 
-    question_embeddings = model.encode(questions_list, convert_to_numpy=True)
+    return _classify_batch("lots_hots", questions_list, _classify_lots_hots_locally)
 
-    lots_sim_matrix = cosine_similarity(question_embeddings, lots_embeddings)
-    hots_sim_matrix = cosine_similarity(question_embeddings, hots_embeddings)
 
-    lots_scores = np.mean(lots_sim_matrix, axis=1)
-    hots_scores = np.mean(hots_sim_matrix, axis=1)
+def _classify_lots_hots_locally(questions_list):
+    """In-process LOTS/HOTS classification."""
+    score_matrix = _lots_hots_score_matrix(encode_questions(questions_list))
 
     results = []
-    for lots_score, hots_score in zip(lots_scores, hots_scores):
+    for lots_score, hots_score in score_matrix:
         if hots_score > lots_score:
             results.append(("HOTS", float(hots_score)))
         else:
@@ -113,14 +161,14 @@ def classify_multiple_questions(questions_list):
 def classify_multiple_questions_detailed(questions_list):
     """
     Classify multiple questions with full Bloom's taxonomy details
+    (one batched encode and one centroid product for the whole list)
     Returns: list of dicts with level, difficulty, classification
     """
     if not questions_list:
         return []
 
     results = []
-    for question in questions_list:
-        level, difficulty, lots_hots, confidence, scores = classify_question_detailed(question)
+    for level, difficulty, lots_hots, confidence, scores in _classify_detailed_batch(questions_list):
         results.append({
             "cognitive_level": level,
             "difficulty": difficulty,
@@ -132,13 +180,8 @@ def classify_multiple_questions_detailed(questions_list):
     return results
 
 
-def get_detailed_classification(question_text):
-    """
-    Returns detailed classification with all scores
-    (Backwards compatible function name)
-    """
-    level, difficulty, lots_hots, confidence, scores = classify_question_detailed(question_text)
-    
+def _detailed_classification_dict(level, difficulty, lots_hots, confidence, scores):
+    """Shape one detailed result the way /reclassify-question returns it."""
     return {
         "classification": lots_hots,
         "cognitive_level": level,
@@ -148,4 +191,23 @@ def get_detailed_classification(question_text):
         "hots_score": np.mean([scores["analysis"], scores["evaluation"], scores["creating"]]),
         "all_bloom_scores": scores,
         "difference": abs(scores[level] - np.mean(list(scores.values())))
-    }
\ No newline at end of file
+    }
+
+
+def get_detailed_classification(question_text):
+    """
+    Returns detailed classification with all scores
+    (Backwards compatible function name)
+    """
+    return _detailed_classification_dict(*classify_question_detailed(question_text))
+
+
+def get_detailed_classifications(questions_list):
+    """
+    Batched get_detailed_classification (one encode for the whole list)
+    Returns: list of dicts in input order
+    """
+    return [
+        _detailed_classification_dict(*result)
+        for result in _classify_detailed_batch(questions_list)
+    ]
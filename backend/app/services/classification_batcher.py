@@ -0,0 +1,128 @@
+"""
+Asyncio micro-batcher for single-question classification.
+Concurrent /reclassify-question calls are collected for a few milliseconds
+(or until the batch is full) and classified with one batched encode.
+"""
+
+import asyncio
+import time
+
+from app.config.settings import settings
+from app.services.bert_classifier import get_detailed_classifications
+from app.services.stage_executors import classifier_stage
+
+
+class BatcherQueueFull(Exception):
+    """Raised when the batcher already holds max_queue pending requests."""
+
+
+class ClassificationBatcher:
+    """
+    Collects requests into batches of up to max_batch items, waiting at most
+    max_wait_ms after the first item, and resolves each caller's future.
+    """
+    def __init__(self, classify_batch, max_wait_ms: float, max_batch: int, max_queue: int):
+        self.classify_batch = classify_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max(1, max_queue)
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+        # Metrics
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.last_batch_size = 0
+        self.total_batch_seconds = 0.0
+
+    def _ensure_worker(self):
+        """Start the worker on the running loop (recreated if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, question_text: str) -> dict:
+        """Queue one question and wait for its detailed classification."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((question_text, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise BatcherQueueFull(f"Classification queue is full ({self.max_queue} pending)")
+        self.requests += 1
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for the first item, then gather more until full or max_wait expires."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - self._loop.time()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that disconnected don't need a result
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                results = await classifier_stage.run(self.classify_batch, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.batches += 1
+                self.items += len(batch)
+                self.last_batch_size = len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self.total_batch_seconds += time.perf_counter() - started
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        """Configuration and counters for the metrics endpoints."""
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch": self.max_batch,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "avg_batch_ms": round(self.total_batch_seconds * 1000 / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# Singleton instance
+reclassify_batcher = ClassificationBatcher(
+    get_detailed_classifications,
+    max_wait_ms=settings.RECLASSIFY_MAX_WAIT_MS,
+    max_batch=settings.RECLASSIFY_MAX_BATCH,
+    max_queue=settings.RECLASSIFY_MAX_QUEUE
+)
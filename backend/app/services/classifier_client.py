@@ -0,0 +1,223 @@
+"""
+Client for the optional classifier sidecar (app/services/classifier_server.py).
+
+With CLASSIFIER_SIDECAR_SOCKET set, the Bloom's classifier functions send
+their questions to one shared sidecar process over a Unix socket instead of
+loading the model in every uvicorn worker. Connecting is retried with
+backoff; if the sidecar still can't be reached it is skipped for
+CLASSIFIER_SIDECAR_RETRY_SECONDS, and classification fails (503) - unless
+CLASSIFIER_SIDECAR_FALLBACK=true, in which case the worker loads its own
+model and classifies in-process meanwhile.
+
+Wire format: each message is a 4-byte big-endian length followed by that
+many bytes of UTF-8 JSON.
+"""
+
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Optional
+
+from app.config.settings import settings
+
+# Refuse frames larger than this (a corrupt length would otherwise allocate it)
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+
+class SidecarError(Exception):
+    """The sidecar answered but could not classify (e.g. its queue is full)."""
+
+
+class SidecarUnavailable(SidecarError):
+    """The sidecar can't be reached and in-process fallback is disabled."""
+
+
+def encode_frame(message: dict) -> bytes:
+    payload = json.dumps(message).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Classifier sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> dict:
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Classifier sidecar frame too large ({size} bytes)")
+    return json.loads(_recv_exactly(sock, size).decode("utf-8"))
+
+
+class ClassifierClient:
+    """
+    Blocking client used from the classifier stage threads. Each thread
+    keeps its own connection, so concurrent requests reach the sidecar in
+    parallel and get batched together there.
+    """
+    def __init__(self, socket_path: str, timeout: float, retry_seconds: float, fallback: bool = False,
+                 connect_attempts: int = 4, chunk_size: int = 64):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.fallback = fallback
+        self.connect_attempts = max(1, connect_attempts)
+        self.chunk_size = max(1, chunk_size)
+        self.enabled = bool(socket_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+        # Metrics
+        self.calls = 0
+        self.fallbacks = 0
+        self.unavailable = 0
+        self.connection_errors = 0
+
+    def disable(self):
+        """Never use the sidecar from this process (the sidecar itself calls this)."""
+        self.enabled = False
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _exchange(self, message: dict) -> dict:
+        """
+        One request/reply. A connection that can't be opened, or a reused one
+        the sidecar has since closed (e.g. it restarted), is retried with
+        backoff; a timeout is not, since the sidecar may still be working on it.
+        """
+        delay = 0.1
+        for attempt in range(self.connect_attempts):
+            reused = getattr(self._local, "sock", None) is not None
+            sent = False
+            try:
+                sock = self._connection()
+                sock.sendall(encode_frame(message))
+                sent = True
+                return read_frame(sock)
+            except socket.timeout:
+                self._drop_connection()
+                raise
+            except (OSError, ConnectionError):
+                self._drop_connection()
+                # A fresh connection that failed after sending is a real error
+                if (sent and not reused) or attempt == self.connect_attempts - 1:
+                    raise
+            if not reused:
+                time.sleep(delay)
+                delay *= 2
+
+    def _request(self, message: dict) -> Optional[dict]:
+        """The sidecar's reply, or None if it is unreachable (and marked down for a while)."""
+        if not self.enabled or time.monotonic() < self._down_until:
+            return None
+        try:
+            return self._exchange(message)
+        except (OSError, ConnectionError, ValueError) as e:
+            with self._lock:
+                self.connection_errors += 1
+                was_up = time.monotonic() >= self._down_until
+                self._down_until = time.monotonic() + self.retry_seconds
+            if was_up:
+                mode = "classifying in-process" if self.fallback else "classification unavailable"
+                print(f"⚠️ Classifier sidecar unavailable ({e}); {mode} for {self.retry_seconds:g}s")
+            return None
+
+    def classify(self, op: str, questions: list) -> Optional[list]:
+        """
+        Results of op ("lots_hots" or "detailed") for questions from the
+        sidecar, sent in chunks of chunk_size so one large request never
+        overflows the sidecar's queue. None when the caller should classify
+        in-process: the client is disabled, or the sidecar is unreachable
+        and fallback is on (otherwise SidecarUnavailable is raised).
+        Raises SidecarError if the sidecar rejected the request.
+        """
+        if not self.enabled:
+            return None
+        results = []
+        for start in range(0, len(questions), self.chunk_size):
+            reply = self._request({"op": op, "questions": questions[start:start + self.chunk_size]})
+            if reply is None:
+                with self._lock:
+                    if not self.fallback:
+                        self.unavailable += 1
+                        raise SidecarUnavailable("BERT classifier sidecar is unavailable")
+                    self.fallbacks += 1
+                return None
+            with self._lock:
+                self.calls += 1
+            if "error" in reply:
+                raise SidecarError(reply["error"])
+            results.extend(reply["results"])
+        return results
+
+    def status(self) -> Optional[dict]:
+        """The sidecar's model registry status, or None if it is unreachable."""
+        reply = self._request({"op": "status"})
+        return None if reply is None else reply.get("status")
+
+    def wait_until_ready(self, timeout: float) -> Optional[bool]:
+        """
+        True once the sidecar's model is ready, False if it is reachable but
+        still loading (or failed) after timeout, None if it is unreachable.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status()
+            if status is None:
+                return None
+            if status["state"] == "ready":
+                return True
+            if status["state"] == "failed" or time.monotonic() >= deadline:
+                return False
+            time.sleep(0.25)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "socket": self.socket_path,
+                "fallback": self.fallback,
+                "available": self.enabled and time.monotonic() >= self._down_until,
+                "calls": self.calls,
+                "fallbacks": self.fallbacks,
+                "unavailable": self.unavailable,
+                "connection_errors": self.connection_errors,
+            }
+
+
+# Singleton instance
+classifier_client = ClassifierClient(
+    settings.CLASSIFIER_SIDECAR_SOCKET,
+    timeout=settings.CLASSIFIER_SIDECAR_TIMEOUT,
+    retry_seconds=settings.CLASSIFIER_SIDECAR_RETRY_SECONDS,
+    fallback=settings.CLASSIFIER_SIDECAR_FALLBACK,
+    chunk_size=settings.CLASSIFIER_SIDECAR_MAX_BATCH
+)
@@ -0,0 +1,119 @@
+"""
+Classifier sidecar: one process owns the BERT model and the embedding
+cache, and every uvicorn worker classifies through it over a Unix socket
+(see classifier_client.py), so N workers don't hold N model copies.
+
+Questions from all connections are micro-batched per operation with the
+same ClassificationBatcher the /reclassify-question route uses.
+
+Run from the backend directory (before or alongside uvicorn):
+    CLASSIFIER_SIDECAR_SOCKET=/tmp/iquiz-classifier.sock python -m app.services.classifier_server
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+
+from app.config.settings import settings
+from app.services.bert_classifier import classify_multiple_questions, _classify_detailed_batch
+from app.services.classification_batcher import ClassificationBatcher, BatcherQueueFull
+from app.services.classifier_client import classifier_client, MAX_FRAME_BYTES, encode_frame, _HEADER
+from app.services.model_registry import registry
+
+# Operations a worker can ask for, by the function that serves one batch
+OPERATIONS = {
+    "lots_hots": classify_multiple_questions,
+    "detailed": _classify_detailed_batch,
+}
+
+
+class ClassifierServer:
+    """Unix socket server answering classify requests from the workers."""
+    def __init__(self, socket_path: str, max_wait_ms: float, max_batch: int, max_queue: int):
+        self.socket_path = socket_path
+        self.batchers = {
+            op: ClassificationBatcher(function, max_wait_ms=max_wait_ms, max_batch=max_batch, max_queue=max_queue)
+            for op, function in OPERATIONS.items()
+        }
+        self.connections = 0
+
+    async def _answer(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "status":
+            return {"status": registry.status()}
+        if op not in self.batchers:
+            return {"error": f"Unknown operation: {op!r}"}
+        batcher = self.batchers[op]
+        try:
+            results = await asyncio.gather(*(batcher.submit(text) for text in message.get("questions", [])))
+        except BatcherQueueFull as e:
+            return {"error": str(e)}
+        except Exception as e:
+            print(f"❌ Sidecar classification failed: {e}")
+            return {"error": f"Classification failed: {e}"}
+        return {"results": results}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one worker connection: request, reply, repeat until it disconnects."""
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                    if size > MAX_FRAME_BYTES:
+                        print(f"⚠️ Dropping sidecar connection: {size}-byte frame")
+                        return
+                    message = json.loads((await reader.readexactly(size)).decode("utf-8"))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                writer.write(encode_frame(await self._answer(message)))
+                await writer.drain()
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self):
+        # A socket file left behind by a previous run would make bind() fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        print(f"🧠 Classifier sidecar listening on {self.socket_path}")
+
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+        try:
+            async with server:
+                await stop
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main() -> int:
+    if not settings.CLASSIFIER_SIDECAR_SOCKET:
+        print("❌ Set CLASSIFIER_SIDECAR_SOCKET to the Unix socket path to listen on")
+        return 1
+    # This process is the sidecar: classify in-process, never through itself
+    classifier_client.disable()
+    registry.verify_single_load()
+    registry.check_requirements()
+    registry.start_background_load()
+
+    server = ClassifierServer(
+        settings.CLASSIFIER_SIDECAR_SOCKET,
+        max_wait_ms=settings.CLASSIFIER_SIDECAR_MAX_WAIT_MS,
+        max_batch=settings.CLASSIFIER_SIDECAR_MAX_BATCH,
+        max_queue=settings.CLASSIFIER_SIDECAR_MAX_QUEUE
+    )
+    asyncio.run(server.serve())
+    print("👋 Classifier sidecar stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
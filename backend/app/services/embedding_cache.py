@@ -0,0 +1,87 @@
+"""
+Bounded LRU cache of question embeddings.
+Maps normalized question text to its BERT embedding so repeated questions
+(rebalancing, route classification, teacher re-edits) skip the encoder.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from app.config.settings import settings
+
+
+def normalize_question_text(text: str) -> str:
+    """Cache key for a question: surrounding and repeated whitespace removed."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU capped by entry count and by total embedding bytes.
+    """
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """Return the cached embedding for a normalized key, or None."""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray):
+        """Store an embedding, evicting least recently used entries past the caps."""
+        if self.max_entries <= 0 or embedding.nbytes > self.max_bytes:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = embedding
+            self._bytes += embedding.nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache in production."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_LRU_MAX_ENTRIES,
+    max_bytes=settings.EMBEDDING_LRU_MAX_MB * 1024 * 1024
+)
@@ -0,0 +1,282 @@
+"""
+Sentence-embedding backends for the Bloom's classifier.
+
+"torch" is sentence-transformers on PyTorch. "onnx" runs the same model
+exported to ONNX (optionally dynamically quantized to int8) with
+onnxruntime and the Rust tokenizer, then applies the model's own pooling
+and normalization, so it returns the same pooled embeddings without
+importing torch at serve time.
+
+Both expose encode(sentences, convert_to_numpy=True) -> (N x d) float32
+array, the only call the registry and classifier make.
+
+The ONNX files are exported once from the sentence-transformers model
+(export_onnx_model, which needs torch); after that the onnx backend only
+needs onnxruntime and tokenizers. Export at build time with:
+    python -m app.services.encoder_backends
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx")
+
+# Files of an exported model directory
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+ENCODER_CONFIG_FILE = "encoder_config.json"
+
+DEFAULT_BATCH_SIZE = 32
+
+# Modules each backend imports at serve time, and what exporting to ONNX needs
+# (import name -> pip package), with the requirements file that provides them
+BACKEND_REQUIREMENTS = {
+    "torch": {"sentence_transformers": "sentence-transformers"},
+    "onnx": {"onnxruntime": "onnxruntime", "tokenizers": "tokenizers"},
+}
+REQUIREMENTS_FILES = {"torch": "requirements.txt", "onnx": "requirements-optional.txt"}
+EXPORT_REQUIREMENTS = {"torch": "torch", "sentence_transformers": "sentence-transformers"}
+QUANTIZE_REQUIREMENTS = {"onnx": "onnx"}
+
+
+def backend_label(backend: str, quantized: bool) -> str:
+    """Short name of a backend configuration ("torch", "onnx", "onnx-int8")."""
+    if backend == "onnx" and quantized:
+        return "onnx-int8"
+    return backend
+
+
+def onnx_model_dir(base_dir: str, model_name: str) -> Path:
+    return Path(base_dir) / model_name.replace("/", "_")
+
+
+def export_onnx_model(model_name: str, output_dir, quantize: bool = True, opset: int = 14) -> Path:
+    """
+    Export a sentence-transformers model's transformer to ONNX, with its
+    tokenizer and pooling/normalization settings (and an int8 copy when
+    quantize is set). Needs torch and sentence-transformers; written to a
+    temporary directory first so concurrent workers never see a partial export.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    pooling = next((module for module in model if type(module).__name__ == "Pooling"), None)
+    pooling_config = pooling.get_config_dict() if pooling is not None else {"pooling_mode_mean_tokens": True}
+    if pooling_config.get("pooling_mode_cls_token"):
+        pooling_mode = "cls"
+    elif pooling_config.get("pooling_mode_max_tokens"):
+        pooling_mode = "max"
+    else:
+        pooling_mode = "mean"
+
+    sample = tokenizer(["Explain how a hash table resolves collisions."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class HiddenStates(torch.nn.Module):
+        """The transformer's last hidden state for positional inputs."""
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs)))[0]
+
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=output_dir.parent, prefix=f".{output_dir.name}-"))
+    try:
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+        with torch.no_grad():
+            torch.onnx.export(
+                HiddenStates(transformer.auto_model.eval()),
+                tuple(sample[name] for name in input_names),
+                str(staging / ONNX_MODEL_FILE),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                do_constant_folding=True
+            )
+        tokenizer.save_pretrained(str(staging))
+
+        config = {
+            "model_name": model_name,
+            "dimension": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "pooling": pooling_mode,
+            "normalize": any(type(module).__name__ == "Normalize" for module in model),
+            "pad_token": tokenizer.pad_token,
+            "pad_token_id": tokenizer.pad_token_id,
+        }
+        (staging / ENCODER_CONFIG_FILE).write_text(json.dumps(config, indent=2))
+
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(
+                str(staging / ONNX_MODEL_FILE), str(staging / ONNX_INT8_MODEL_FILE), weight_type=QuantType.QInt8
+            )
+
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        os.replace(staging, output_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return output_dir
+
+
+class OnnxEncoder:
+    """
+    An exported sentence-transformers model on onnxruntime.
+    Sentences are tokenized in length-sorted batches (less padding, like
+    sentence-transformers), pooled with the model's pooling mode and
+    L2-normalized when the original model normalizes.
+    """
+    def __init__(self, model_dir, quantized: bool = True, threads: int = 0,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        config = json.loads((model_dir / ENCODER_CONFIG_FILE).read_text())
+        self.model_name = config["model_name"]
+        self.dimension = config["dimension"]
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+        self.batch_size = max(1, batch_size)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_token_id"], pad_token=config["pad_token"])
+
+        model_file = model_dir / (ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        if not model_file.exists():
+            raise FileNotFoundError(f"❌ {model_file} not found - export the model with quantize={quantized}")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(hidden.dtype)
+        if self.pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size: int = None, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Pooled embeddings in input order; a single string gives a single vector."""
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        batch_size = batch_size or self.batch_size
+        embeddings = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+
+        order = sorted(range(len(sentences)), key=lambda i: -len(sentences[i]))
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([sentences[i] for i in indices])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask,
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]
+            embeddings[indices] = self._pool(hidden, attention_mask)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings /= norms
+        return embeddings[0] if single else embeddings
+
+
+def _missing_packages(requirements: dict) -> list:
+    return [package for module, package in requirements.items() if importlib.util.find_spec(module) is None]
+
+
+def check_backend_requirements(backend: str, quantized: bool, model_dir: str, model_name: str):
+    """
+    Fail fast (at startup) if backend can't load: its runtime isn't installed,
+    or the ONNX export is missing and couldn't be created here.
+    Raises ValueError for an unknown backend, RuntimeError naming what to install otherwise.
+    """
+    if backend not in BACKEND_REQUIREMENTS:
+        raise ValueError(f"Unknown CLASSIFIER_BACKEND: {backend!r} (expected one of {', '.join(BACKENDS)})")
+    missing = _missing_packages(BACKEND_REQUIREMENTS[backend])
+    if missing:
+        raise RuntimeError(
+            f"❌ CLASSIFIER_BACKEND={backend} needs {', '.join(missing)} "
+            f"(pip install -r {REQUIREMENTS_FILES[backend]})"
+        )
+    if backend == "onnx":
+        path = onnx_model_dir(model_dir, model_name)
+        if not (path / (ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)).exists():
+            needed = dict(EXPORT_REQUIREMENTS, **(QUANTIZE_REQUIREMENTS if quantized else {}))
+            missing = _missing_packages(needed)
+            if missing:
+                raise RuntimeError(
+                    f"❌ No ONNX export of {model_name} in {path}, and exporting it needs {', '.join(missing)}. "
+                    "Export at build time with `python -m app.services.encoder_backends`."
+                )
+
+
+def encoder_factory(backend: str, quantized: bool = True, model_dir: str = None, threads: int = 0):
+    """
+    Import the backend's runtime and return model_name -> encoder.
+    For onnx, a model not yet exported under model_dir is exported first
+    (which needs torch; do it at build time to keep torch out of the server).
+    """
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer
+
+    if backend == "onnx":
+        import onnxruntime  # noqa: F401 - fail here, inside the timed import step
+
+        def load(model_name: str):
+            path = onnx_model_dir(model_dir, model_name)
+            model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+            if not (path / model_file).exists():
+                print(f"🧮 Exporting {model_name} to ONNX in {path}...")
+                started = time.perf_counter()
+                export_onnx_model(model_name, path, quantize=quantized)
+                print(f"💾 ONNX export done ({time.perf_counter() - started:.1f}s)")
+            return OnnxEncoder(path, quantized=quantized, threads=threads)
+
+        return load
+
+    raise ValueError(f"Unknown CLASSIFIER_BACKEND: {backend!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def main() -> int:
+    """Export the configured model to ONNX_MODEL_DIR (fp32 and, unless ONNX_QUANTIZED=false, int8)."""
+    from app.config.settings import settings
+    from app.services.model_registry import MODEL_NAME
+
+    path = onnx_model_dir(settings.ONNX_MODEL_DIR, MODEL_NAME)
+    print(f"🧮 Exporting {MODEL_NAME} to ONNX in {path}...")
+    started = time.perf_counter()
+    export_onnx_model(MODEL_NAME, path, quantize=settings.ONNX_QUANTIZED)
+    print(f"💾 ONNX export done ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
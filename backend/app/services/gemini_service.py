@@ -1,49 +1,79 @@
-import google.generativeai as genai
 from app.config.settings import settings
+import asyncio
 import json
 import re
 import time
-import sys
-import os
+from concurrent.futures import ThreadPoolExecutor
 
-# Import the classifier
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.bert_classifier import classify_multiple_questions
+# Import the classifier (shared model registry - loaded once per process)
+from app.services.bert_classifier import classify_multiple_questions
+from app.services.stage_executors import pdf_stage, llm_stage, classifier_stage
+from app.services.key_pool import KeyPool, key_pool
+from app.services.llm_providers import llm_provider
+from app.services.metrics import (
+    timed, record_stage, gemini_calls, gemini_retries, key_rotations, questions_rejected
+)
+from app.utils.text_chunker import split_into_chunks, select_chunks, allocate_counts
+from app.utils.json_stream import QuizStreamParser
+from app.utils.text_cleaner import default_cleaner
+from app.utils.question_validator import question_validator
 
-def _configure_gemini():
-    """Internal helper to reconfigure Gemini with the current active API key."""
-    genai.configure(api_key=settings.get_current_key())
+MAX_OUTPUT_TOKENS = 8192
 
-# Initial configuration
-_configure_gemini()
+# Characters of cleaned document text that go into a single (head-of-document) prompt
+PROMPT_TEXT_CHARS = 4000
+
+# Bump whenever the prompt or post-processing changes so cached quizzes are regenerated
+PROMPT_VERSION = "2024.1"
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": MAX_OUTPUT_TOKENS,
+}
+
+# Log labels for rejected questions, per question type
+REJECTION_LABELS = {"multiple_choice": "MC", "true_false": "T/F", "identification": "ID"}
+
+# Error message fragments that mean "this key is out of quota" vs "this key is bad"
+QUOTA_ERROR_MARKERS = ("429", "quota", "resource exhausted", "rate limit")
+AUTH_ERROR_MARKERS = ("permission", "unauthorized", "key")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for quota reservations."""
+    return len(text) // 4 + 1
+
+
+def classify_gemini_error(error_message: str) -> str:
+    """Map a Gemini exception message to 'quota', 'auth' or 'other'."""
+    message = error_message.lower()
+    if any(marker in message for marker in QUOTA_ERROR_MARKERS):
+        return "quota"
+    if any(marker in message for marker in AUTH_ERROR_MARKERS):
+        return "auth"
+    return "other"
+
+
+def parse_retry_after(error_message: str):
+    """Extract the server-suggested retry delay (seconds) from a quota error, if any."""
+    match = re.search(r'retry(?:[ _]?(?:in|after|delay))?[^\d]{0,20}(\d+(?:\.\d+)?)', error_message, re.IGNORECASE)
+    return float(match.group(1)) if match else None
 
 
 def clean_pdf_text(text: str) -> str:
     """
     Remove metadata, headings, figure labels from PDF text.
     Keep only the actual content/concepts.
+    The rules live in app/utils/text_cleaner.py (compiled once, merged passes).
     """
-    # Remove common metadata patterns
-    text = re.sub(r'(Lesson|Module|Chapter|Unit)\s+\d+[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'(Figure|Fig\.|Table|Diagram)\s+\d+\.?\d*[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'(Section|Part)\s+\d+\.?\d*[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
-    
-    # Remove page numbers
-    text = re.sub(r'\bPage\s+\d+\b', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'^\d+$', '', text, flags=re.MULTILINE)
-    
-    # Remove common headers/footers
-    text = re.sub(r'(Copyright|©|\(c\)).*?\d{4}', '', text, flags=re.IGNORECASE)
-    
-    # Remove references to document structure in sentences
-    text = re.sub(r'as (shown|discussed|mentioned) in (lesson|module|chapter|figure|section)\s+\d+', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'refer to (lesson|module|chapter|figure|section)\s+\d+', '', text, flags=re.IGNORECASE)
-    
-    # Remove multiple whitespaces/newlines
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    text = re.sub(r' +', ' ', text)
-    
-    return text.strip()
+    return default_cleaner.clean(text)
+
+
+def _clean_timed(text: str) -> str:
+    """clean_pdf_text recorded as the "clean" stage."""
+    with timed("clean"):
+        return clean_pdf_text(text)
 
 
 def validate_question_quality(question: str, choices: list = None) -> tuple:
@@ -51,35 +81,9 @@ def validate_question_quality(question: str, choices: list = None) -> tuple:
     Check if question is about content, not metadata.
     Returns (is_valid, reason)
     """
-    # Metadata keywords to avoid
-    metadata_patterns = [
-        (r'\blesson\s+\d+\b', "References lesson number"),
-        (r'\bmodule\s+\d+\b', "References module number"),
-        (r'\bchapter\s+\d+\b', "References chapter number"),
-        (r'\bfigure\s+\d+', "References figure number"),
-        (r'\bsection\s+\d+', "References section number"),
-        (r'\btable\s+\d+', "References table number"),
-        (r'what.*covered in', "Asks about document structure"),
-        (r'according to (the )?(lesson|module|figure|chapter)', "References document structure"),
-        (r'in (lesson|module|chapter|section)\s+\d+', "References document structure"),
-        (r'(lesson|module|chapter).+discusses?', "Asks what section discusses"),
-    ]
-    
-    question_lower = question.lower()
-    
-    # Check question
-    for pattern, reason in metadata_patterns:
-        if re.search(pattern, question_lower):
-            return False, f"Question: {reason}"
-    
-    # Check choices if provided
-    if choices:
-        for i, choice in enumerate(choices):
-            choice_lower = str(choice).lower()
-            for pattern, reason in metadata_patterns:
-                if re.search(pattern, choice_lower):
-                    return False, f"Choice {i+1}: {reason}"
-    
+    rejection = question_validator.check(question, choices)
+    if rejection:
+        return False, rejection["reason"]
     return True, "Valid"
 
 
@@ -106,40 +110,22 @@ def calculate_blooms_distribution(total_questions: int) -> dict:
     }
 
 
-def generate_quiz_from_text(
-    text: str,
-    num_multiple_choice: int = 5,
-    num_true_false: int = 5,
-    num_identification: int = 5
-) -> dict:
+def build_quiz_prompt(
+    cleaned_text: str,
+    num_multiple_choice: int,
+    num_true_false: int,
+    num_identification: int,
+    distribution: dict
+) -> str:
     """
-    Generates a balanced quiz following Bloom's Taxonomy distribution.
-    60% LOTS (Easy) / 40% HOTS (Average-Difficulty)
+    Build the Gemini prompt for a quiz with the given counts and Bloom's distribution.
     """
-    # ✅ CLEAN THE TEXT FIRST
-    print("🧹 Cleaning PDF text...")
-    cleaned_text = clean_pdf_text(text)
-    print(f"✅ Text cleaned: {len(text)} → {len(cleaned_text)} characters")
-    
     total_questions = num_multiple_choice + num_true_false + num_identification
-    distribution = calculate_blooms_distribution(total_questions)
-    
-    attempt = 0
-    max_attempts = len(settings.api_keys)
-    max_generation_attempts = 3
-
-    for generation_attempt in range(max_generation_attempts):
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                model = genai.GenerativeModel("gemini-2.5-flash")
-
-                prompt = f"""
+    return f"""
 You are an expert college professor creating a comprehensive assessment following Bloom's Taxonomy.
 
 TEXT CONTENT (Focus on concepts and ideas):
-{cleaned_text[:4000]}
+{cleaned_text[:PROMPT_TEXT_CHARS]}
 
 🚨 CRITICAL CONTENT RULES:
 1. Generate questions about CONCEPTS, THEORIES, and IDEAS in the text
@@ -236,116 +222,461 @@ IMPORTANT:
 - ALL questions and choices must be about CONTENT/CONCEPTS only
 """
 
-                generation_config = {
-                    "temperature": 0.7,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                }
 
+def request_quiz_data(prompt: str, pool: KeyPool = None, model_factory=None) -> dict:
+    """
+    Send the prompt to Gemini and parse the returned quiz JSON.
+    Each attempt leases the least-loaded healthy key from the key pool;
+    quota and key errors put that key in cooldown and retry on another.
+    """
+    pool = pool or key_pool
+    model_factory = model_factory or llm_provider.model
+    max_attempts = len(pool) * 3
+    reserved_tokens = estimate_tokens(prompt) + MAX_OUTPUT_TOKENS
+
+    previous_key = None
+    for attempt in range(max_attempts):
+        lease = pool.acquire(reserved_tokens, timeout=settings.GEMINI_KEY_WAIT_TIMEOUT)
+        if previous_key is not None and lease.index != previous_key:
+            key_rotations.inc()
+        previous_key = lease.index
+        try:
+            model = model_factory(lease.key)
+            with timed("llm"):
                 response = model.generate_content(
                     prompt,
-                    generation_config=generation_config
+                    generation_config=GENERATION_CONFIG
                 )
-
                 response_text = response.text.strip()
+        except Exception as e:
+            error_message = str(e)
+            error_kind = classify_gemini_error(error_message)
+            pool.release(lease, error=error_kind, retry_after=parse_retry_after(error_message))
+            gemini_calls.inc(outcome=error_kind)
+            print(f"🚫 Gemini API Error (Attempt {attempt+1}/{max_attempts}, key {lease.index}): {error_message}")
+
+            if error_kind in ("quota", "auth"):
+                gemini_retries.inc(reason=error_kind)
+                print(f"🔄 Key {lease.index} cooling down, retrying with another key...")
+                continue
+            raise Exception(f"Gemini error: {error_message}")
+
+        gemini_calls.inc(outcome="ok")
+        usage = getattr(response, "usage_metadata", None)
+        tokens_used = getattr(usage, "total_token_count", None) or estimate_tokens(prompt + response_text)
+        pool.release(lease, tokens_used=tokens_used)
+        break
+    else:
+        raise Exception("❌ All API keys exhausted.")
+
+    with timed("parse"):
+        return parse_quiz_response(response_text)
+
+
+def parse_quiz_response(response_text: str) -> dict:
+    """Quiz dict from Gemini's reply text (markdown fences and "A." choice prefixes removed)."""
+    # Clean JSON from markdown wrappers
+    response_text = re.sub(r'^```json\s*', '', response_text)
+    response_text = re.sub(r'^```\s*', '', response_text)
+    response_text = re.sub(r'\s*```$', '', response_text)
+    response_text = response_text.strip()
+
+    try:
+        quiz_data = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        print(f"⚠️ JSON Parse Error: {e}")
+        raise Exception("Failed to parse Gemini response.")
+
+    # Clean up choice prefixes
+    for mc in quiz_data.get("multiple_choice", []):
+        _strip_choice_prefixes(mc)
 
-                # Clean JSON from markdown wrappers
-                response_text = re.sub(r'^```json\s*', '', response_text)
-                response_text = re.sub(r'^```\s*', '', response_text)
-                response_text = re.sub(r'\s*```$', '', response_text)
-                response_text = response_text.strip()
-
-                quiz_data = json.loads(response_text)
-
-                # Clean up choice prefixes
-                for mc in quiz_data.get("multiple_choice", []):
-                    cleaned_choices = []
-                    for choice_text in mc["choices"]:
-                        cleaned = re.sub(r'^[A-D]\.\s*', '', choice_text).strip()
-                        cleaned_choices.append(cleaned)
-                    mc["choices"] = cleaned_choices
-
-                # Validate structure
-                if not all(key in quiz_data for key in ["multiple_choice", "true_false", "identification"]):
-                    raise ValueError("Invalid quiz data structure")
-
-                # ✅ VALIDATE QUESTION QUALITY
-                print("🔍 Validating question quality...")
-                quiz_data = validate_and_filter_questions(quiz_data)
-
-                # Verify and rebalance using BERT classifier
-                quiz_data = verify_and_rebalance_questions(quiz_data, distribution)
-
-                # Check distribution
-                actual_dist = count_cognitive_levels(quiz_data)
-                print(f"✅ Quiz generated with distribution:")
-                print(f"   LOTS (60%): Remembering={actual_dist['remembering']}, Understanding={actual_dist['understanding']}, Application={actual_dist['application']}")
-                print(f"   HOTS (40%): Analysis={actual_dist['analysis']}, Evaluation={actual_dist['evaluation']}, Creating={actual_dist['creating']}")
-                
-                return quiz_data
-
-            except json.JSONDecodeError as e:
-                print(f"⚠️ JSON Parse Error: {e}")
-                raise Exception("Failed to parse Gemini response.")
-            except Exception as e:
-                error_message = str(e)
-                print(f"🚫 Gemini API Error (Attempt {attempt+1}/{max_attempts}): {error_message}")
-
-                if any(code in error_message.lower() for code in ["429", "quota", "permission", "key", "unauthorized"]):
-                    print("🔄 Rotating to next API key...")
-                    settings.rotate_key()
-                    _configure_gemini()
-                    attempt += 1
-                    time.sleep(2)
-                    continue
-                else:
-                    raise Exception(f"Gemini error: {error_message}")
+    # Validate structure
+    if not all(key in quiz_data for key in ["multiple_choice", "true_false", "identification"]):
+        raise ValueError("Invalid quiz data structure")
+
+    return quiz_data
+
+
+def _strip_choice_prefixes(mc: dict) -> dict:
+    """Remove "A." style letter prefixes from multiple-choice options."""
+    cleaned_choices = []
+    for choice_text in mc.get("choices", []):
+        cleaned = re.sub(r'^[A-D]\.\s*', '', str(choice_text)).strip()
+        cleaned_choices.append(cleaned)
+    mc["choices"] = cleaned_choices
+    return mc
+
+
+def stream_quiz_items(prompt: str, pool: KeyPool = None, model_factory=None):
+    """
+    Streaming counterpart of request_quiz_data.
+    Yields (question_type, question) pairs as soon as each question object
+    in Gemini's streamed JSON is complete. Quota/key errors before the first
+    question retry on another key; later errors are raised.
+    """
+    pool = pool or key_pool
+    model_factory = model_factory or llm_provider.model
+    max_attempts = len(pool) * 3
+    reserved_tokens = estimate_tokens(prompt) + MAX_OUTPUT_TOKENS
+
+    previous_key = None
+    for attempt in range(max_attempts):
+        lease = pool.acquire(reserved_tokens, timeout=settings.GEMINI_KEY_WAIT_TIMEOUT)
+        if previous_key is not None and lease.index != previous_key:
+            key_rotations.inc()
+        previous_key = lease.index
+        parser = QuizStreamParser()
+        received = []
+        emitted = 0
+        # Time waiting on Gemini vs parsing its chunks
+        started = time.perf_counter()
+        parse_seconds = 0.0
+        try:
+            model = model_factory(lease.key)
+            response = model.generate_content(
+                prompt,
+                generation_config=GENERATION_CONFIG,
+                stream=True
+            )
+            for chunk in response:
+                parse_started = time.perf_counter()
+                received.append(chunk.text)
+                items = parser.feed(chunk.text)
+                for q_type, item in items:
+                    if q_type == "multiple_choice":
+                        _strip_choice_prefixes(item)
+                parse_seconds += time.perf_counter() - parse_started
+                for q_type, item in items:
+                    emitted += 1
+                    yield q_type, item
+        except GeneratorExit:
+            # Consumer stopped early - still hand the key back
+            pool.release(lease, tokens_used=estimate_tokens(prompt + "".join(received)))
+            raise
+        except Exception as e:
+            error_message = str(e)
+            error_kind = classify_gemini_error(error_message)
+            pool.release(lease, error=error_kind, retry_after=parse_retry_after(error_message))
+            gemini_calls.inc(outcome=error_kind)
+            print(f"🚫 Gemini API Error (Attempt {attempt+1}/{max_attempts}, key {lease.index}): {error_message}")
+
+            if emitted == 0 and error_kind in ("quota", "auth"):
+                gemini_retries.inc(reason=error_kind)
+                print(f"🔄 Key {lease.index} cooling down, retrying with another key...")
+                continue
+            raise Exception(f"Gemini error: {error_message}")
+        finally:
+            record_stage("llm", time.perf_counter() - started - parse_seconds)
+            record_stage("parse", parse_seconds)
+
+        gemini_calls.inc(outcome="ok")
+        pool.release(lease, tokens_used=estimate_tokens(prompt + "".join(received)))
+        if emitted == 0:
+            print(f"⚠️ JSON Parse Error: no questions in streamed response")
+            raise Exception("Failed to parse Gemini response.")
+        return
 
     raise Exception("❌ All API keys exhausted.")
 
 
-def validate_and_filter_questions(quiz_data: dict) -> dict:
+def finalize_quiz_data(quiz_data: dict, distribution: dict) -> dict:
     """
-    Filter out questions that reference document structure.
+    Filter low-quality questions and verify cognitive levels with BERT.
     """
-    validated_data = {
-        "multiple_choice": [],
-        "true_false": [],
-        "identification": []
-    }
+    # ✅ VALIDATE QUESTION QUALITY
+    print("🔍 Validating question quality...")
+    quiz_data = validate_and_filter_questions(quiz_data)
+
+    # Verify and rebalance using BERT classifier
+    quiz_data = verify_and_rebalance_questions(quiz_data, distribution)
+
+    # Check distribution
+    actual_dist = count_cognitive_levels(quiz_data)
+    print(f"✅ Quiz generated with distribution:")
+    print(f"   LOTS (60%): Remembering={actual_dist['remembering']}, Understanding={actual_dist['understanding']}, Application={actual_dist['application']}")
+    print(f"   HOTS (40%): Analysis={actual_dist['analysis']}, Evaluation={actual_dist['evaluation']}, Creating={actual_dist['creating']}")
     
-    rejected_count = 0
+    return quiz_data
+
+
+def build_chunk_prompts(
+    cleaned_text: str,
+    num_multiple_choice: int,
+    num_true_false: int,
+    num_identification: int,
+    distribution: dict
+) -> list:
+    """
+    Map step of whole-document generation: split the text into prompt-sized
+    chunks and give each chunk its share of the question-type and Bloom's
+    level counts. Returns one prompt per chunk that has questions to ask.
+    """
+    total_questions = num_multiple_choice + num_true_false + num_identification
+    chunks = split_into_chunks(cleaned_text, settings.GENERATION_CHUNK_TOKENS)
+    count = min(len(chunks), settings.GENERATION_MAX_CHUNKS, total_questions)
+    if count <= 1:
+        return [build_quiz_prompt(
+            cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+        )]
+
+    chunks = select_chunks(chunks, count)
+
+    # Rotate the leftover units so no single chunk collects all of them
+    mc_counts = allocate_counts(num_multiple_choice, count, 0)
+    tf_counts = allocate_counts(num_true_false, count, num_multiple_choice)
+    id_counts = allocate_counts(num_identification, count, num_multiple_choice + num_true_false)
+    level_counts = {}
+    offset = 0
+    for level, level_total in distribution.items():
+        level_counts[level] = allocate_counts(level_total, count, offset)
+        offset += level_total
+
+    prompts = []
+    for i, chunk in enumerate(chunks):
+        if mc_counts[i] + tf_counts[i] + id_counts[i] == 0:
+            continue
+        chunk_distribution = {level: counts[i] for level, counts in level_counts.items()}
+        prompts.append(build_quiz_prompt(
+            chunk, mc_counts[i], tf_counts[i], id_counts[i], chunk_distribution
+        ))
+    return prompts
+
+
+def _question_key(question: dict) -> str:
+    """Dedup key: question text lowercased with punctuation and spacing removed."""
+    return re.sub(r'[^a-z0-9]+', ' ', str(question.get("question", "")).lower()).strip()
+
+
+def merge_quiz_parts(
+    parts: list,
+    num_multiple_choice: int,
+    num_true_false: int,
+    num_identification: int
+) -> dict:
+    """
+    Reduce step of whole-document generation: concatenate the per-chunk
+    quizzes, drop duplicate questions and trim each type to the requested count.
+    """
+    limits = {
+        "multiple_choice": num_multiple_choice,
+        "true_false": num_true_false,
+        "identification": num_identification
+    }
+    merged = {q_type: [] for q_type in limits}
+    seen = set()
+
+    for part in parts:
+        for q_type in limits:
+            for question in part.get(q_type, []):
+                key = _question_key(question)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                merged[q_type].append(question)
+
+    for q_type, limit in limits.items():
+        merged[q_type] = merged[q_type][:limit]
+    return merged
+
+
+def _collect_quiz_parts(results: list) -> list:
+    """Keep successful chunk results; fail only if every chunk failed."""
+    parts = [result for result in results if not isinstance(result, Exception)]
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        print(f"⚠️ {len(failures)}/{len(results)} chunk generations failed: {failures[0]}")
+    if not parts:
+        raise failures[0]
+    return parts
+
+
+def generate_quiz_from_text(
+    text: str,
+    num_multiple_choice: int = 5,
+    num_true_false: int = 5,
+    num_identification: int = 5,
+    full_document: bool = False
+) -> dict:
+    """
+    Generates a balanced quiz following Bloom's Taxonomy distribution.
+    60% LOTS (Easy) / 40% HOTS (Average-Difficulty)
+    With full_document=True the whole text is split into chunks that are
+    sent to Gemini concurrently and merged, instead of only the first 4,000 characters.
+    """
+    # ✅ CLEAN THE TEXT FIRST
+    print("🧹 Cleaning PDF text...")
+    with timed("clean"):
+        cleaned_text = clean_pdf_text(text)
+    print(f"✅ Text cleaned: {len(text)} → {len(cleaned_text)} characters")
     
-    # Validate Multiple Choice
-    for mc in quiz_data.get("multiple_choice", []):
-        is_valid, reason = validate_question_quality(mc["question"], mc["choices"])
-        if is_valid:
-            validated_data["multiple_choice"].append(mc)
-        else:
-            print(f"⚠️ Rejected MC: {mc['question'][:60]}... ({reason})")
-            rejected_count += 1
+    total_questions = num_multiple_choice + num_true_false + num_identification
+    distribution = calculate_blooms_distribution(total_questions)
     
-    # Validate True/False
-    for tf in quiz_data.get("true_false", []):
-        is_valid, reason = validate_question_quality(tf["question"])
-        if is_valid:
-            validated_data["true_false"].append(tf)
-        else:
-            print(f"⚠️ Rejected T/F: {tf['question'][:60]}... ({reason})")
-            rejected_count += 1
+    if not full_document:
+        prompt = build_quiz_prompt(
+            cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+        )
+        quiz_data = request_quiz_data(prompt)
+        return finalize_quiz_data(quiz_data, distribution)
+
+    prompts = build_chunk_prompts(
+        cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+    )
+    print(f"🧩 Generating from {len(prompts)} chunks in parallel...")
+
+    def _request(prompt):
+        try:
+            return request_quiz_data(prompt)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(len(prompts), settings.LLM_STAGE_CONCURRENCY)) as executor:
+        results = list(executor.map(_request, prompts))
+
+    quiz_data = merge_quiz_parts(
+        _collect_quiz_parts(results), num_multiple_choice, num_true_false, num_identification
+    )
+    return finalize_quiz_data(quiz_data, distribution)
+
+
+async def generate_quiz_from_text_async(
+    text: str,
+    num_multiple_choice: int = 5,
+    num_true_false: int = 5,
+    num_identification: int = 5,
+    full_document: bool = False,
+    already_cleaned: bool = False
+) -> dict:
+    """
+    Async variant of generate_quiz_from_text for the routes.
+    Text cleaning, the Gemini calls and BERT verification each run on their
+    own bounded executor, so the event loop keeps serving other requests.
+    Pass already_cleaned=True when text came out of clean_pdf_text (e.g. the text cache).
+    """
+    if already_cleaned:
+        cleaned_text = text
+    else:
+        print("🧹 Cleaning PDF text...")
+        cleaned_text = await pdf_stage.run(_clean_timed, text)
+        print(f"✅ Text cleaned: {len(text)} → {len(cleaned_text)} characters")
     
-    # Validate Identification
-    for id_q in quiz_data.get("identification", []):
-        is_valid, reason = validate_question_quality(id_q["question"])
-        if is_valid:
-            validated_data["identification"].append(id_q)
-        else:
-            print(f"⚠️ Rejected ID: {id_q['question'][:60]}... ({reason})")
-            rejected_count += 1
+    total_questions = num_multiple_choice + num_true_false + num_identification
+    distribution = calculate_blooms_distribution(total_questions)
     
-    if rejected_count > 0:
-        print(f"⚠️ Total rejected: {rejected_count} low-quality questions")
+    if not full_document:
+        prompt = build_quiz_prompt(
+            cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+        )
+        quiz_data = await llm_stage.run(request_quiz_data, prompt)
+        return await classifier_stage.run(finalize_quiz_data, quiz_data, distribution)
+
+    prompts = build_chunk_prompts(
+        cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+    )
+    print(f"🧩 Generating from {len(prompts)} chunks in parallel...")
+    results = await asyncio.gather(
+        *(llm_stage.run(request_quiz_data, prompt) for prompt in prompts),
+        return_exceptions=True
+    )
+
+    quiz_data = merge_quiz_parts(
+        _collect_quiz_parts(results), num_multiple_choice, num_true_false, num_identification
+    )
+    return await classifier_stage.run(finalize_quiz_data, quiz_data, distribution)
+
+
+async def generate_quiz_events(
+    text: str,
+    title: str,
+    num_multiple_choice: int = 5,
+    num_true_false: int = 5,
+    num_identification: int = 5,
+    already_cleaned: bool = False
+):
+    """
+    Streaming quiz generation for the /generate-from-pdf/stream route.
+    Yields event dicts: "progress" for each stage, "question" as soon as a
+    question is parsed, validated and BERT-classified, "rejected" for
+    filtered questions, and a final "done" with the assembled quiz.
+    """
+    if already_cleaned:
+        cleaned_text = text
+    else:
+        yield {"event": "progress", "stage": "cleaning"}
+        cleaned_text = await pdf_stage.run(_clean_timed, text)
+        print(f"✅ Text cleaned: {len(text)} → {len(cleaned_text)} characters")
+
+    total_questions = num_multiple_choice + num_true_false + num_identification
+    distribution = calculate_blooms_distribution(total_questions)
+    prompt = build_quiz_prompt(
+        cleaned_text, num_multiple_choice, num_true_false, num_identification, distribution
+    )
+
+    yield {"event": "progress", "stage": "generating"}
+    limits = {
+        "multiple_choice": num_multiple_choice,
+        "true_false": num_true_false,
+        "identification": num_identification
+    }
+    counts = {q_type: 0 for q_type in limits}
+    questions = []
+    seen = set()
+    rejected = 0
+
+    async for q_type, item in llm_stage.stream(stream_quiz_items, prompt):
+        if counts[q_type] >= limits[q_type]:
+            continue
+        key = _question_key(item)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        choices = item.get("choices") if q_type == "multiple_choice" else None
+        with timed("validate"):
+            rejection = question_validator.check(item["question"], choices)
+        if rejection:
+            rejected += 1
+            questions_rejected.inc(type=q_type, rule=rejection["rule"])
+            print(f"⚠️ Rejected {q_type}: {item['question'][:60]}... ({rejection['reason']})")
+            yield {"event": "rejected", "type": q_type, **rejection}
+            continue
+
+        [(classification, confidence)] = await classifier_stage.run(
+            classify_multiple_questions, [item["question"]]
+        )
+        apply_bert_classification(item, classification, confidence)
+
+        formatted = format_question_for_frontend(q_type, item)
+        questions.append(formatted)
+        counts[q_type] += 1
+        yield {"event": "question", "index": len(questions) - 1, "question": formatted}
+
+    yield {
+        "event": "done",
+        "rejected": rejected,
+        "quiz": {
+            "title": title,
+            "questions": questions,
+            "total_points": sum(q["points"] for q in questions)
+        }
+    }
+
+
+def validate_and_filter_questions(quiz_data: dict) -> dict:
+    """
+    Filter out questions that reference document structure.
+    """
+    with timed("validate"):
+        validated_data, rejections = question_validator.filter_quiz(quiz_data)
+
+    for rejection in rejections:
+        questions_rejected.inc(type=rejection["type"], rule=rejection["rule"])
+        label = REJECTION_LABELS[rejection["type"]]
+        print(f"⚠️ Rejected {label}: {rejection['question'][:60]}... ({rejection['reason']})")
+
+    if rejections:
+        print(f"⚠️ Total rejected: {len(rejections)} low-quality questions")
     
     return validated_data
 
@@ -384,8 +715,7 @@ def verify_and_rebalance_questions(quiz_data: dict, target_distribution: dict) -
             all_questions.append(q["question"])
             question_metadata.append({
                 "type": q_type, 
-                "index": idx,
-                "declared_level": q.get("cognitive_level", "remembering")
+                "index": idx
             })
     
     # Classify all questions using BERT
@@ -394,87 +724,117 @@ def verify_and_rebalance_questions(quiz_data: dict, target_distribution: dict) -
     # Update cognitive levels based on BERT + declared level
     for i, (classification, confidence) in enumerate(classifications):
         meta = question_metadata[i]
-        q_type = meta["type"]
-        q_idx = meta["index"]
-        declared_level = meta["declared_level"].lower()
-        
-        # Map BERT classification to Bloom's level
-        if classification == "LOTS":
-            # Keep declared level if it's LOTS, otherwise adjust
-            if declared_level in ["remembering", "understanding", "application"]:
-                adjusted_level = declared_level
-            else:
-                adjusted_level = "application"  # Default LOTS
-        else:  # HOTS
-            # Keep declared level if it's HOTS, otherwise adjust
-            if declared_level in ["analysis", "evaluation", "creating"]:
-                adjusted_level = declared_level
-            else:
-                adjusted_level = "analysis"  # Default HOTS
-        
-        # Update the question
-        quiz_data[q_type][q_idx]["cognitive_level"] = adjusted_level
-        
-        # Update difficulty based on level
-        if adjusted_level in ["remembering", "understanding", "application"]:
-            quiz_data[q_type][q_idx]["difficulty"] = "easy"
-        elif adjusted_level in ["analysis", "evaluation"]:
-            quiz_data[q_type][q_idx]["difficulty"] = "average"
-        else:  # creating
-            quiz_data[q_type][q_idx]["difficulty"] = "difficult"
+        apply_bert_classification(quiz_data[meta["type"]][meta["index"]], classification, confidence)
     
     return quiz_data
 
 
-def format_quiz_for_frontend(quiz_data: dict, title: str) -> dict:
+def apply_bert_classification(question: dict, classification: str, confidence: float) -> dict:
     """
-    Formats the generated quiz JSON into a frontend-friendly structure.
+    Reconcile a question's declared Bloom's level with BERT's LOTS/HOTS call
+    and keep the BERT result on the question so later stages reuse it.
     """
-    questions = []
-    total_points = 0
+    declared_level = question.get("cognitive_level", "remembering").lower()
+    
+    # Map BERT classification to Bloom's level
+    if classification == "LOTS":
+        # Keep declared level if it's LOTS, otherwise adjust
+        if declared_level in ["remembering", "understanding", "application"]:
+            adjusted_level = declared_level
+        else:
+            adjusted_level = "application"  # Default LOTS
+    else:  # HOTS
+        # Keep declared level if it's HOTS, otherwise adjust
+        if declared_level in ["analysis", "evaluation", "creating"]:
+            adjusted_level = declared_level
+        else:
+            adjusted_level = "analysis"  # Default HOTS
+    
+    # Update the question
+    question["cognitive_level"] = adjusted_level
+    question["bloom_classification"] = classification
+    question["classification_confidence"] = round(confidence, 4)
+    
+    # Update difficulty based on level
+    if adjusted_level in ["remembering", "understanding", "application"]:
+        question["difficulty"] = "easy"
+    elif adjusted_level in ["analysis", "evaluation"]:
+        question["difficulty"] = "average"
+    else:  # creating
+        question["difficulty"] = "difficult"
+    
+    return question
 
-    for mc in quiz_data.get("multiple_choice", []):
+
+# BERT results attached by verify_and_rebalance_questions
+CLASSIFICATION_KEYS = ("bloom_classification", "classification_confidence")
+
+
+def _carry_classification(source: dict, target: dict) -> dict:
+    """Copy an existing BERT classification onto the formatted question."""
+    for key in CLASSIFICATION_KEYS:
+        if key in source:
+            target[key] = source[key]
+    return target
+
+
+def format_question_for_frontend(q_type: str, question: dict) -> dict:
+    """
+    Formats one generated question into the frontend structure.
+    """
+    if q_type == "multiple_choice":
         choices = []
-        for i, choice_text in enumerate(mc["choices"]):
+        for i, choice_text in enumerate(question["choices"]):
             choices.append({
                 "text": choice_text,
-                "is_correct": i == mc["correct_answer"]
+                "is_correct": i == question["correct_answer"]
             })
 
-        questions.append({
+        return _carry_classification(question, {
             "type": "multiple_choice",
-            "question": mc["question"],
+            "question": question["question"],
             "choices": choices,
-            "points": mc.get("points", 2),
-            "cognitive_level": mc.get("cognitive_level", "remembering"),
-            "difficulty": mc.get("difficulty", "easy")
+            "points": question.get("points", 2),
+            "cognitive_level": question.get("cognitive_level", "remembering"),
+            "difficulty": question.get("difficulty", "easy")
         })
-        total_points += mc.get("points", 2)
 
-    for tf in quiz_data.get("true_false", []):
-        questions.append({
+    if q_type == "true_false":
+        return _carry_classification(question, {
             "type": "true_false",
-            "question": tf["question"],
-            "correct_answer": "True" if tf["correct_answer"] else "False",
-            "points": tf.get("points", 1),
-            "cognitive_level": tf.get("cognitive_level", "understanding"),
-            "difficulty": tf.get("difficulty", "easy")
-        })
-        total_points += tf.get("points", 1)
-
-    for id_q in quiz_data.get("identification", []):
-        questions.append({
-            "type": "identification",
-            "question": id_q["question"],
-            "correct_answer": id_q["correct_answer"],
-            "points": id_q.get("points", 2),
-            "cognitive_level": id_q.get("cognitive_level", "remembering"),
-            "difficulty": id_q.get("difficulty", "easy")
+            "question": question["question"],
+            "correct_answer": "True" if question["correct_answer"] else "False",
+            "points": question.get("points", 1),
+            "cognitive_level": question.get("cognitive_level", "understanding"),
+            "difficulty": question.get("difficulty", "easy")
         })
-        total_points += id_q.get("points", 2)
+
+    return _carry_classification(question, {
+        "type": "identification",
+        "question": question["question"],
+        "correct_answer": question["correct_answer"],
+        "points": question.get("points", 2),
+        "cognitive_level": question.get("cognitive_level", "remembering"),
+        "difficulty": question.get("difficulty", "easy")
+    })
+
+
+def format_quiz_for_frontend(quiz_data: dict, title: str) -> dict:
+    """
+    Formats the generated quiz JSON into a frontend-friendly structure.
+    BERT classifications from the generation pipeline are carried over.
+    """
+    questions = []
+    total_points = 0
+
+    for q_type in ["multiple_choice", "true_false", "identification"]:
+        for question in quiz_data.get(q_type, []):
+            formatted = format_question_for_frontend(q_type, question)
+            questions.append(formatted)
+            total_points += formatted["points"]
 
     return {
         "title": title,
         "questions": questions,
         "total_points": total_points
-    }
\ No newline at end of file
+    }
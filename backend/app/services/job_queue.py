@@ -0,0 +1,476 @@
+"""
+Background quiz generation jobs.
+
+Submitting a job stores the uploaded PDF and the request parameters in
+SQLite and returns a job id at once; a pool of asyncio workers runs the
+generation pipeline and writes the result back, so no HTTP request has to
+stay open for the Gemini round trip. Queued jobs survive a restart.
+
+Several processes (uvicorn workers) can share one database: a claimed job
+records its owner and a lease that the owner renews while it runs. Only
+jobs whose lease has expired - their process stopped or hung - are queued
+again, by whichever process notices first. Cancelling marks the job in the
+database, and the owner stops it at its next heartbeat.
+
+Scheduling: higher priority first; within a priority, the user with the
+fewest running jobs (then the one served least recently) goes next, so a
+user who queues a batch of jobs can't starve everyone else. Queue depth is
+capped overall and per user.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+
+from app.config.settings import settings
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+TERMINAL_STATES = ("done", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue (or the user's share of it) is full."""
+    def __init__(self, message: str, per_user: bool = False):
+        super().__init__(message)
+        self.per_user = per_user
+
+
+class JobStore:
+    """Thread-safe SQLite persistence for jobs (inputs, state and results)."""
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold the lock)."""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS quiz_jobs ("
+                " id TEXT PRIMARY KEY,"
+                " user_id TEXT NOT NULL,"
+                " priority INTEGER NOT NULL,"
+                " status TEXT NOT NULL,"
+                " stage TEXT,"
+                " params TEXT NOT NULL,"
+                " pdf BLOB,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " owner TEXT,"
+                " lease_until REAL)"
+            )
+            # Databases created before leases existed
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(quiz_jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE quiz_jobs ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_quiz_jobs_status ON quiz_jobs (status)")
+            self._conn.commit()
+        return self._conn
+
+    def create(self, user_id: str, priority: int, params: dict, pdf_bytes: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO quiz_jobs (id, user_id, priority, status, params, pdf, created_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, user_id, priority, json.dumps(params), pdf_bytes, self.clock())
+            )
+            conn.commit()
+        return job_id
+
+    def count_queued(self, user_id: str = None) -> int:
+        with self._lock:
+            conn = self._connect()
+            if user_id is None:
+                return conn.execute("SELECT COUNT(*) FROM quiz_jobs WHERE status = 'queued'").fetchone()[0]
+            return conn.execute(
+                "SELECT COUNT(*) FROM quiz_jobs WHERE status = 'queued' AND user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def queued(self) -> list:
+        """(id, user_id, priority, created_at) of every queued job, oldest first."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT id, user_id, priority, created_at FROM quiz_jobs"
+                " WHERE status = 'queued' ORDER BY created_at ASC"
+            ).fetchall()
+
+    def get(self, job_id: str):
+        """Job state and result as a dict (without the PDF), or None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, user_id, priority, status, stage, result, error, attempts,"
+                " created_at, started_at, finished_at FROM quiz_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "user_id", "priority", "status", "stage", "result", "error", "attempts",
+                "created_at", "started_at", "finished_at")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float):
+        """
+        Mark a queued job running under owner's lease; returns (params, pdf bytes),
+        or None if it was taken.
+        """
+        with self._lock:
+            conn = self._connect()
+            now = self.clock()
+            claimed = conn.execute(
+                "UPDATE quiz_jobs SET status = 'running', stage = NULL, started_at = ?,"
+                " attempts = attempts + 1, owner = ?, lease_until = ? WHERE id = ? AND status = 'queued'",
+                (now, owner, now + lease_seconds, job_id)
+            ).rowcount
+            conn.commit()
+            if not claimed:
+                return None
+            params, pdf_bytes = conn.execute(
+                "SELECT params, pdf FROM quiz_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(params), pdf_bytes
+
+    def set_stage(self, job_id: str, stage: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE quiz_jobs SET stage = ? WHERE id = ?", (stage, job_id))
+            conn.commit()
+
+    def finish(self, job_id: str, status: str, result: dict = None, error: str = None,
+               owner: str = None) -> bool:
+        """
+        Record the outcome and drop the stored PDF. False if the job already
+        ended, or (when owner is given) if owner no longer holds it.
+        """
+        query = (
+            "UPDATE quiz_jobs SET status = ?, result = ?, error = ?, finished_at = ?, pdf = NULL,"
+            " lease_until = NULL WHERE id = ? AND status NOT IN ('done', 'failed', 'cancelled')"
+        )
+        args = [status, json.dumps(result) if result is not None else None, error, self.clock(), job_id]
+        if owner is not None:
+            query += " AND status = 'running' AND owner = ?"
+            args.append(owner)
+        with self._lock:
+            conn = self._connect()
+            updated = conn.execute(query, args).rowcount
+            conn.commit()
+        return bool(updated)
+
+    def heartbeat(self, owner: str, job_ids: list, lease_seconds: float) -> list:
+        """
+        Renew owner's lease on the jobs it is running. Returns the ones it
+        must stop: cancelled, or lost to another process after its lease expired.
+        """
+        if not job_ids:
+            return []
+        placeholders = ", ".join("?" * len(job_ids))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"UPDATE quiz_jobs SET lease_until = ? WHERE owner = ? AND status = 'running'"
+                f" AND id IN ({placeholders})",
+                (self.clock() + lease_seconds, owner, *job_ids)
+            )
+            conn.commit()
+            held = {row[0] for row in conn.execute(
+                f"SELECT id FROM quiz_jobs WHERE owner = ? AND status = 'running' AND id IN ({placeholders})",
+                (owner, *job_ids)
+            )}
+        return [job_id for job_id in job_ids if job_id not in held]
+
+    def recover(self, max_attempts: int) -> tuple:
+        """
+        Requeue running jobs whose lease expired (their process died or hung),
+        or fail them once they have been started max_attempts times.
+        Returns (requeued, failed).
+        """
+        with self._lock:
+            conn = self._connect()
+            now = self.clock()
+            expired = "status = 'running' AND (lease_until IS NULL OR lease_until < ?)"
+            failed = conn.execute(
+                "UPDATE quiz_jobs SET status = 'failed', error = ?, finished_at = ?, pdf = NULL,"
+                f" lease_until = NULL WHERE {expired} AND attempts >= ?",
+                ("Interrupted by a restart too many times", now, now, max_attempts)
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE quiz_jobs SET status = 'queued', stage = NULL, owner = NULL, lease_until = NULL"
+                f" WHERE {expired}",
+                (now,)
+            ).rowcount
+            conn.commit()
+        return requeued, failed
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Delete finished jobs older than the retention period."""
+        with self._lock:
+            conn = self._connect()
+            deleted = conn.execute(
+                "DELETE FROM quiz_jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < ?",
+                (self.clock() - older_than_seconds,)
+            ).rowcount
+            conn.commit()
+        return deleted
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM quiz_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class JobQueue:
+    """
+    Worker pool over a JobStore. set_handler() registers the coroutine that
+    runs one job: handler(params, pdf_bytes, progress) -> result dict, where
+    progress(stage) is awaited to publish the current stage.
+    """
+    def __init__(self, store: JobStore, workers: int, max_queued: int,
+                 max_queued_per_user: int, max_attempts: int, retention_seconds: float,
+                 lease_seconds: float = 60):
+        self.store = store
+        # Unique per process (and per start), so leases of a dead process are never renewed
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.max_queued_per_user = max(1, max_queued_per_user)
+        self.max_attempts = max(1, max_attempts)
+        self.retention_seconds = retention_seconds
+        self.handler = None
+        self._tasks = []
+        self._heartbeat_task = None
+        self._running = {}
+        self._cancelled = set()
+        self._running_by_user = Counter()
+        self._last_served = {}
+        self._claim_lock = None
+        self._updated = None
+
+        # Metrics
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def set_handler(self, handler):
+        self.handler = handler
+
+    def _notify(self):
+        """Wake workers and job streams waiting for a change."""
+        if self._updated is not None:
+            self._updated.set()
+            self._updated = asyncio.Event()
+
+    async def wait_for_update(self, timeout: float):
+        """Return after the next job change, or after timeout seconds."""
+        if self._updated is None:
+            self._updated = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def start(self):
+        """Requeue jobs with expired leases and start the workers on the running loop."""
+        if self.handler is None:
+            raise RuntimeError("JobQueue.start() called before set_handler()")
+        self._claim_lock = asyncio.Lock()
+        self._updated = asyncio.Event()
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        """
+        Stop the workers. Jobs they were running stay "running" in the
+        database and are requeued once their lease expires.
+        """
+        tasks = self._tasks + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+
+    async def _recover(self):
+        requeued, failed = await asyncio.to_thread(self.store.recover, self.max_attempts)
+        if requeued or failed:
+            print(f"📋 Job queue recovered: {requeued} requeued, {failed} failed after their lease expired")
+            self._notify()
+
+    async def _heartbeat(self):
+        """Renew our leases, stop jobs cancelled elsewhere, and requeue other processes' expired jobs."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                lost = await asyncio.to_thread(
+                    self.store.heartbeat, self.owner, list(self._running), self.lease_seconds
+                )
+                for job_id in lost:
+                    task = self._running.get(job_id)
+                    if task is not None:
+                        self._cancelled.add(job_id)
+                        task.cancel()
+                await self._recover()
+            except Exception as e:
+                print(f"⚠️ Job heartbeat failed: {e}")
+
+    async def submit(self, user_id: str, priority: int, params: dict, pdf_bytes: bytes) -> str:
+        """Persist a job and return its id. Raises JobQueueFull when a depth limit is hit."""
+        await asyncio.to_thread(self.store.purge, self.retention_seconds)
+        if await asyncio.to_thread(self.store.count_queued) >= self.max_queued:
+            self.rejected += 1
+            raise JobQueueFull(f"Job queue is full ({self.max_queued} queued)")
+        if await asyncio.to_thread(self.store.count_queued, user_id) >= self.max_queued_per_user:
+            self.rejected += 1
+            raise JobQueueFull(
+                f"Too many queued jobs for this user ({self.max_queued_per_user} max)", per_user=True
+            )
+        job_id = await asyncio.to_thread(self.store.create, user_id, priority, params, pdf_bytes)
+        self.submitted += 1
+        self._notify()
+        return job_id
+
+    def _pick_next(self, queued: list):
+        """Highest priority, then the least busy / least recently served user, then the oldest job."""
+        if not queued:
+            return None
+        top = max(priority for _, _, priority, _ in queued)
+        candidates = [job for job in queued if job[2] == top]
+        user = min(
+            {user_id for _, user_id, _, _ in candidates},
+            key=lambda u: (self._running_by_user[u], self._last_served.get(u, 0.0))
+        )
+        return next(job for job in candidates if job[1] == user)
+
+    def position(self, job_id: str, queued: list):
+        """Jobs ahead of this one: higher priority, or same priority and older (approximate)."""
+        for entry in queued:
+            if entry[0] == job_id:
+                return sum(
+                    1 for other in queued
+                    if other[2] > entry[2] or (other[2] == entry[2] and other[3] < entry[3])
+                )
+        return None
+
+    async def get(self, job_id: str):
+        """Job state for the API, with the queue position while it waits."""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is not None and job["status"] == "queued":
+            job["position"] = self.position(job_id, await asyncio.to_thread(self.store.queued))
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job. False if it already finished (or
+        doesn't exist). A job running in another process is stopped by its
+        owner at the next heartbeat.
+        """
+        cancelled = await asyncio.to_thread(self.store.finish, job_id, "cancelled", None, "Cancelled")
+        task = self._running.get(job_id)
+        if cancelled and task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+        self._notify()
+        return cancelled
+
+    async def _claim_next(self):
+        async with self._claim_lock:
+            while True:
+                job = self._pick_next(await asyncio.to_thread(self.store.queued))
+                if job is None:
+                    return None
+                claimed = await asyncio.to_thread(self.store.claim, job[0], self.owner, self.lease_seconds)
+                if claimed is not None:
+                    job_id, user_id = job[0], job[1]
+                    self._running_by_user[user_id] += 1
+                    self._last_served[user_id] = time.monotonic()
+                    return job_id, user_id, claimed
+
+    async def _worker(self, number: int):
+        while True:
+            claimed = await self._claim_next()
+            if claimed is None:
+                await self.wait_for_update(timeout=5)
+                continue
+            job_id, user_id, (params, pdf_bytes) = claimed
+            self._notify()
+            print(f"⚙️ Worker {number} running job {job_id}")
+            try:
+                await self._run(job_id, params, pdf_bytes)
+            finally:
+                self._running_by_user[user_id] -= 1
+                self._notify()
+
+    async def _run(self, job_id: str, params: dict, pdf_bytes: bytes):
+        async def progress(stage: str):
+            await asyncio.to_thread(self.store.set_stage, job_id, stage)
+            self._notify()
+
+        task = asyncio.create_task(self.handler(params, pdf_bytes, progress))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if job_id in self._cancelled:
+                # Cancelled (or taken over elsewhere); the job is already marked
+                return
+            # The worker itself is stopping - the job stays "running" and is requeued when its lease expires
+            task.cancel()
+            raise
+        except Exception as e:
+            message = getattr(e, "detail", None) or str(e)
+            print(f"❌ Job {job_id} failed: {message}")
+            if await asyncio.to_thread(self.store.finish, job_id, "failed", None, message, self.owner):
+                self.failed += 1
+        else:
+            if await asyncio.to_thread(self.store.finish, job_id, "done", result, None, self.owner):
+                self.completed += 1
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "owner": self.owner,
+            "lease_seconds": self.lease_seconds,
+            "running": len(self._running),
+            "max_queued": self.max_queued,
+            "max_queued_per_user": self.max_queued_per_user,
+            "jobs": self.store.counts(),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+job_queue = JobQueue(
+    JobStore(settings.JOB_DB_PATH),
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    max_queued_per_user=settings.JOB_MAX_QUEUED_PER_USER,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retention_seconds=settings.JOB_RETENTION_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS
+)
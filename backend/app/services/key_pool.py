@@ -0,0 +1,190 @@
+"""
+Gemini API key pool with per-key quota tracking.
+Each key has RPM/TPM token buckets and a cooldown window after quota or
+auth errors; callers lease the least-loaded healthy key for one request
+instead of rotating a process-global key.
+"""
+
+import threading
+import time
+
+from app.config.settings import settings
+
+
+class KeyPoolExhausted(Exception):
+    """Raised when no key becomes available before the wait timeout."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens, refilled at
+    capacity per `period` seconds. The level may go negative when a
+    request turns out to cost more than was reserved.
+    """
+    def __init__(self, capacity: float, period: float, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+
+class KeyState:
+    """Quota and health bookkeeping for one API key."""
+    def __init__(self, index: int, key: str, rpm: int, tpm: int, clock):
+        self.index = index
+        self.key = key
+        self.requests = TokenBucket(rpm, 60.0, clock)
+        self.tokens = TokenBucket(tpm, 60.0, clock)
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.successes = 0
+        self.quota_errors = 0
+        self.auth_errors = 0
+        self.other_errors = 0
+
+    def wait_time(self, estimated_tokens: int, now: float) -> float:
+        """Seconds until this key could accept a request of this size."""
+        return max(
+            self.cooldown_until - now,
+            self.requests.wait_time(1),
+            self.tokens.wait_time(estimated_tokens)
+        )
+
+
+class KeyLease:
+    """One request's hold on a key; hand it back with KeyPool.release()."""
+    def __init__(self, state: KeyState, reserved_tokens: int):
+        self.state = state
+        self.key = state.key
+        self.index = state.index
+        self.reserved_tokens = reserved_tokens
+
+
+class KeyPool:
+    """
+    Thread-safe scheduler over the configured Gemini keys.
+    acquire() picks the least-loaded key whose buckets have room and which
+    is not cooling down, waiting (bounded) if every key is busy.
+    """
+    def __init__(self, keys: list, rpm: int, tpm: int,
+                 quota_cooldown: float, auth_cooldown: float,
+                 clock=time.monotonic, sleep=time.sleep):
+        if not keys:
+            raise ValueError("❌ KeyPool needs at least one API key.")
+        self.clock = clock
+        self.sleep = sleep
+        self.quota_cooldown = quota_cooldown
+        self.auth_cooldown = auth_cooldown
+        self._states = [KeyState(i, key, rpm, tpm, clock) for i, key in enumerate(keys)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def acquire(self, estimated_tokens: int, timeout: float) -> KeyLease:
+        """
+        Lease a key for a request expected to use `estimated_tokens` tokens.
+        Raises KeyPoolExhausted if none frees up within `timeout` seconds.
+        """
+        deadline = self.clock() + timeout
+        while True:
+            with self._lock:
+                now = self.clock()
+                waits = [(state.wait_time(estimated_tokens, now), state) for state in self._states]
+                ready = [state for wait, state in waits if wait <= 0]
+                if ready:
+                    # Least loaded first, then the key with the most request budget left
+                    state = min(ready, key=lambda s: (s.in_flight, -s.requests.available()))
+                    state.in_flight += 1
+                    state.requests.consume(1)
+                    state.tokens.consume(estimated_tokens)
+                    return KeyLease(state, estimated_tokens)
+                next_wait = min(wait for wait, _ in waits)
+
+            remaining = deadline - self.clock()
+            if next_wait > remaining:
+                raise KeyPoolExhausted(
+                    f"❌ All {len(self._states)} API keys are rate limited or cooling down "
+                    f"(next available in {next_wait:.1f}s)"
+                )
+            self.sleep(min(next_wait, remaining))
+
+    def release(self, lease: KeyLease, tokens_used: int = None, error: str = None,
+                retry_after: float = None):
+        """
+        Return a leased key.
+        error: None on success, "quota" for 429/quota errors, "auth" for
+        invalid or unauthorized keys, anything else for other failures.
+        """
+        with self._lock:
+            state = lease.state
+            state.in_flight -= 1
+            if tokens_used is not None:
+                # Settle the reservation against what the request really used
+                state.tokens.consume(tokens_used - lease.reserved_tokens)
+                state.tokens.tokens = min(state.tokens.tokens, state.tokens.capacity)
+
+            if error is None:
+                state.successes += 1
+            elif error == "quota":
+                state.quota_errors += 1
+                cooldown = retry_after if retry_after is not None else self.quota_cooldown
+                state.cooldown_until = max(state.cooldown_until, self.clock() + cooldown)
+                # The server says we're out of budget - stop spending it locally too
+                state.requests.tokens = min(state.requests.tokens, 0)
+            elif error == "auth":
+                state.auth_errors += 1
+                state.cooldown_until = max(state.cooldown_until, self.clock() + self.auth_cooldown)
+            else:
+                state.other_errors += 1
+
+    def stats(self) -> list:
+        """Per-key health for the metrics endpoints (keys themselves are not exposed)."""
+        with self._lock:
+            now = self.clock()
+            return [
+                {
+                    "index": state.index,
+                    "in_flight": state.in_flight,
+                    "cooldown_seconds": round(max(0.0, state.cooldown_until - now), 2),
+                    "rpm_available": round(state.requests.available(), 2),
+                    "tpm_available": round(state.tokens.available()),
+                    "successes": state.successes,
+                    "quota_errors": state.quota_errors,
+                    "auth_errors": state.auth_errors,
+                    "other_errors": state.other_errors,
+                }
+                for state in self._states
+            ]
+
+
+# Singleton instance
+key_pool = KeyPool(
+    settings.api_keys,
+    rpm=settings.GEMINI_KEY_RPM,
+    tpm=settings.GEMINI_KEY_TPM,
+    quota_cooldown=settings.GEMINI_QUOTA_COOLDOWN,
+    auth_cooldown=settings.GEMINI_AUTH_COOLDOWN
+)
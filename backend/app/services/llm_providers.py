@@ -0,0 +1,290 @@
+"""
+LLM providers for quiz generation.
+
+A provider hands out a model object per API key whose
+generate_content(prompt, generation_config=..., stream=False) behaves like
+the Gemini SDK's: it returns a response with .text (and .usage_metadata),
+or with stream=True an iterable of chunks with .text. request_quiz_data and
+stream_quiz_items only rely on that surface.
+
+LLM_PROVIDER=gemini (default) talks to Gemini. LLM_PROVIDER=fake serves
+quizzes locally with configurable latency, token throughput, error and
+429 rates, so the pipeline can be benchmarked and load tested without
+network access or API quota.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from app.config.settings import settings
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+
+class GeminiKeyModel:
+    """
+    generate_content() for one API key, sent through that key's own
+    GenerativeServiceClient, so concurrent requests never share or mutate a
+    global genai.configure(). Only public API is used: the request is built
+    from google.ai.generativelanguage types and the reply is wrapped in the
+    SDK's GenerateContentResponse (for .text and streaming chunks).
+    """
+    def __init__(self, genai, glm, client, model_name: str):
+        self._genai = genai
+        self._glm = glm
+        self._client = client
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str, generation_config: dict = None, stream: bool = False):
+        glm = self._glm
+        request = glm.GenerateContentRequest(
+            model=f"models/{self.model_name}",
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])],
+            generation_config=glm.GenerationConfig(**(generation_config or {})),
+        )
+        response_type = self._genai.types.GenerateContentResponse
+        if stream:
+            return response_type.from_iterator(self._client.stream_generate_content(request))
+        return response_type.from_response(self._client.generate_content(request))
+
+
+class GeminiProvider:
+    """The real Gemini API, one client per key."""
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self._sdk = None
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def _get_sdk(self) -> tuple:
+        """
+        Import the Gemini SDK on first use (deferred so importing the routes
+        doesn't delay the server binding its port) and check it still offers
+        what GeminiKeyModel uses - requirements.txt pins the versions.
+        """
+        if self._sdk is None:
+            import google.generativeai as genai
+            from google.ai import generativelanguage as glm
+
+            response_type = getattr(getattr(genai, "types", None), "GenerateContentResponse", None)
+            missing = [
+                name for name, present in (
+                    ("generativelanguage.GenerativeServiceClient", hasattr(glm, "GenerativeServiceClient")),
+                    ("generativelanguage.GenerateContentRequest", hasattr(glm, "GenerateContentRequest")),
+                    ("types.GenerateContentResponse.from_response", hasattr(response_type, "from_response")),
+                    ("types.GenerateContentResponse.from_iterator", hasattr(response_type, "from_iterator")),
+                ) if not present
+            ]
+            if missing:
+                raise RuntimeError(
+                    f"❌ Unsupported google-generativeai version {getattr(genai, '__version__', '?')}: "
+                    f"missing {', '.join(missing)}. Install the versions pinned in requirements.txt."
+                )
+            self._sdk = (genai, glm)
+        return self._sdk
+
+    def model(self, api_key: str) -> GeminiKeyModel:
+        """A model bound to one API key through its own client."""
+        genai, glm = self._get_sdk()
+        with self._clients_lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                self._clients[api_key] = client
+        return GeminiKeyModel(genai, glm, client, self.model_name)
+
+
+# Question stems per Bloom's level for the fake provider's generated quizzes
+FAKE_STEMS = {
+    "remembering": ("Define {topic}.", "Identify the main property of {topic}."),
+    "understanding": ("Explain how {topic} works.", "Describe the purpose of {topic}."),
+    "application": ("Apply {topic} to sort a list of records.", "Use {topic} to solve a scheduling problem."),
+    "analysis": ("Compare {topic} with {other}.", "Analyze the trade-offs of {topic}."),
+    "evaluation": ("Evaluate whether {topic} suits a large system.", "Justify choosing {topic} over {other}."),
+    "creating": ("Design an improvement to {topic}.", "Propose a new use for {topic}."),
+}
+FAKE_TOPICS = (
+    "hash tables", "binary search", "merge sort", "encapsulation", "recursion",
+    "dynamic programming", "congestion control", "normalization", "polymorphism", "caching",
+)
+LEVEL_DIFFICULTY = {
+    "remembering": "easy", "understanding": "easy", "application": "easy",
+    "analysis": "average", "evaluation": "average", "creating": "difficult",
+}
+
+
+def _prompt_count(prompt: str, label: str, default: int) -> int:
+    match = re.search(rf"-\s*(\d+)\s+{re.escape(label)}", prompt)
+    return int(match.group(1)) if match else default
+
+
+def fake_quiz(prompt: str, rng: random.Random) -> dict:
+    """A quiz with the question counts the prompt asks for, cycling through Bloom's levels."""
+    counts = {
+        "multiple_choice": _prompt_count(prompt, "Multiple Choice", 5),
+        "true_false": _prompt_count(prompt, "True/False", 5),
+        "identification": _prompt_count(prompt, "Identification", 5),
+    }
+    levels = list(FAKE_STEMS)
+    quiz = {q_type: [] for q_type in counts}
+    number = 0
+    for q_type, count in counts.items():
+        for _ in range(count):
+            level = levels[number % len(levels)]
+            number += 1
+            topic, other = rng.sample(FAKE_TOPICS, 2)
+            question = {
+                "question": f"{rng.choice(FAKE_STEMS[level]).format(topic=topic, other=other)} ({number})",
+                "points": 1,
+                "cognitive_level": level,
+                "difficulty": LEVEL_DIFFICULTY[level],
+            }
+            if q_type == "multiple_choice":
+                question["choices"] = [f"{letter}. {choice}" for letter, choice in zip("ABCD", rng.sample(FAKE_TOPICS, 4))]
+                question["correct_answer"] = rng.randrange(4)
+            elif q_type == "true_false":
+                question["correct_answer"] = rng.random() < 0.5
+            else:
+                question["correct_answer"] = topic
+            quiz[q_type].append(question)
+    return quiz
+
+
+def load_recorded_responses(path: str) -> list:
+    """
+    Recorded responses to replay: a .json file holding one quiz or a list of
+    quizzes, or a directory of such files. Quizzes may be dicts or raw response text.
+    """
+    source = Path(path)
+    files = sorted(source.glob("*.json")) if source.is_dir() else [source]
+    responses = []
+    for file in files:
+        data = json.loads(file.read_text(encoding="utf-8"))
+        for item in data if isinstance(data, list) else [data]:
+            responses.append(item if isinstance(item, str) else json.dumps(item))
+    if not responses:
+        raise ValueError(f"No recorded responses found in {path}")
+    return responses
+
+
+class FakeUsage:
+    def __init__(self, total_token_count: int):
+        self.total_token_count = total_token_count
+
+
+class FakeResponse:
+    def __init__(self, text: str, total_tokens: int):
+        self.text = text
+        self.usage_metadata = FakeUsage(total_tokens)
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Model handed out by FakeProvider for one API key."""
+    def __init__(self, provider, api_key: str):
+        self.provider = provider
+        self.api_key = api_key
+
+    def generate_content(self, prompt, generation_config=None, stream: bool = False):
+        text = self.provider.respond(prompt)
+        total_tokens = (len(prompt) + len(text)) // 4
+        if not stream:
+            time.sleep(self.provider.generation_seconds(text))
+            return FakeResponse("```json\n" + text + "\n```", total_tokens)
+        return self._stream(text)
+
+    def _stream(self, text: str):
+        chunk_chars = self.provider.STREAM_CHUNK_CHARS
+        time.sleep(self.provider.latency)
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            time.sleep(self.provider.generation_seconds(chunk, first_token=False))
+            yield FakeChunk(chunk)
+
+
+class FakeProvider:
+    """
+    Local stand-in for Gemini. Each call waits `latency` seconds plus the
+    output length at `tokens_per_second` (0 = instant), fails with a 429
+    quota error at `quota_error_rate` and a 500 at `error_rate`, and returns
+    either replayed `responses` (round robin) or a quiz generated to match
+    the prompt's question counts.
+    """
+    name = "fake"
+    STREAM_CHUNK_CHARS = 120
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0,
+                 error_rate: float = 0.0, quota_error_rate: float = 0.0,
+                 retry_after: float = 1.0, responses: list = None, seed: int = None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.quota_error_rate = quota_error_rate
+        self.retry_after = retry_after
+        self.responses = responses
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.quota_errors = 0
+        self.errors = 0
+
+    def model(self, api_key: str) -> FakeModel:
+        return FakeModel(self, api_key)
+
+    def generation_seconds(self, text: str, first_token: bool = True) -> float:
+        seconds = self.latency if first_token else 0.0
+        if self.tokens_per_second > 0:
+            seconds += (len(text) / 4) / self.tokens_per_second
+        return seconds
+
+    def respond(self, prompt: str) -> str:
+        """Response text for one call, or raise the configured injected error."""
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            if roll < self.quota_error_rate:
+                self.quota_errors += 1
+                raise Exception(
+                    f"429 Resource has been exhausted (e.g. check quota). Please retry in {self.retry_after}s."
+                )
+            if roll < self.quota_error_rate + self.error_rate:
+                self.errors += 1
+                raise Exception("500 An internal error has occurred.")
+            if self.responses:
+                return self.responses[(self.calls - 1) % len(self.responses)]
+            seed = self._rng.random()
+        return json.dumps(fake_quiz(prompt, random.Random(seed)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "quota_errors": self.quota_errors, "errors": self.errors}
+
+
+def make_provider(name: str):
+    """Provider for an LLM_PROVIDER setting value."""
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "fake":
+        return FakeProvider(
+            latency=settings.FAKE_LLM_LATENCY,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            quota_error_rate=settings.FAKE_LLM_QUOTA_ERROR_RATE,
+            responses=load_recorded_responses(settings.FAKE_LLM_RESPONSES) if settings.FAKE_LLM_RESPONSES else None,
+            seed=settings.FAKE_LLM_SEED
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER: {name!r} (expected 'gemini' or 'fake')")
+
+
+# Singleton instance
+llm_provider = make_provider(settings.LLM_PROVIDER)
@@ -0,0 +1,233 @@
+"""
+Pipeline metrics in the Prometheus text format, without a client library.
+
+Each pipeline stage is wrapped in timed(stage), which records a latency
+histogram and, inside track_request(), adds the time to that request's
+breakdown. Counters cover key rotations, retries, rejected questions and
+classifier batch sizes; gauge collectors expose the existing stats()
+counters (stage queues, key pool, caches, job queue) at scrape time.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans a cached text lookup up to a slow whole-document Gemini call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(f"{self.name}_total", dict(zip(self.labels, key)), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            counts, _ = entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted((key, list(counts), total) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative))
+            samples.append((f"{self.name}_sum", labels, round(total, 6)))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Named counters and histograms plus gauge collectors, rendered together."""
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """
+        Register collect() -> [(name, documentation, [(labels dict, value), ...]), ...],
+        called on every scrape and rendered as gauges.
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (blocking)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for collect in self._collectors:
+            try:
+                gauges = collect()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+                continue
+            for name, documentation, values in gauges:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in values:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "quiz_stage_duration_seconds", "Time spent in each quiz pipeline stage.", ("stage",)
+)
+request_seconds = metrics.histogram(
+    "quiz_request_duration_seconds", "End-to-end quiz generation time.", ("pipeline",)
+)
+gemini_calls = metrics.counter(
+    "quiz_gemini_calls", "Gemini calls by outcome (ok, quota, auth, other).", ("outcome",)
+)
+gemini_retries = metrics.counter(
+    "quiz_gemini_retries", "Gemini calls retried after a quota or key error.", ("reason",)
+)
+key_rotations = metrics.counter(
+    "quiz_gemini_key_rotations", "Retries that moved a request to a different API key."
+)
+questions_rejected = metrics.counter(
+    "quiz_questions_rejected", "Generated questions dropped by the metadata filter.", ("type", "rule")
+)
+classifier_batch_size = metrics.histogram(
+    "quiz_classifier_batch_size", "Questions per BERT classification call.", buckets=BATCH_SIZE_BUCKETS
+)
+
+
+class RequestTimings:
+    """Per-request seconds per stage; stages running in parallel are summed."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def breakdown(self) -> dict:
+        """Milliseconds per stage plus the request's wall-clock total."""
+        with self._lock:
+            result = {f"{stage}_ms": round(seconds * 1000, 2) for stage, seconds in self._stages.items()}
+        result["total_ms"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return result
+
+
+_current_timings = contextvars.ContextVar("quiz_request_timings", default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    """Record one stage duration in the histogram and the current request's breakdown."""
+    stage_seconds.observe(seconds, stage=stage)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as one pass through stage (recorded even if it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def track_request(pipeline: str):
+    """
+    Collect the stage timings of one request. Yields its RequestTimings;
+    work started from this context (including the stage executors) reports into it.
+    """
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+        request_seconds.observe(time.perf_counter() - timings.started, pipeline=pipeline)
@@ -0,0 +1,374 @@
+"""
+Shared model registry for the BERT classifier.
+Owns the single SentenceTransformer instance and the Bloom's keyword
+embeddings; every service reads them from here by reference.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+from app.config.settings import settings
+from app.utils.blooms_taxonomy import get_all_keywords_by_level
+from app.services.encoder_backends import encoder_factory, backend_label, check_backend_requirements
+
+# The registry is only a singleton if it lives under one module name.
+# Importing it as "services.model_registry" (via a sys.path hack) would
+# create a second registry and a second model copy.
+if __name__ != "app.services.model_registry":
+    raise ImportError(
+        f"❌ model_registry imported as '{__name__}'. "
+        "Import it as 'app.services.model_registry' so the model is loaded once."
+    )
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+WARMUP_QUESTION = "Explain how a hash table resolves collisions."
+
+# Module names that would indicate a second copy of the classifier
+_DUPLICATE_MODULE_NAMES = ("services.bert_classifier", "utils.blooms_taxonomy")
+
+# LOTS/HOTS keyword lists are these levels concatenated in order, and
+# get_all_keywords_by_level() lists the LOTS levels first
+LOTS_LEVELS = ("remembering", "understanding", "application")
+HOTS_LEVELS = ("analysis", "evaluation", "creating")
+
+
+def _embedding_artifact_path(model_name: str, keywords_by_level: dict, backend: str = "torch") -> Path:
+    """
+    Build the on-disk artifact path, keyed by model name, inference backend
+    (int8 embeddings differ slightly) and a hash of the keyword lists so
+    any keyword edit produces a new artifact.
+    """
+    payload = json.dumps({"model": model_name, "keywords": keywords_by_level}, sort_keys=True)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    safe_model = model_name.replace("/", "_")
+    if backend != "torch":
+        safe_model = f"{safe_model}-{backend}"
+    return Path(settings.EMBEDDING_CACHE_DIR) / f"bloom_{safe_model}_{digest}.npy"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows are left as zeros, like sklearn)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _write_artifact(path: Path, embeddings: np.ndarray):
+    """Write atomically so concurrent workers never map a half-written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Drop artifacts built from older keyword lists
+    prefix = path.stem.rsplit("_", 1)[0]
+    for stale in path.parent.glob(f"{prefix}_*.npy"):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+class ModelRegistry:
+    """
+    Lazily loads the sentence-transformer model and the keyword embeddings
+    exactly once per process.
+    State moves idle -> loading -> ready (or failed) and is reported by the
+    readiness endpoint together with the load timings. A failed background
+    load is retried with backoff (CLASSIFIER_LOAD_ATTEMPTS in total);
+    retry_at is set while a retry is pending.
+    backend picks the inference runtime ("torch" or "onnx", see encoder_backends).
+    """
+    def __init__(self, model_name: str = MODEL_NAME, backend: str = None, quantized: bool = None):
+        self.model_name = model_name
+        self.backend = backend or settings.CLASSIFIER_BACKEND
+        self.quantized = settings.ONNX_QUANTIZED if quantized is None else quantized
+        self.backend_label = backend_label(self.backend, self.quantized)
+        self.load_count = 0
+        self.attempts = 0
+        self.retry_at = None
+        self.state = "idle"
+        self.error = None
+        self.timings = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+        self._model = None
+        self._keyword_embeddings = None
+        self._level_slices = None
+        self._level_embeddings = None
+        self._level_centroids = None
+        self._lots_hots_weights = None
+        self._lots_embeddings = None
+        self._hots_embeddings = None
+
+    def check_requirements(self):
+        """Raise now, with what to install, if this registry's backend could not load."""
+        check_backend_requirements(self.backend, self.quantized, settings.ONNX_MODEL_DIR, self.model_name)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """Load the model and precompute keyword embeddings (no-op if already loaded)."""
+        if self._model is not None:
+            return self
+        with self._lock:
+            if self._model is not None:
+                return self
+
+            self.state = "loading"
+            self.error = None
+            self.attempts += 1
+            self._done.clear()
+            started = time.perf_counter()
+            try:
+                load_model = encoder_factory(
+                    self.backend, self.quantized, settings.ONNX_MODEL_DIR, settings.ONNX_THREADS
+                )
+                self.timings["import_seconds"] = round(time.perf_counter() - started, 3)
+
+                print(f"🧠 Loading BERT model: {self.model_name} ({self.backend_label})")
+                step = time.perf_counter()
+                model = load_model(self.model_name)
+                self.load_count += 1
+                self.timings["model_seconds"] = round(time.perf_counter() - step, 3)
+
+                step = time.perf_counter()
+                self._set_keyword_embeddings(self._load_keyword_embeddings(model))
+                self.timings["embeddings_seconds"] = round(time.perf_counter() - step, 3)
+
+                # Warm-up inference so the first real request doesn't pay for it
+                step = time.perf_counter()
+                model.encode([WARMUP_QUESTION], convert_to_numpy=True)
+                self.timings["warmup_seconds"] = round(time.perf_counter() - step, 3)
+
+                self._model = model
+                self.verify_single_load()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                self.timings["total_seconds"] = round(time.perf_counter() - started, 3)
+                self._done.set()
+                print(f"❌ BERT model failed to load: {e}")
+                raise
+
+            self.state = "ready"
+            self.timings["total_seconds"] = round(time.perf_counter() - started, 3)
+            self._ready.set()
+            self._done.set()
+            print(f"✓ BERT model and keyword embeddings ready ({self.timings['total_seconds']}s)")
+        return self
+
+    def start_background_load(self):
+        """Load the model on a daemon thread so the server can bind immediately."""
+        if self._thread is not None or self._model is not None:
+            return
+
+        def _run():
+            delay = settings.CLASSIFIER_LOAD_RETRY_SECONDS
+            for attempt in range(1, settings.CLASSIFIER_LOAD_ATTEMPTS + 1):
+                try:
+                    self.load()
+                    return
+                except Exception:
+                    import traceback
+                    traceback.print_exc()
+                if attempt == settings.CLASSIFIER_LOAD_ATTEMPTS:
+                    print(f"❌ Giving up on the BERT model after {attempt} attempts")
+                    return
+                print(f"🔁 Retrying the BERT model load in {delay:g}s")
+                self.retry_at = time.monotonic() + delay
+                time.sleep(delay)
+                self.retry_at = None
+                delay = min(delay * 2, 300)
+
+        self.state = "loading"
+        self._thread = threading.Thread(target=_run, name="bert-model-loader", daemon=True)
+        self._thread.start()
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """
+        Block until the model is ready, it failed, or the timeout expires.
+        Returns True only if the model is ready.
+        """
+        if self._ready.is_set():
+            return True
+        if self._thread is None:
+            # No background loader running - load in the caller
+            try:
+                self.load()
+            except Exception:
+                return False
+            return True
+        self._done.wait(timeout)
+        return self._ready.is_set()
+
+    @property
+    def will_retry(self) -> bool:
+        """True while a failed load has a retry pending."""
+        return self.retry_at is not None
+
+    def status(self) -> dict:
+        """Readiness snapshot for the health/readiness endpoints."""
+        retry_at = self.retry_at
+        return {
+            "state": self.state,
+            "model": self.model_name,
+            "backend": self.backend_label,
+            "load_count": self.load_count,
+            "attempts": self.attempts,
+            "retry_in_seconds": round(max(0.0, retry_at - time.monotonic()), 1) if retry_at else None,
+            "timings": dict(self.timings),
+            "error": self.error,
+        }
+
+    def _load_keyword_embeddings(self, model) -> np.ndarray:
+        """
+        Map the keyword embedding artifact read-only, building it first if it
+        is missing or was produced from different keyword lists.
+        """
+        keywords_by_level = get_all_keywords_by_level()
+        path = _embedding_artifact_path(self.model_name, keywords_by_level, self.backend_label)
+        total = sum(len(keywords) for keywords in keywords_by_level.values())
+
+        if path.exists():
+            try:
+                embeddings = np.load(path, mmap_mode="r")
+                if embeddings.shape[0] == total:
+                    print(f"✓ Mapped keyword embeddings from {path}")
+                    return embeddings
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable embedding artifact {path}: {e}")
+
+        # One encode over every level's keywords (LOTS/HOTS are slices of it)
+        print("🧮 Encoding Bloom's keyword embeddings...")
+        all_keywords = [kw for keywords in keywords_by_level.values() for kw in keywords]
+        embeddings = model.encode(all_keywords, convert_to_numpy=True)
+        try:
+            _write_artifact(path, embeddings)
+            print(f"💾 Saved keyword embeddings to {path}")
+            return np.load(path, mmap_mode="r")
+        except OSError as e:
+            print(f"⚠️ Could not persist keyword embeddings: {e}")
+            return embeddings
+
+    def _set_keyword_embeddings(self, embeddings: np.ndarray):
+        """
+        Slice the stacked keyword matrix into per-level and LOTS/HOTS views.
+        Slices of the mapped file share its pages instead of copying them.
+        """
+        level_slices = {}
+        offset = 0
+        for level, keywords in get_all_keywords_by_level().items():
+            level_slices[level] = slice(offset, offset + len(keywords))
+            offset += len(keywords)
+        level_embeddings = {level: embeddings[sl] for level, sl in level_slices.items()}
+
+        # Also keep LOTS/HOTS embeddings for backwards compatibility
+        lots_count = sum(len(level_embeddings[level]) for level in LOTS_LEVELS)
+        self._lots_embeddings = embeddings[:lots_count]
+        self._hots_embeddings = embeddings[lots_count:]
+        self._keyword_embeddings = embeddings
+        self._level_slices = level_slices
+        self._level_embeddings = level_embeddings
+        self._build_centroids(embeddings, level_slices)
+
+    def _build_centroids(self, embeddings: np.ndarray, level_slices: dict):
+        """
+        Precompute the scoring matrices.
+        mean(cosine(q, keywords)) == normalize(q) . mean(normalize(keywords)),
+        so each level collapses to one centroid of its normalized keywords
+        (6 x d). LOTS/HOTS scores are keyword-count-weighted averages of the
+        level scores, kept as a (6 x 2) weight matrix over the same centroids.
+        """
+        normalized = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        self._level_centroids = np.ascontiguousarray(
+            np.vstack([normalized[sl].mean(axis=0) for sl in level_slices.values()]),
+            dtype=np.float32
+        )
+
+        levels = list(level_slices)
+        weights = np.zeros((len(levels), 2), dtype=np.float32)
+        for column, group in enumerate((LOTS_LEVELS, HOTS_LEVELS)):
+            counts = {level: level_slices[level].stop - level_slices[level].start for level in group}
+            total = sum(counts.values())
+            for level, count in counts.items():
+                weights[levels.index(level), column] = count / total
+        self._lots_hots_weights = weights
+
+    @property
+    def model(self):
+        return self.load()._model
+
+    @property
+    def keyword_embeddings(self) -> np.ndarray:
+        """All keyword embeddings stacked level by level (K x d)."""
+        return self.load()._keyword_embeddings
+
+    @property
+    def level_slices(self) -> dict:
+        """Row range of each Bloom's level inside keyword_embeddings."""
+        return self.load()._level_slices
+
+    @property
+    def levels(self) -> list:
+        """Bloom's levels in scoring-matrix order."""
+        return list(self.level_slices)
+
+    @property
+    def level_centroids(self) -> np.ndarray:
+        """Mean normalized keyword embedding per level (6 x d)."""
+        return self.load()._level_centroids
+
+    @property
+    def lots_hots_weights(self) -> np.ndarray:
+        """Maps 6 level scores to (LOTS, HOTS) scores (6 x 2)."""
+        return self.load()._lots_hots_weights
+
+    @property
+    def level_embeddings(self) -> dict:
+        return self.load()._level_embeddings
+
+    @property
+    def lots_embeddings(self) -> np.ndarray:
+        return self.load()._lots_embeddings
+
+    @property
+    def hots_embeddings(self) -> np.ndarray:
+        return self.load()._hots_embeddings
+
+    def verify_single_load(self):
+        """
+        Fail loudly if the model was loaded more than once in this process,
+        or if the classifier modules were imported under a second name.
+        """
+        duplicates = [name for name in _DUPLICATE_MODULE_NAMES if name in sys.modules]
+        if duplicates:
+            raise RuntimeError(
+                f"❌ Classifier modules imported outside the 'app' package: {duplicates}"
+            )
+        if self.load_count > 1:
+            raise RuntimeError(
+                f"❌ BERT model '{self.model_name}' loaded {self.load_count} times in one process"
+            )
+
+
+# Singleton instance
+registry = ModelRegistry()
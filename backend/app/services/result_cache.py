@@ -0,0 +1,168 @@
+"""
+Content-addressed cache of generated quizzes.
+Keyed by the SHA-256 of the uploaded PDF plus the question counts and the
+prompt version, so re-uploading the same handout skips extraction, Gemini
+and BERT entirely. Stored in SQLite with TTL and total-size eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.config.settings import settings
+
+
+def make_cache_key(pdf_sha256: str, num_multiple_choice: int, num_true_false: int,
+                   num_identification: int, prompt_version: str,
+                   full_document: bool = False, sample_pages: int = 0) -> str:
+    """Stable key for one (document, request parameters, prompt) combination."""
+    parts = [
+        pdf_sha256,
+        str(num_multiple_choice),
+        str(num_true_false),
+        str(num_identification),
+        prompt_version,
+        "full" if full_document else "head",
+    ]
+    if sample_pages and not full_document:
+        parts.append(f"sample:{sample_pages}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe SQLite store of quiz JSON.
+    Entries older than ttl_seconds are dropped; when the stored payloads
+    exceed max_bytes the least recently used entries are evicted.
+    """
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold the lock)."""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS quiz_results ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_quiz_results_accessed ON quiz_results (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        """Return the cached quiz for key, or None if missing or expired."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, created_at FROM quiz_results WHERE key = ?", (key,)
+            ).fetchone()
+            now = self.clock()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM quiz_results WHERE key = ?", (key,))
+                conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE quiz_results SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict):
+        """Store a quiz, then enforce the TTL and size limits."""
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            now = self.clock()
+            conn.execute(
+                "INSERT OR REPLACE INTO quiz_results (key, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self.stores += 1
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM quiz_results WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.expirations += max(0, expired)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM quiz_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest-accessed first until we are back under the cap
+        for key, size in conn.execute(
+            "SELECT key, size FROM quiz_results ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM quiz_results WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM quiz_results")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size for the metrics endpoints."""
+        with self._lock:
+            conn = self._connect()
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM quiz_results"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.RESULT_CACHE_ENABLED,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Singleton instance
+result_cache = ResultCache(
+    settings.RESULT_CACHE_PATH,
+    max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS
+)
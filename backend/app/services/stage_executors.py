@@ -0,0 +1,127 @@
+"""
+Bounded executors for the blocking stages of quiz generation.
+Each stage (PDF parsing, Gemini calls, BERT inference) gets its own pool so
+the event loop stays free and one slow stage can't starve the others.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config.settings import settings
+
+
+class StageExecutor:
+    """
+    Runs blocking calls for one pipeline stage on a dedicated thread pool.
+    max_concurrency caps how many calls of this stage run at once; extra
+    calls wait in the pool's queue without blocking the event loop.
+    """
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"{name}-stage"
+        )
+        self._lock = threading.Lock()
+        # Producer tasks of streams whose consumer stopped early, kept until they finish
+        self._pumps = set()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Await func(*args, **kwargs) executed on this stage's pool, in a copy
+        of the caller's context (so per-request metrics follow the call).
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        with self._lock:
+            self.pending += 1
+        try:
+            return await loop.run_in_executor(self._pool, context.run, functools.partial(func, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    async def stream(self, gen_func, *args, **kwargs):
+        """
+        Iterate a blocking generator on this stage's pool, yielding its items
+        on the event loop as they are produced. If the consumer stops early,
+        the producer stops at its next item. Errors from the producer (or from
+        scheduling it) are raised to the consumer.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def pump():
+            try:
+                for item in gen_func(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (done, e))
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, (done, None))
+
+        def pump_finished(task):
+            # pump() reports its own errors; this catches run() failing to schedule it
+            if not task.cancelled() and task.exception() is not None:
+                queue.put_nowait((done, task.exception()))
+
+        task = asyncio.create_task(self.run(pump))
+        task.add_done_callback(pump_finished)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is done:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+            await task
+        finally:
+            stop.set()
+            if not task.done():
+                # The consumer stopped early: let the producer reach its next item and
+                # exit, holding a reference until then and logging anything it raises
+                self._pumps.add(task)
+                task.add_done_callback(self._pump_stopped)
+
+    def _pump_stopped(self, task):
+        self._pumps.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ {self.name} stage stream producer failed after its consumer stopped: {task.exception()}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": min(self.pending, self.max_concurrency),
+                "queued": max(0, self.pending - self.max_concurrency),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+# One executor per pipeline stage
+pdf_stage = StageExecutor("pdf", settings.PDF_STAGE_CONCURRENCY)
+llm_stage = StageExecutor("llm", settings.LLM_STAGE_CONCURRENCY)
+classifier_stage = StageExecutor("classifier", settings.CLASSIFIER_STAGE_CONCURRENCY)
+
+
+def stage_stats() -> dict:
+    """Per-stage concurrency counters."""
+    return {stage.name: stage.stats() for stage in (pdf_stage, llm_stage, classifier_stage)}
@@ -0,0 +1,206 @@
+"""
+LRU cache of extracted and cleaned PDF text, keyed by the PDF's SHA-256.
+Extraction and cleaning don't depend on the requested question counts, so
+a "regenerate with more questions" upload of the same file goes straight
+to the LLM stage.
+Head-of-document requests only extract pages until the prompt budget is
+filled; sampled requests read a few pages spread across the document.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.config.settings import settings
+from app.utils.pdf_extractor import (
+    extract_sampled_pages, extract_pages_within_budget, extract_pages_parallel
+)
+from app.services.gemini_service import clean_pdf_text
+from app.services.metrics import timed, record_stage
+from app.utils.text_cleaner import default_cleaner
+
+
+class DocumentText:
+    """
+    Per-page text, the joined raw text and the cleaned text of one PDF.
+    complete is False when only part of the document was extracted.
+    """
+    def __init__(self, pages: list, cleaned_text: str, complete: bool = True):
+        self.pages = pages
+        self.text = "\n".join(pages).strip()
+        self.cleaned_text = cleaned_text
+        self.complete = complete
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held (str payloads only)."""
+        return sum(len(page) for page in self.pages) + len(self.text) + len(self.cleaned_text)
+
+
+class TextCache:
+    """
+    Thread-safe LRU of DocumentText capped by entry count and total text size.
+    """
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, *keys: str):
+        """Return the cached DocumentText for the first of keys present, or None."""
+        with self._lock:
+            for key in keys:
+                document = self._entries.get(key)
+                if document is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return document
+            self.misses += 1
+            return None
+
+    def put(self, key: str, document: DocumentText):
+        """Store a document, evicting least recently used entries past the caps."""
+        size = document.nbytes
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = document
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache in production."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+text_cache = TextCache(
+    max_entries=settings.TEXT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.TEXT_CACHE_MAX_MB * 1024 * 1024
+)
+
+
+def _extract_document(pdf_source, max_chars: int, sample_pages: int) -> DocumentText:
+    """Extract (and clean) the whole document, its head within max_chars, or sampled pages."""
+    if max_chars is None:
+        with timed("extract"):
+            pages = extract_pages_parallel(
+                pdf_source,
+                workers=settings.PDF_EXTRACT_WORKERS,
+                page_timeout=settings.PDF_PAGE_TIMEOUT,
+                min_pages=settings.PDF_PARALLEL_MIN_PAGES,
+                backends=settings.PDF_BACKENDS
+            )
+        if pages is None:
+            return None
+        with timed("clean"):
+            cleaned_text = default_cleaner.clean_pages(pages)
+        return DocumentText(pages, cleaned_text)
+
+    try:
+        if sample_pages:
+            with timed("extract"):
+                pages, page_count = extract_sampled_pages(pdf_source, sample_pages, backends=settings.PDF_BACKENDS)
+            # Give each sampled page an equal share of the prompt budget
+            share = max(1, max_chars // max(1, len(pages)))
+            with timed("clean"):
+                cleaned_pages = [clean_pdf_text(page)[:share] for page in pages]
+            cleaned_text = "\n\n".join(page for page in cleaned_pages if page)
+            return DocumentText(pages, cleaned_text, complete=len(pages) == page_count)
+
+        # Pages are cleaned as they are read to measure the budget; that
+        # time belongs to the "clean" stage, not "extract"
+        clean_seconds = 0.0
+
+        def measure(page):
+            nonlocal clean_seconds
+            started = time.perf_counter()
+            length = len(clean_pdf_text(page))
+            clean_seconds += time.perf_counter() - started
+            return length
+
+        started = time.perf_counter()
+        pages, complete = extract_pages_within_budget(
+            pdf_source, max_chars, measure=measure, backends=settings.PDF_BACKENDS
+        )
+        record_stage("extract", time.perf_counter() - started - clean_seconds)
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+        return None
+    started = time.perf_counter()
+    cleaned_text = default_cleaner.clean_pages(pages)
+    record_stage("clean", clean_seconds + time.perf_counter() - started)
+    return DocumentText(pages, cleaned_text, complete)
+
+
+def load_document_text(pdf_source, pdf_sha256: str, max_chars: int = None,
+                       sample_pages: int = 0, cache: TextCache = None):
+    """
+    Extracted and cleaned text for a PDF, served from the cache when possible
+    (blocking - run on the PDF stage).
+    max_chars=None extracts the whole document. Otherwise extraction stops
+    once max_chars of cleaned text are collected from the head of the
+    document, or, with sample_pages, from that many pages spread across it.
+    Returns (DocumentText or None if extraction failed, timings dict).
+    """
+    cache = cache or text_cache
+    if max_chars is None:
+        keys = (pdf_sha256,)
+    elif sample_pages:
+        keys = (f"{pdf_sha256}:sample:{sample_pages}:{max_chars}",)
+    else:
+        # The full document serves a head request just as well
+        keys = (f"{pdf_sha256}:head:{max_chars}", pdf_sha256)
+
+    started = time.perf_counter()
+    document = cache.get(*keys)
+    timings = {
+        "hit": document is not None,
+        "lookup_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if document is not None:
+        return document, timings
+
+    print("🧹 Extracting and cleaning PDF text...")
+    started = time.perf_counter()
+    document = _extract_document(pdf_source, max_chars, sample_pages)
+    timings["extract_clean_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    if document is None or not document.text:
+        return None, timings
+
+    timings["pages_extracted"] = len(document.pages)
+    print(f"✅ Text cleaned: {len(document.text)} → {len(document.cleaned_text)} characters "
+          f"from {len(document.pages)} pages")
+
+    # A head extraction that happened to read every page is the full document
+    key = pdf_sha256 if document.complete and not sample_pages else keys[0]
+    cache.put(key, document)
+    return document, timings
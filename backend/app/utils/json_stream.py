@@ -0,0 +1,101 @@
+"""
+Incremental parser for streamed quiz JSON.
+Emits each question object from the top-level "multiple_choice",
+"true_false" and "identification" arrays as soon as its closing brace
+arrives, without waiting for the rest of the document.
+"""
+
+import json
+
+
+class QuizStreamParser:
+    """
+    Feed text fragments with feed(); it returns the (array_name, item) pairs
+    completed by that fragment. Anything before the first '{' (such as a
+    ```json fence) is ignored, as are items that fail to parse.
+    """
+    def __init__(self, array_names=("multiple_choice", "true_false", "identification")):
+        self.array_names = set(array_names)
+        self._text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._current_array = None
+        self._item_start = None
+        self.errors = 0
+
+    def feed(self, fragment: str) -> list:
+        self._text += fragment
+        completed = []
+        text = self._text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    # A string directly inside the root object may be a key
+                    if len(self._stack) == 1:
+                        self._last_key = text[self._string_start + 1:self._pos]
+                self._pos += 1
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._string_start = self._pos
+            elif char in "{[":
+                if not self._stack and char == "[":
+                    pass  # stray text before the root object
+                else:
+                    self._stack.append(char)
+                    depth = len(self._stack)
+                    if depth == 2 and char == "[":
+                        self._current_array = self._last_key
+                    elif depth == 3 and char == "{" and self._stack[1] == "[":
+                        self._item_start = self._pos
+            elif char in "}]":
+                if self._stack:
+                    depth = len(self._stack)
+                    self._stack.pop()
+                    if depth == 3 and char == "}" and self._item_start is not None:
+                        item = self._parse_item(text[self._item_start:self._pos + 1])
+                        if item is not None and self._current_array in self.array_names:
+                            completed.append((self._current_array, item))
+                        self._item_start = None
+                    elif depth == 2:
+                        self._current_array = None
+            self._pos += 1
+
+        self._compact()
+        return completed
+
+    def _parse_item(self, raw: str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return None
+
+    def _compact(self):
+        """Drop text that can no longer be part of an unfinished item."""
+        keep_from = self._pos
+        if self._item_start is not None:
+            keep_from = self._item_start
+        if self._in_string and self._string_start is not None:
+            keep_from = min(keep_from, self._string_start)
+        if keep_from > 0:
+            self._text = self._text[keep_from:]
+            self._pos -= keep_from
+            if self._item_start is not None:
+                self._item_start -= keep_from
+            if self._string_start is not None:
+                self._string_start -= keep_from
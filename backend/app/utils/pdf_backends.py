@@ -0,0 +1,180 @@
+"""
+PDF text extraction backends.
+PyPDF2 is always available; pypdfium2 and pdfminer.six are used when
+installed. Every backend opens a document from bytes and exposes the same
+page_count / page_text(index) interface, so pdf_extractor can switch
+between them or fall back from one to the next.
+"""
+
+import importlib.util
+import io
+from abc import ABC, abstractmethod
+import threading
+from typing import List
+
+# Preference order when no explicit order is configured
+DEFAULT_BACKENDS = ("pypdf2", "pypdfium2", "pdfminer")
+
+
+class PdfDocumentHandle(ABC):
+    """An open document: page_count and page_text(index), closed by close()."""
+    page_count = 0
+
+    @abstractmethod
+    def page_text(self, index: int) -> str:
+        """Extracted text of page index ("" if the page has none)."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PdfBackend(ABC):
+    """Base class; subclasses set name/module and implement open()."""
+    name = ""
+    module = ""
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    @abstractmethod
+    def open(self, pdf_bytes: bytes) -> PdfDocumentHandle:
+        """Open a document from its bytes (raises if this backend can't parse it)."""
+
+
+class _PyPDF2Document(PdfDocumentHandle):
+    def __init__(self, pdf_bytes: bytes):
+        import PyPDF2
+        self._reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        self.page_count = len(self._reader.pages)
+
+    def page_text(self, index: int) -> str:
+        return self._reader.pages[index].extract_text() or ""
+
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, pdf_bytes: bytes) -> PdfDocumentHandle:
+        return _PyPDF2Document(pdf_bytes)
+
+
+class _PdfiumDocument(PdfDocumentHandle):
+    def __init__(self, pdf_bytes: bytes):
+        import pypdfium2
+        self._document = pypdfium2.PdfDocument(pdf_bytes)
+        self.page_count = len(self._document)
+
+    def page_text(self, index: int) -> str:
+        page = self._document[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range().replace("\r\n", "\n")
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+    def close(self):
+        self._document.close()
+
+
+class PdfiumBackend(PdfBackend):
+    """Google's PDFium through pypdfium2 (C++, much faster than pure Python)."""
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def open(self, pdf_bytes: bytes) -> PdfDocumentHandle:
+        return _PdfiumDocument(pdf_bytes)
+
+
+class _PdfMinerDocument(PdfDocumentHandle):
+    def __init__(self, pdf_bytes: bytes):
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfinterp import PDFResourceManager
+
+        self._document = PDFDocument(PDFParser(io.BytesIO(pdf_bytes)))
+        self._pages = list(PDFPage.create_pages(self._document))
+        self._resources = PDFResourceManager()
+        self.page_count = len(self._pages)
+
+    def page_text(self, index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        output = io.StringIO()
+        device = TextConverter(self._resources, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(self._resources, device).process_page(self._pages[index])
+        finally:
+            device.close()
+        # pdfminer ends every page with a form feed
+        return output.getvalue().rstrip("\f")
+
+
+class PdfMinerBackend(PdfBackend):
+    """pdfminer.six layout analysis (slower, but good word spacing)."""
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, pdf_bytes: bytes) -> PdfDocumentHandle:
+        return _PdfMinerDocument(pdf_bytes)
+
+
+BACKENDS = {backend.name: backend for backend in (PyPDF2Backend(), PdfiumBackend(), PdfMinerBackend())}
+
+# How often each backend served a document or failed and handed over to the next one
+_usage_lock = threading.Lock()
+_usage = {name: {"used": 0, "failed": 0} for name in BACKENDS}
+
+
+def resolve_backends(names=None) -> List[PdfBackend]:
+    """
+    Installed backends in the given preference order (default DEFAULT_BACKENDS).
+    Unknown or missing backends are skipped; PyPDF2 is always kept as the last resort.
+    """
+    backends = []
+    for name in names or DEFAULT_BACKENDS:
+        backend = BACKENDS.get(name.strip().lower())
+        if backend is not None and backend not in backends and backend.is_available():
+            backends.append(backend)
+    if BACKENDS["pypdf2"] not in backends:
+        backends.append(BACKENDS["pypdf2"])
+    return backends
+
+
+def check_backend_names(names) -> List[str]:
+    """
+    Startup check of a configured preference order: raises ValueError on an
+    unknown name, returns the known backends that are not installed.
+    """
+    unknown = [name for name in names if name.strip().lower() not in BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown PDF_BACKENDS: {', '.join(unknown)} (expected {', '.join(BACKENDS)})")
+    return [name for name in names if not BACKENDS[name.strip().lower()].is_available()]
+
+
+def record_backend_result(name: str, ok: bool):
+    with _usage_lock:
+        _usage[name]["used" if ok else "failed"] += 1
+
+
+def backend_stats(names=None) -> dict:
+    """Configured order, installed backends and per-backend usage counters."""
+    with _usage_lock:
+        usage = {name: dict(counts) for name, counts in _usage.items()}
+    return {
+        "order": [backend.name for backend in resolve_backends(names)],
+        "installed": [name for name, backend in BACKENDS.items() if backend.is_available()],
+        "usage": usage,
+    }
@@ -1,25 +1,296 @@
-import PyPDF2
-from typing import Optional
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, List, Optional, Sequence, Tuple, Union
 
-def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
+from app.utils.pdf_backends import BACKENDS, resolve_backends, record_backend_result
+
+PdfSource = Union[str, bytes, BinaryIO]
+
+# Page ranges handed to each worker per document (more ranges = better balancing,
+# but every range re-parses the PDF's cross-reference table)
+RANGES_PER_WORKER = 2
+
+def _read_source(pdf_source: PdfSource) -> bytes:
+    """The PDF's bytes from a path, bytes, or a binary file object positioned at its start."""
+    if isinstance(pdf_source, bytes):
+        return pdf_source
+    if isinstance(pdf_source, str):
+        with open(pdf_source, 'rb') as file:
+            return file.read()
+    return pdf_source.read()
+
+def _extract_with_fallback(pdf_source: PdfSource, backends: Optional[Sequence[str]], extract: Callable):
+    """
+    Run extract(document) -> (pages, extra) with each backend in preference
+    order until one succeeds and finds some text. A backend that raises or
+    returns only empty pages hands over to the next; if none finds text the
+    last empty result is returned (e.g. a scanned PDF).
+    """
+    pdf_bytes = _read_source(pdf_source)
+    result = None
+    last_error = None
+    for backend in resolve_backends(backends):
+        try:
+            with backend.open(pdf_bytes) as document:
+                candidate = extract(document)
+        except Exception as e:
+            print(f"⚠️ PDF backend {backend.name} failed: {e}")
+            record_backend_result(backend.name, False)
+            last_error = e
+            continue
+        if any(page.strip() for page in candidate[0]):
+            record_backend_result(backend.name, True)
+            return candidate
+        record_backend_result(backend.name, False)
+        result = candidate
+    if result is None:
+        raise last_error
+    return result
+
+def sample_page_indices(page_count: int, sample_count: int) -> List[int]:
+    """`sample_count` page indices spread evenly across the document (first and last included)."""
+    if sample_count >= page_count:
+        return list(range(page_count))
+    if sample_count <= 1:
+        return [0] if page_count else []
+    step = (page_count - 1) / (sample_count - 1)
+    return sorted({round(i * step) for i in range(sample_count)})
+
+def extract_sampled_pages(
+    pdf_source: PdfSource,
+    sample_count: int,
+    backends: Sequence[str] = None
+) -> Tuple[List[str], int]:
+    """
+    Extract `sample_count` pages spread evenly across the document.
+
+    Returns:
+        (page texts in document order, total page count)
+    """
+    def extract(document):
+        indices = sample_page_indices(document.page_count, sample_count)
+        return [document.page_text(index) for index in indices], document.page_count
+
+    return _extract_with_fallback(pdf_source, backends, extract)
+
+def extract_pages_within_budget(
+    pdf_source: PdfSource,
+    max_chars: int,
+    measure: Callable[[str], int] = len,
+    backends: Sequence[str] = None
+) -> Tuple[List[str], bool]:
+    """
+    Extract pages from the start of the document until `max_chars` worth
+    of text (as counted by `measure`, e.g. the cleaned length) is collected.
+
+    Returns:
+        (page texts, True if every page was read)
+    """
+    def extract(document):
+        pages = []
+        collected = 0
+        for index in range(document.page_count):
+            text = document.page_text(index)
+            pages.append(text)
+            collected += measure(text)
+            if collected >= max_chars:
+                break
+        return pages, len(pages) == document.page_count
+
+    return _extract_with_fallback(pdf_source, backends, extract)
+
+def extract_pages_from_pdf(pdf_source: PdfSource, backends: Sequence[str] = None) -> Optional[List[str]]:
+    """
+    Extract the text of each page of a PDF file.
+
+    Args:
+        pdf_source: Path to the PDF file, its bytes, or a binary file object positioned at its start
+        backends: Backend names in preference order (default: pypdf2, then any installed fallbacks)
+
+    Returns:
+        List with one string per page, or None if extraction fails
+    """
+    try:
+        pages, _ = _extract_with_fallback(
+            pdf_source, backends,
+            lambda document: ([document.page_text(index) for index in range(document.page_count)], None)
+        )
+        return pages
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+        return None
+
+def extract_text_from_pdf(pdf_source: PdfSource, backends: Sequence[str] = None) -> Optional[str]:
     """
     Extract text content from a PDF file.
-    
+
     Args:
-        pdf_path: Path to the PDF file
-        
+        pdf_source: Path to the PDF file, its bytes, or a binary file object positioned at its start
+        backends: Backend names in preference order (default: pypdf2, then any installed fallbacks)
+
     Returns:
         Extracted text as string, or None if extraction fails
     """
+    pages = extract_pages_from_pdf(pdf_source, backends)
+    if pages is None:
+        return None
+    return "\n".join(pages).strip()
+
+
+class PageTimeout(Exception):
+    """Raised inside a worker when one page takes longer than the per-page timeout."""
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int, page_timeout: float,
+                        backend_name: str) -> Tuple[List[str], List[int]]:
+    """
+    Worker: extract pages [start, stop) with the named backend. A page that
+    exceeds page_timeout seconds is returned as "" and reported in the second list.
+    """
+    document = BACKENDS[backend_name].open(pdf_bytes)
+    use_alarm = bool(page_timeout) and hasattr(signal, "setitimer")
+    previous_handler = signal.signal(signal.SIGALRM, _raise_page_timeout) if use_alarm else None
+    pages = []
+    timed_out = []
+    try:
+        for index in range(start, stop):
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                pages.append(document.page_text(index))
+            except PageTimeout:
+                pages.append("")
+                timed_out.append(index)
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+        document.close()
+    return pages, timed_out
+
+def _page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `parts` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, page_count))
+    base, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + base + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared extraction pool, (re)created on first use or when the size changes."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: workers only import this module, never the web app or the BERT model
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+def shutdown_extraction_pool():
+    """Stop the worker processes (called on application shutdown)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+def extract_pages_parallel(
+    pdf_source: PdfSource,
+    workers: int,
+    page_timeout: float = None,
+    min_pages: int = 0,
+    backends: Sequence[str] = None
+) -> Optional[List[str]]:
+    """
+    Extract every page using a reusable process pool: pages are split into
+    ranges, extracted concurrently and reassembled in order. Documents
+    shorter than min_pages (or workers <= 1) are extracted in-process.
+
+    Args:
+        pdf_source: Path to the PDF file, its bytes, or a binary file object positioned at its start
+        workers: Number of worker processes
+        page_timeout: Seconds allowed per page; slower pages come back empty
+        min_pages: Smallest document worth the inter-process overhead
+        backends: Backend names in preference order; workers use the first one
+            that opens the file, and the rest are fallbacks if it fails
+
+    Returns:
+        List with one string per page, or None if extraction fails
+    """
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+        pdf_bytes = _read_source(pdf_source)
     except Exception as e:
         print(f"Error extracting PDF text: {e}")
-        return None
\ No newline at end of file
+        return None
+
+    chain = [backend.name for backend in resolve_backends(backends)]
+    primary = None
+    for name in chain:
+        try:
+            with BACKENDS[name].open(pdf_bytes) as document:
+                page_count = document.page_count
+            primary = name
+            break
+        except Exception as e:
+            print(f"⚠️ PDF backend {name} failed: {e}")
+            record_backend_result(name, False)
+    if primary is None:
+        print("Error extracting PDF text: no backend could open the file")
+        return None
+    fallbacks = chain[chain.index(primary) + 1:]
+
+    if workers <= 1 or page_count < max(2, min_pages):
+        return extract_pages_from_pdf(pdf_bytes, chain[chain.index(primary):])
+
+    try:
+        pool = _get_pool(workers)
+        ranges = _page_ranges(page_count, workers * RANGES_PER_WORKER)
+        futures = [
+            pool.submit(_extract_page_range, pdf_bytes, start, stop, page_timeout, primary)
+            for start, stop in ranges
+        ]
+        pages = []
+        for (start, stop), future in zip(ranges, futures):
+            try:
+                # Backstop in case a worker can't be interrupted by its own page alarm
+                wait = None if not page_timeout else page_timeout * (stop - start) + 5
+                range_pages, timed_out = future.result(timeout=wait)
+            except FutureTimeout:
+                print(f"⚠️ Pages {start + 1}-{stop} timed out, skipping them")
+                range_pages, timed_out = [""] * (stop - start), []
+            if timed_out:
+                print(f"⚠️ Skipped slow pages: {', '.join(str(index + 1) for index in timed_out)}")
+            pages.extend(range_pages)
+    except BrokenProcessPool as e:
+        # A worker died; start a fresh pool next time and finish this document in-process
+        print(f"⚠️ PDF extraction pool failed ({e}), extracting in-process")
+        shutdown_extraction_pool()
+        return extract_pages_from_pdf(pdf_bytes, chain[chain.index(primary):])
+    except Exception as e:
+        print(f"⚠️ PDF backend {primary} failed: {e}")
+        record_backend_result(primary, False)
+        return extract_pages_from_pdf(pdf_bytes, fallbacks) if fallbacks else None
+
+    if not any(page.strip() for page in pages) and fallbacks:
+        record_backend_result(primary, False)
+        return extract_pages_from_pdf(pdf_bytes, fallbacks)
+    record_backend_result(primary, True)
+    return pages
@@ -0,0 +1,146 @@
+"""
+Metadata filter for generated and imported questions.
+
+The rules are compiled once. A whole quiz or question bank is validated
+with a single scan: every question and choice is lowercased, joined with
+separators no rule can match across, and searched for the rules' keywords
+(every rule needs at least one of them, and a literal alternation is much
+cheaper to scan for than the rules themselves). Only texts containing a
+keyword are tried against the combined rule pattern, and only real hits
+are re-checked rule by rule, which reports the same first reason
+(question before choices, rules in list order) as the original per-item loop.
+"""
+
+import bisect
+import re
+from typing import List, Optional
+
+# (code, pattern, reason, keywords) - matched against lowercased text, checked
+# in order. A rule can only match text containing one of its keywords;
+# None means "no such keyword", and then every text is tried against the rules.
+METADATA_RULES = [
+    ("lesson_number", r'\blesson\s+\d+\b', "References lesson number", ("lesson",)),
+    ("module_number", r'\bmodule\s+\d+\b', "References module number", ("module",)),
+    ("chapter_number", r'\bchapter\s+\d+\b', "References chapter number", ("chapter",)),
+    ("figure_number", r'\bfigure\s+\d+', "References figure number", ("figure",)),
+    ("section_number", r'\bsection\s+\d+', "References section number", ("section",)),
+    ("table_number", r'\btable\s+\d+', "References table number", ("table",)),
+    ("covered_in", r'what.*covered in', "Asks about document structure", ("covered in",)),
+    ("according_to", r'according to (the )?(lesson|module|figure|chapter)', "References document structure",
+     ("according to",)),
+    ("in_structure", r'in (lesson|module|chapter|section)\s+\d+', "References document structure",
+     ("lesson", "module", "chapter", "section")),
+    ("section_discusses", r'(lesson|module|chapter).+discusses?', "Asks what section discusses",
+     ("lesson", "module", "chapter")),
+]
+
+QUESTION_TYPES = ("multiple_choice", "true_false", "identification")
+
+# Between texts in a batch scan: \s can cross the newlines but no rule
+# continues into the NUL, and "." stops at the newline
+_SEPARATOR = "\n\x00\n"
+
+
+class QuestionValidator:
+    """Compiled METADATA_RULES (or a custom rule list) for single questions and whole batches."""
+    def __init__(self, rules: list = None):
+        rules = rules or METADATA_RULES
+        self.rules = [(code, re.compile(pattern), reason) for code, pattern, reason, _ in rules]
+        self._combined = re.compile("|".join(f"(?:{pattern})" for _, pattern, _, _ in rules))
+
+        if all(keywords for *_, keywords in rules):
+            keywords = sorted({word for *_, words in rules for word in words}, key=len, reverse=True)
+            self._keywords = re.compile("|".join(re.escape(word) for word in keywords))
+        else:
+            self._keywords = None
+
+    def _first_rule(self, text_lower: str) -> Optional[tuple]:
+        for code, pattern, reason in self.rules:
+            match = pattern.search(text_lower)
+            if match:
+                return code, reason, match.group(0)
+        return None
+
+    def _rejection(self, question: str, choices: list = None) -> Optional[dict]:
+        """The first rule hit, question first and then choices in order (None = valid)."""
+        fields = [("question", None, question)]
+        fields += [("choice", i, choice) for i, choice in enumerate(choices or [])]
+        for field, choice_index, text in fields:
+            hit = self._first_rule(str(text).lower())
+            if hit:
+                code, reason, matched = hit
+                prefix = "Question" if field == "question" else f"Choice {choice_index + 1}"
+                return {
+                    "field": field,
+                    "choice_index": choice_index,
+                    "rule": code,
+                    "reason": f"{prefix}: {reason}",
+                    "match": matched,
+                }
+        return None
+
+    def check(self, question: str, choices: list = None) -> Optional[dict]:
+        """Structured rejection for one question, or None if it is valid."""
+        return self.validate_batch([{"question": question, "choices": choices}])[0]
+
+    def validate_batch(self, items: List[dict]) -> List[Optional[dict]]:
+        """
+        Rejections aligned with items (dicts with "question" and optional
+        "choices"), None for valid items. One scan covers every question
+        and choice in the batch.
+        """
+        owners = []
+        offsets = []
+        pieces = []
+        position = 0
+        for index, item in enumerate(items):
+            for text in [item.get("question", "")] + list(item.get("choices") or []):
+                piece = str(text).lower()
+                owners.append(index)
+                offsets.append(position)
+                pieces.append(piece)
+                position += len(piece) + len(_SEPARATOR)
+
+        text = _SEPARATOR.join(pieces)
+        if self._keywords is None:
+            hits = {bisect.bisect_right(offsets, match.start()) - 1 for match in self._combined.finditer(text)}
+        else:
+            candidates = {bisect.bisect_right(offsets, match.start()) - 1 for match in self._keywords.finditer(text)}
+            hits = {piece for piece in candidates if self._combined.search(pieces[piece])}
+        flagged = {owners[piece] for piece in hits}
+
+        results = [None] * len(items)
+        for index in flagged:
+            item = items[index]
+            results[index] = self._rejection(item.get("question", ""), item.get("choices"))
+        return results
+
+    def filter_quiz(self, quiz_data: dict) -> tuple:
+        """
+        (validated quiz, rejections) for a quiz dict keyed by question type.
+        Each rejection also carries the question's type, index and text.
+        """
+        entries = []
+        for q_type in QUESTION_TYPES:
+            for index, item in enumerate(quiz_data.get(q_type, [])):
+                entries.append((q_type, index, item))
+        checked = self.validate_batch([
+            {
+                "question": item.get("question", ""),
+                "choices": item.get("choices") if q_type == "multiple_choice" else None
+            }
+            for q_type, _, item in entries
+        ])
+
+        validated = {q_type: [] for q_type in QUESTION_TYPES}
+        rejections = []
+        for (q_type, index, item), rejection in zip(entries, checked):
+            if rejection is None:
+                validated[q_type].append(item)
+            else:
+                rejections.append({"type": q_type, "index": index, "question": item.get("question", ""), **rejection})
+        return validated, rejections
+
+
+# Singleton instance
+question_validator = QuestionValidator()
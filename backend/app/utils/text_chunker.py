@@ -0,0 +1,89 @@
+"""
+Split cleaned document text into prompt-sized chunks and share question
+counts across them for whole-document (map-reduce) quiz generation.
+"""
+
+import re
+
+# Rough characters-per-token ratio used for prompt budgets
+CHARS_PER_TOKEN = 4
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list:
+    """
+    Split text into chunks of at most max_tokens (estimated), breaking on
+    paragraph boundaries, then sentence boundaries, then hard limits.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    chunks = []
+    current = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        if current:
+            chunks.append("\n\n".join(current))
+        current = []
+        current_len = 0
+
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        # Oversized paragraphs are broken into sentence-sized pieces
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            pieces = _split_long_paragraph(paragraph, max_chars)
+
+        for piece in pieces:
+            if current and current_len + len(piece) + 2 > max_chars:
+                flush()
+            current.append(piece)
+            current_len += len(piece) + 2
+
+    flush()
+    return chunks
+
+
+def _split_long_paragraph(paragraph: str, max_chars: int) -> list:
+    """Break one paragraph on sentence ends, hard-splitting any sentence that is still too long."""
+    pieces = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def select_chunks(chunks: list, count: int) -> list:
+    """Pick `count` chunks spread evenly across the document (first and last included)."""
+    if count >= len(chunks):
+        return list(chunks)
+    if count <= 1:
+        return chunks[:1]
+    step = (len(chunks) - 1) / (count - 1)
+    return [chunks[round(i * step)] for i in range(count)]
+
+
+def allocate_counts(total: int, parts: int, offset: int = 0) -> list:
+    """
+    Split `total` into `parts` integers that differ by at most one.
+    The leftover units go to parts starting at `offset`, so several
+    allocations can rotate which chunks get the extras.
+    """
+    base, extra = divmod(max(0, total), parts)
+    counts = [base] * parts
+    for i in range(extra):
+        counts[(offset + i) % parts] += 1
+    return counts
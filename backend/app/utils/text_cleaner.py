@@ -0,0 +1,235 @@
+"""
+Precompiled cleaning engine for extracted PDF text.
+
+The rules are compiled once at import into an ordered list of stages. A
+stage merges rules whose relative order can't change the result into one
+alternation, and every stage is guarded by a lookahead on the characters
+its matches can start with, so the regex engine skips most positions
+without trying the full pattern. Text can be cleaned as one string or as
+a stream of pages: the stream is cut into segments at line breaks that no
+stage can match or remove (judged from the characters matches can start
+and end with), and each segment is cleaned on its own.
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# Inline letters for the flags a rule may scope to itself inside a merged pattern
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+# The only non-ASCII letters IGNORECASE matches against ASCII ones (see the re docs)
+_ASCII_CASE_FOLDS = "\u0130\u0131\u017f\u212a"
+
+
+class CleanRule:
+    """
+    One regex substitution. Patterns must not use numbered backreferences
+    (groups are renumbered when rules are merged).
+
+    starts: every character a match can begin with; for IGNORECASE rules
+    they must be ASCII or uncased, and everything the regex engine folds
+    them to is added ("s" also covers "S" and "ſ"). "0123456789" stands for
+    every Unicode digit. It drives the lookahead guard and tells the
+    streaming cleaner which line starts are safe to cut before; None means
+    "could be anything", which disables both.
+
+    ends: every character other than a digit that can be the last
+    non-whitespace character of a match ("" if matches are whitespace
+    only). The streaming cleaner won't cut after a line ending in one of
+    them; None means "could be anything", which disables streaming.
+
+    A match may only contain a newline inside whitespace that runs into a
+    digit, a start character of the rule set or another newline, or in
+    whitespace after its last non-whitespace character.
+    """
+    def __init__(self, name: str, pattern: str, replacement: str = "", flags: int = 0,
+                 starts: str = None, ends: str = None):
+        unsupported = flags & ~sum(flag for flag, _ in _SCOPED_FLAGS)
+        if unsupported:
+            raise ValueError(f"Rule {name!r} uses flags that can't be scoped: {unsupported}")
+        if starts and flags & re.IGNORECASE and any(not char.isascii() and char.lower() != char.upper() for char in starts):
+            raise ValueError(f"Rule {name!r} has non-ASCII cased start characters: {starts!r}")
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.flags = flags
+        self.starts = starts
+        self.ends = ends
+
+    def scoped_pattern(self) -> str:
+        """The pattern with its flags applied inline, so it can share a regex with other rules."""
+        letters = "".join(letter for flag, letter in _SCOPED_FLAGS if self.flags & flag)
+        return f"(?{letters}:{self.pattern})" if letters else f"(?:{self.pattern})"
+
+    def start_chars(self) -> set:
+        if not self.flags & re.IGNORECASE:
+            return set(self.starts)
+        candidates = set(self.starts.lower() + self.starts.upper() + _ASCII_CASE_FOLDS)
+        return {
+            candidate for candidate in candidates
+            if any(re.fullmatch(re.escape(char), candidate, re.IGNORECASE) for char in self.starts)
+        }
+
+
+def _char_class(chars: set) -> str:
+    """A regex class for a rule set's start characters."""
+    digits = set("0123456789")
+    shorthand = ""
+    if digits <= chars:
+        chars, shorthand = chars - digits, r"\d"
+    return "[" + shorthand + "".join(re.escape(char) for char in sorted(chars)) + "]"
+
+
+def _compile_stage(rules: List[CleanRule]) -> tuple:
+    """(compiled regex, replacement) for one stage."""
+    if len(rules) == 1:
+        pattern = rules[0].scoped_pattern()
+    else:
+        pattern = "|".join(f"(?P<r{i}>{rule.scoped_pattern()})" for i, rule in enumerate(rules))
+
+    # A leading literal is already scanned for quickly; a case-insensitive
+    # or merged pattern isn't, so guard it with its possible first characters
+    needs_guard = len(rules) > 1 or any(rule.flags & re.IGNORECASE for rule in rules)
+    if needs_guard and all(rule.starts for rule in rules):
+        chars = set().union(*(rule.start_chars() for rule in rules))
+        pattern = f"(?={_char_class(chars)})(?:{pattern})"
+
+    replacements = {f"r{i}": rule.replacement for i, rule in enumerate(rules)}
+    if len(set(replacements.values())) == 1:
+        return re.compile(pattern), rules[0].replacement
+    return re.compile(pattern), lambda match: replacements[match.lastgroup]
+
+
+class TextCleaner:
+    """
+    Applies an ordered list of stages (each a list of CleanRules).
+    clean() works on one string; clean_pages() / iter_clean() on extractor output.
+    """
+    def __init__(self, stages: List[List[CleanRule]], segment_chars: int = 64 * 1024):
+        self.stages = [list(stage) for stage in stages]
+        self.segment_chars = segment_chars
+        self._compiled = [_compile_stage(stage) for stage in self.stages]
+
+        rules = [rule for stage in self.stages for rule in stage]
+        if any(rule.starts is None or rule.ends is None for rule in rules):
+            self._blocked = self._ends = None
+        else:
+            self._blocked = set("".join(rule.starts for rule in rules).casefold())
+            self._ends = set("".join(rule.ends for rule in rules))
+
+    def with_stage(self, *rules: CleanRule) -> "TextCleaner":
+        """A new cleaner that runs the given rules (merged) after this rule set."""
+        return TextCleaner(self.stages + [list(rules)], self.segment_chars)
+
+    def _clean_segment(self, text: str, sentinel: str = "") -> str:
+        # The sentinel (the next segment's first character) gives rules at the
+        # end of this segment the same right-hand context as in the full text
+        text += sentinel
+        for regex, replacement in self._compiled:
+            text = regex.sub(replacement, text)
+        return text[:-1] if sentinel else text
+
+    def clean(self, text: str) -> str:
+        """Clean one string."""
+        return self._clean_segment(text).strip()
+
+    def _find_cut(self, text: str, start: int = 0) -> int:
+        """
+        The last line start in text that no stage can match across, or 0
+        (only newlines at or after start are considered). The line must begin
+        with a letter no rule starts with, and the line before it must end
+        (ignoring whitespace) in a character no match ends with: then no stage
+        can match or remove the newline between them, even after earlier
+        stages have rewritten the text around it.
+        """
+        position = len(text)
+        while True:
+            position = text.rfind("\n", start, position)
+            if position < 0:
+                return 0
+            first = text[position + 1:position + 2]
+            if not first.isalpha() or first.casefold() in self._blocked:
+                continue
+            last = text[text.rfind("\n", 0, position) + 1:position].rstrip()[-1:]
+            if last and not last.isdigit() and last not in self._ends:
+                return position + 1
+
+    def iter_clean(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Clean "\\n".join(pages).strip() incrementally, yielding pieces whose
+        concatenation equals clean() of the joined text. About segment_chars
+        of raw text is held at a time (more if no safe cut point turns up).
+        """
+        pending = ""
+        # Line starts before this were already found unsafe, and stay unsafe
+        searched = 0
+        started = False
+        held_whitespace = ""
+
+        def emit(piece: str):
+            nonlocal started, held_whitespace
+            if not started:
+                piece = piece.lstrip()
+                if not piece:
+                    return
+                started = True
+            # Hold trailing whitespace back until we know more text follows
+            body = piece.rstrip()
+            if body:
+                yield held_whitespace + body
+                held_whitespace = piece[len(body):]
+            else:
+                held_whitespace += piece
+
+        first_page = True
+        for page in pages:
+            pending = page if first_page else pending + "\n" + page
+            if first_page:
+                pending = pending.lstrip()
+                first_page = not pending
+
+            if self._blocked is not None and len(pending) >= self.segment_chars:
+                cut = self._find_cut(pending, searched)
+                if cut:
+                    segment, pending = pending[:cut], pending[cut:]
+                    yield from emit(self._clean_segment(segment, pending[0]))
+                # A trailing newline is judged again once the next line starts
+                searched = max(0, len(pending) - 1)
+
+        yield from emit(self._clean_segment(pending.rstrip()))
+
+    def clean_pages(self, pages: Iterable[str]) -> str:
+        """Clean extractor output without joining the raw pages first."""
+        return "".join(self.iter_clean(pages))
+
+
+# Same rules, in the same order, as the original ten-pass clean_pdf_text.
+# Page labels and bare page-number lines are merged (neither can create or
+# hide a match for the other), as are the two cross-reference phrasings.
+DEFAULT_STAGES = [
+    # Common metadata patterns
+    [CleanRule("lesson_headings", r'(Lesson|Module|Chapter|Unit)\s+\d+[:\-\.]?\s*',
+               flags=re.IGNORECASE, starts="lmcu", ends=":-.")],
+    [CleanRule("figure_labels", r'(Figure|Fig\.|Table|Diagram)\s+\d+\.?\d*[:\-\.]?\s*',
+               flags=re.IGNORECASE, starts="ftd", ends=":-.")],
+    [CleanRule("section_labels", r'(Section|Part)\s+\d+\.?\d*[:\-\.]?\s*',
+               flags=re.IGNORECASE, starts="sp", ends=":-.")],
+    # Page numbers
+    [CleanRule("page_labels", r'\bPage\s+\d+\b', flags=re.IGNORECASE, starts="p", ends=""),
+     CleanRule("page_number_lines", r'^\d+$', flags=re.MULTILINE, starts="0123456789", ends="")],
+    # Common headers/footers
+    [CleanRule("copyright", r'(Copyright|©|\(c\)).*?\d{4}', flags=re.IGNORECASE, starts="c©(", ends="")],
+    # References to document structure in sentences
+    [CleanRule("structure_references",
+               r'as (shown|discussed|mentioned) in (lesson|module|chapter|figure|section)\s+\d+',
+               flags=re.IGNORECASE, starts="a", ends=""),
+     CleanRule("refer_to_structure", r'refer to (lesson|module|chapter|figure|section)\s+\d+',
+               flags=re.IGNORECASE, starts="r", ends="")],
+    # Multiple whitespaces/newlines (runs of 2+ spaces only: rewriting a
+    # single space with itself doesn't change the text)
+    [CleanRule("blank_lines", r'\n\s*\n', "\n\n", starts="\n", ends="")],
+    [CleanRule("repeated_spaces", r' {2,}', " ", starts=" ", ends="")],
+]
+
+# Singleton instance
+default_cleaner = TextCleaner(DEFAULT_STAGES)
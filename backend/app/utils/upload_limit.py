@@ -0,0 +1,57 @@
+"""
+ASGI middleware that enforces the upload size limit while the request
+body is still arriving, instead of after it has been buffered.
+"""
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+# Allowance for multipart boundaries, part headers and the small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def file_too_large(max_bytes: int) -> HTTPException:
+    """The 413 for an upload over max_bytes, however far it got before being stopped."""
+    return HTTPException(status_code=413, detail=f"File too large (max {round(max_bytes / (1024 * 1024), 1):g}MB)")
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects requests to the given path prefixes with 413 once their body
+    exceeds max_bytes (+ multipart overhead). A declared Content-Length over
+    the limit is refused before reading anything; otherwise the byte count
+    is checked as each body chunk is received.
+    """
+    def __init__(self, app, max_bytes: int, path_prefixes: tuple):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + MULTIPART_OVERHEAD
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.limit:
+            # Same body FastAPI gives the HTTPException raised mid-stream below
+            error = file_too_large(self.max_bytes)
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    # Raised inside the route's form parsing, so FastAPI turns it into a 413
+                    raise file_too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,80 @@
+"""
+Benchmark: Bloom's classifier throughput, per-question loop vs batched.
+
+Run from the backend directory:
+    python -m benchmarks.bench_classifier
+    python -m benchmarks.bench_classifier --sizes 10 100 10000 --loop-limit 1000
+"""
+
+import argparse
+import random
+import time
+
+from app.services.model_registry import registry
+from app.services.embedding_cache import embedding_cache
+from app.services.bert_classifier import (
+    classify_question_detailed, classify_multiple_questions_detailed
+)
+
+TEMPLATES = [
+    "Define {topic}.",
+    "Explain how {topic} works in practice.",
+    "Calculate the running time of {topic} for n = 1000.",
+    "Compare and contrast {topic} with {other}.",
+    "Evaluate whether {topic} is the best choice for a large system.",
+    "Design a new approach that improves on {topic}.",
+    "Which statement about {topic} is correct?",
+    "What would happen if {topic} were replaced by {other}?",
+]
+
+TOPICS = [
+    "hash tables", "binary search", "merge sort", "encapsulation", "recursion",
+    "dynamic programming", "TCP congestion control", "photosynthesis",
+    "supply and demand", "the Krebs cycle", "polymorphism", "normalization",
+]
+
+
+def make_questions(count: int, seed: int = 42) -> list:
+    """
+    Build a reproducible list of distinct synthetic quiz questions
+    (numbered so the embedding cache can't serve repeats).
+    """
+    rng = random.Random(seed)
+    return [
+        f"{i + 1}. " + rng.choice(TEMPLATES).format(topic=rng.choice(TOPICS), other=rng.choice(TOPICS))
+        for i in range(count)
+    ]
+
+
+def run(sizes, loop_limit):
+    registry.load()
+    print(f"{'N':>7} | {'loop q/s':>10} | {'batched q/s':>12} | {'speedup':>8}")
+    print("-" * 47)
+    for size in sizes:
+        questions = make_questions(size)
+
+        loop_rate = None
+        if size <= loop_limit:
+            embedding_cache.clear()
+            started = time.perf_counter()
+            for question in questions:
+                classify_question_detailed(question)
+            loop_rate = size / (time.perf_counter() - started)
+
+        embedding_cache.clear()
+        started = time.perf_counter()
+        classify_multiple_questions_detailed(questions)
+        batch_rate = size / (time.perf_counter() - started)
+
+        loop_col = f"{loop_rate:10.1f}" if loop_rate else f"{'skipped':>10}"
+        speedup = f"{batch_rate / loop_rate:7.1f}x" if loop_rate else f"{'-':>8}"
+        print(f"{size:>7} | {loop_col} | {batch_rate:12.1f} | {speedup}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 10000])
+    parser.add_argument("--loop-limit", type=int, default=1000,
+                        help="skip the per-question loop above this many questions")
+    args = parser.parse_args()
+    run(args.sizes, args.loop_limit)
@@ -0,0 +1,111 @@
+"""
+Benchmark: classifier inference backends (torch, onnx, onnx-int8).
+
+Each backend runs in its own process so import time, model load time and
+peak memory (max RSS) are measured from a cold start, followed by
+single-question latency (p50/p95) and batched throughput. Missing ONNX
+exports are created in a separate process first and not timed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_encoder_backends
+    python -m benchmarks.bench_encoder_backends --backends torch onnx-int8 --single 200 --batch 2000
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+VARIANTS = {
+    "torch": ("torch", False),
+    "onnx": ("onnx", False),
+    "onnx-int8": ("onnx", True),
+}
+
+
+def worker(label: str, single: int, batch: int, prepare_only: bool) -> dict:
+    """Cold-start one backend and measure it (runs in a child process)."""
+    started = time.perf_counter()
+    from app.config.settings import settings
+    from app.services.encoder_backends import encoder_factory
+    from app.services.model_registry import MODEL_NAME
+    from benchmarks.bench_classifier import make_questions
+
+    backend, quantized = VARIANTS[label]
+    load_model = encoder_factory(backend, quantized, settings.ONNX_MODEL_DIR, settings.ONNX_THREADS)
+    import_seconds = time.perf_counter() - started
+
+    step = time.perf_counter()
+    model = load_model(MODEL_NAME)
+    load_seconds = time.perf_counter() - step
+    if prepare_only:
+        return {}
+    model.encode(["Warm-up question."], convert_to_numpy=True)
+
+    latencies = []
+    for question in make_questions(single, seed=1):
+        step = time.perf_counter()
+        model.encode([question], convert_to_numpy=True)
+        latencies.append(time.perf_counter() - step)
+    latencies.sort()
+
+    questions = make_questions(batch, seed=2)
+    step = time.perf_counter()
+    model.encode(questions, convert_to_numpy=True)
+    batch_seconds = time.perf_counter() - step
+
+    return {
+        "import_s": round(import_seconds, 3),
+        "load_s": round(load_seconds, 3),
+        # ru_maxrss is in KiB on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 2),
+        "batch_qps": round(batch / batch_seconds, 1),
+    }
+
+
+def run_worker(label: str, args, prepare_only: bool = False) -> dict:
+    command = [
+        sys.executable, "-m", "benchmarks.bench_encoder_backends", "--worker", label,
+        "--single", str(args.single), "--batch", str(args.batch)
+    ]
+    if prepare_only:
+        command.append("--prepare-only")
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{label} worker failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--single", type=int, default=100, help="questions timed one at a time")
+    parser.add_argument("--batch", type=int, default=1000, help="questions in the throughput batch")
+    parser.add_argument("--worker", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument("--prepare-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.single, args.batch, args.prepare_only)))
+        return
+
+    for label in args.backends:
+        if VARIANTS[label][0] == "onnx":
+            run_worker(label, args, prepare_only=True)
+
+    print(f"{'backend':<10} | {'import s':>8} | {'load s':>7} | {'max RSS MB':>10} | "
+          f"{'p50 ms':>7} | {'p95 ms':>7} | {'batch q/s':>9}")
+    print("-" * 78)
+    for label in args.backends:
+        result = run_worker(label, args)
+        print(f"{label:<10} | {result['import_s']:>8.2f} | {result['load_s']:>7.2f} | {result['max_rss_mb']:>10.1f} | "
+              f"{result['p50_ms']:>7.2f} | {result['p95_ms']:>7.2f} | {result['batch_qps']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
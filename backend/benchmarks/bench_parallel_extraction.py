@@ -0,0 +1,64 @@
+"""
+Benchmark: whole-document PDF extraction with 1, 2, 4 and 8 worker processes.
+The pool is warmed up before timing (it is reused across requests in the app),
+and every parallel result is checked against the serial extraction.
+
+Run from the backend directory:
+    python -m benchmarks.bench_parallel_extraction
+    python -m benchmarks.bench_parallel_extraction --pages 300 --workers 1 2 4 8 --repeat 3
+"""
+
+import argparse
+import io
+import os
+import statistics
+import time
+
+from app.utils.pdf_extractor import (
+    extract_pages_from_pdf, extract_pages_parallel, shutdown_extraction_pool
+)
+from benchmarks.pdf_fixtures import make_text_pdf
+
+
+def time_workers(data: bytes, workers: int, repeat: int) -> tuple:
+    # Warm-up: starts the pool's processes outside the timed runs
+    pages = extract_pages_parallel(io.BytesIO(data), workers=workers)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pages = extract_pages_parallel(io.BytesIO(data), workers=workers)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), pages
+
+
+def run(page_count: int, worker_counts: list, repeat: int):
+    data = make_text_pdf(page_count)
+    expected = extract_pages_from_pdf(io.BytesIO(data))
+    print(f"Fixture: {page_count} pages, {len(data) / 1024:.0f} KB, {os.cpu_count()} CPUs\n")
+
+    print(f"{'workers':>7} | {'median ms':>10} | {'pages/s':>9} | {'speedup':>8} | {'matches serial':>14}")
+    print("-" * 61)
+    baseline = None
+    try:
+        for workers in worker_counts:
+            seconds, pages = time_workers(data, workers, repeat)
+            baseline = baseline or seconds
+            print(
+                f"{workers:>7} | {seconds * 1000:>10.1f} | {page_count / seconds:>9.0f} | "
+                f"{baseline / seconds:>7.2f}x | {str(pages == expected):>14}"
+            )
+    finally:
+        shutdown_extraction_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.pages, args.workers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
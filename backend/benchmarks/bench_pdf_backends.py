@@ -0,0 +1,83 @@
+"""
+Benchmark: PDF extraction backends (PyPDF2, pypdfium2, pdfminer.six).
+For each installed backend, reports pages/second, raw output size and the
+size after clean_pdf_text on a fixture corpus - generated PDFs by default,
+plus any real PDFs in --corpus.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_backends
+    python -m benchmarks.bench_pdf_backends --corpus ~/handouts --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.services.gemini_service import clean_pdf_text
+from app.utils.pdf_backends import BACKENDS
+from benchmarks.pdf_fixtures import make_text_pdf
+
+GENERATED_SIZES = (5, 50, 300)
+
+
+def load_corpus(corpus_dir: str = None) -> list:
+    """(name, pdf bytes) pairs: generated fixtures plus *.pdf files from corpus_dir."""
+    corpus = [(f"generated-{pages}p", make_text_pdf(pages)) for pages in GENERATED_SIZES]
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).expanduser().glob("*.pdf")):
+            corpus.append((path.name, path.read_bytes()))
+    return corpus
+
+
+def extract_all(backend, pdf_bytes: bytes) -> list:
+    with backend.open(pdf_bytes) as document:
+        return [document.page_text(index) for index in range(document.page_count)]
+
+
+def bench_backend(backend, corpus: list, repeat: int) -> list:
+    rows = []
+    for name, pdf_bytes in corpus:
+        timings = []
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                pages = extract_all(backend, pdf_bytes)
+                timings.append(time.perf_counter() - started)
+        except Exception as e:
+            rows.append((name, None, None, None, None, f"failed: {e}"))
+            continue
+        seconds = statistics.median(timings)
+        text = "\n".join(pages).strip()
+        rows.append((name, len(pages), len(pages) / seconds, len(text), len(clean_pdf_text(text)), ""))
+    return rows
+
+
+def run(corpus_dir: str, repeat: int, backend_names: list):
+    corpus = load_corpus(corpus_dir)
+    print(f"Corpus: {len(corpus)} documents\n")
+    print(f"{'backend':<10} | {'document':<24} | {'pages':>5} | {'pages/s':>8} | {'raw chars':>10} | {'cleaned':>10} | note")
+    print("-" * 92)
+    for name in backend_names:
+        backend = BACKENDS[name]
+        if not backend.is_available():
+            print(f"{name:<10} | {'(not installed)':<24} |")
+            continue
+        for document, pages, rate, raw, cleaned, note in bench_backend(backend, corpus, repeat):
+            if pages is None:
+                print(f"{name:<10} | {document:<24} | {'':>5} | {'':>8} | {'':>10} | {'':>10} | {note}")
+            else:
+                print(f"{name:<10} | {document:<24} | {pages:>5} | {rate:>8.0f} | {raw:>10} | {cleaned:>10} | {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of extra PDFs to include")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+    run(args.corpus, args.repeat, args.backends)
+
+
+if __name__ == "__main__":
+    main()
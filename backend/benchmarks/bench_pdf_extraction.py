@@ -0,0 +1,93 @@
+"""
+Benchmark: PDF text extraction on a large document.
+Compares the original extract-everything loop (text += page) with the
+lazy extractor: full document, head-of-document within the prompt budget,
+and pages sampled across the document.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_extraction
+    python -m benchmarks.bench_pdf_extraction --pages 300 --repeat 5 --sample-pages 8
+"""
+
+import argparse
+import io
+import statistics
+import time
+
+import PyPDF2
+
+from app.services.gemini_service import clean_pdf_text, PROMPT_TEXT_CHARS
+from app.utils.pdf_extractor import (
+    extract_pages_from_pdf, extract_pages_within_budget, extract_sampled_pages
+)
+from benchmarks.pdf_fixtures import make_text_pdf
+
+
+def legacy_extract(buffer) -> tuple:
+    """The original extractor: every page, concatenated with +=, then cleaned."""
+    pdf_reader = PyPDF2.PdfReader(buffer)
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return len(pdf_reader.pages), clean_pdf_text(text.strip())
+
+
+def full_extract(buffer) -> tuple:
+    pages = extract_pages_from_pdf(buffer)
+    return len(pages), clean_pdf_text("\n".join(pages).strip())
+
+
+def head_extract(buffer) -> tuple:
+    pages, _ = extract_pages_within_budget(
+        buffer, PROMPT_TEXT_CHARS, measure=lambda page: len(clean_pdf_text(page))
+    )
+    return len(pages), clean_pdf_text("\n".join(pages).strip())
+
+
+def make_sampled_extract(sample_pages: int):
+    def sampled_extract(buffer) -> tuple:
+        pages, _ = extract_sampled_pages(buffer, sample_pages)
+        share = PROMPT_TEXT_CHARS // len(pages)
+        return len(pages), "\n\n".join(clean_pdf_text(page)[:share] for page in pages)
+    return sampled_extract
+
+
+def time_mode(extract, data: bytes, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pages_read, cleaned = extract(io.BytesIO(data))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), pages_read, cleaned
+
+
+def run(page_count: int, repeat: int, sample_pages: int):
+    data = make_text_pdf(page_count)
+    print(f"Fixture: {page_count} pages, {len(data) / 1024:.0f} KB, prompt budget {PROMPT_TEXT_CHARS} chars\n")
+
+    modes = [
+        ("legacy (all pages, +=)", legacy_extract),
+        ("full (lazy pages, join)", full_extract),
+        ("head within budget", head_extract),
+        (f"sampled ({sample_pages} pages)", make_sampled_extract(sample_pages)),
+    ]
+    print(f"{'mode':<26} | {'median ms':>10} | {'pages read':>10} | {'cleaned chars':>13} | {'speedup':>8}")
+    print("-" * 80)
+    baseline = None
+    for name, extract in modes:
+        seconds, pages_read, cleaned = time_mode(extract, data, repeat)
+        baseline = baseline or seconds
+        print(f"{name:<26} | {seconds * 1000:>10.1f} | {pages_read:>10} | {len(cleaned):>13} | {baseline / seconds:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sample-pages", type=int, default=8)
+    args = parser.parse_args()
+    run(args.pages, args.repeat, args.sample_pages)
+
+
+if __name__ == "__main__":
+    main()
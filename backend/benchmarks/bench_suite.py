@@ -0,0 +1,166 @@
+"""
+Offline benchmark suite: PDF extraction, text cleaning, question validation,
+BERT classification and the end-to-end /generate-from-pdf route, each on a
+fixed synthetic workload. The route runs against the fake LLM provider, so
+no network access or API quota is used.
+
+Save a run with --save and compare later runs against it with --compare;
+the suite exits non-zero when any benchmark is more than --tolerance slower
+than the baseline. The route benchmark reports its p50 latency.
+
+Run from the backend directory:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --save baseline.json
+    python -m benchmarks.bench_suite --compare baseline.json --tolerance 0.25
+    python -m benchmarks.bench_suite --only extract clean validate
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.load_test import configure_offline, LocalServer, run_load, wait_until_ready
+from benchmarks.pdf_fixtures import make_text_pdf
+
+# The route benchmark uses a quick fake model so the numbers track our own code
+configure_offline(llm_latency=0.05, llm_tokens_per_second=0)
+
+BENCHMARKS = ("extract", "clean", "validate", "classify", "route")
+
+
+def median_seconds(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bench_extract(args) -> dict:
+    from app.utils.pdf_extractor import extract_pages_from_pdf
+
+    pdf_bytes = make_text_pdf(args.pages)
+    seconds = median_seconds(lambda: extract_pages_from_pdf(pdf_bytes), args.repeat)
+    return {"metric": "ms", "value": seconds * 1000, "detail": f"{args.pages} pages, {args.pages / seconds:.0f} pages/s"}
+
+
+def bench_clean(args) -> dict:
+    from app.utils.pdf_extractor import extract_pages_from_pdf
+    from app.utils.text_cleaner import default_cleaner
+
+    pages = extract_pages_from_pdf(make_text_pdf(args.pages))
+    text = "\n".join(pages)
+    seconds = median_seconds(lambda: default_cleaner.clean(text), args.repeat)
+    return {"metric": "ms", "value": seconds * 1000, "detail": f"{len(text) / seconds / 1e6:.1f} MB/s"}
+
+
+def bench_validate(args) -> dict:
+    from app.utils.question_validator import question_validator
+    from benchmarks.parity_question_validator import make_bank
+
+    items = make_bank(random.Random(0), args.questions * 10)
+    seconds = median_seconds(lambda: question_validator.validate_batch(items), args.repeat)
+    return {"metric": "ms", "value": seconds * 1000, "detail": f"{len(items)} items, {len(items) / seconds:.0f} items/s"}
+
+
+def bench_classify(args) -> dict:
+    from app.services.model_registry import registry
+    from app.services.embedding_cache import embedding_cache
+    from app.services.bert_classifier import classify_multiple_questions
+    from benchmarks.bench_classifier import make_questions
+
+    registry.load()
+    questions = make_questions(args.questions)
+
+    def classify():
+        embedding_cache.clear()
+        classify_multiple_questions(questions)
+
+    seconds = median_seconds(classify, args.repeat)
+    return {"metric": "ms", "value": seconds * 1000, "detail": f"{len(questions)} questions, {len(questions) / seconds:.0f} q/s"}
+
+
+def bench_route(args) -> dict:
+    pdf_bytes = make_text_pdf(args.pages)
+    fields = {"title": "Benchmark", "cache_mode": "bypass"}
+    with LocalServer() as server:
+        wait_until_ready(server.url)
+        run_load(server.url, pdf_bytes, 2, 1, fields, unique=True)
+        report = run_load(server.url, pdf_bytes, args.route_requests, args.concurrency, fields, unique=True)
+    if report["succeeded"] != report["requests"]:
+        raise RuntimeError(f"route benchmark had failed requests: {report['statuses']}")
+    return {
+        "metric": "ms",
+        "value": report["p50_ms"],
+        "detail": f"p95 {report['p95_ms']:.0f} ms, p99 {report['p99_ms']:.0f} ms, {report['rps']:.1f} req/s "
+                  f"at concurrency {report['concurrency']}",
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Names of benchmarks slower than the baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["value"]
+        change = (result["value"] - before) / before if before else 0.0
+        flag = "❌" if change > tolerance else "✅"
+        print(f"  {flag} {name:<9} {before:>10.1f} → {result['value']:>10.1f} {result['metric']} ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--route-requests", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    functions = {
+        "extract": bench_extract,
+        "clean": bench_clean,
+        "validate": bench_validate,
+        "classify": bench_classify,
+        "route": bench_route,
+    }
+    results = {}
+    for name in args.only:
+        results[name] = functions[name](args)
+
+    print(f"\n{'benchmark':<10} | {'median':>12} | detail")
+    print("-" * 72)
+    for name, result in results.items():
+        print(f"{name:<10} | {result['value']:>9.1f} {result['metric']} | {result['detail']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ Regressions: {', '.join(regressions)}")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Harness: drive request_quiz_data through the key pool against a local fake
+Gemini that enforces its own per-key quota and returns 429s past it.
+
+Checks that concurrent requests all succeed, that keys which hit 429s are
+cooled down instead of hammered, and that an invalid key is quarantined
+after its first failure. No network access or real API quota is used.
+
+Run from the backend directory:
+    python -m benchmarks.key_pool_harness
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.key_pool import KeyPool
+from app.services.gemini_service import request_quiz_data
+
+CANNED_QUIZ = {
+    "multiple_choice": [{
+        "question": "Which data structure offers average O(1) lookups?",
+        "choices": ["A. Hash table", "B. Linked list", "C. Binary heap", "D. Stack"],
+        "correct_answer": 0, "points": 1,
+        "cognitive_level": "remembering", "difficulty": "easy"
+    }],
+    "true_false": [{
+        "question": "Merge sort is a stable sorting algorithm.",
+        "correct_answer": True, "points": 1,
+        "cognitive_level": "understanding", "difficulty": "easy"
+    }],
+    "identification": [{
+        "question": "What technique stores results of subproblems for reuse?",
+        "correct_answer": "Memoization", "points": 1,
+        "cognitive_level": "application", "difficulty": "easy"
+    }],
+}
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiServer:
+    """
+    Per-key fixed-window quota: each key may serve `limit` requests per
+    `window` seconds; beyond that it answers like Gemini's 429. Keys listed
+    in `invalid_keys` always fail authentication.
+    """
+    def __init__(self, limit: int, window: float, latency: float, invalid_keys=()):
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.invalid_keys = set(invalid_keys)
+        self._lock = threading.Lock()
+        self._windows = {}
+        self.calls = {}
+        self.rejections = {}
+
+    def model_for_key(self, api_key: str):
+        server = self
+
+        class FakeModel:
+            def generate_content(self, prompt, generation_config=None):
+                return server.handle(api_key)
+
+        return FakeModel()
+
+    def handle(self, api_key: str) -> FakeResponse:
+        with self._lock:
+            self.calls[api_key] = self.calls.get(api_key, 0) + 1
+            if api_key in self.invalid_keys:
+                raise Exception("400 API key not valid. Please pass a valid API key.")
+            now = time.monotonic()
+            started, used = self._windows.get(api_key, (now, 0))
+            if now - started >= self.window:
+                started, used = now, 0
+            if used >= self.limit:
+                self.rejections[api_key] = self.rejections.get(api_key, 0) + 1
+                retry_in = self.window - (now - started)
+                raise Exception(
+                    f"429 Resource has been exhausted (e.g. check quota). Please retry in {retry_in:.2f}s."
+                )
+            self._windows[api_key] = (started, used + 1)
+        time.sleep(self.latency)
+        return FakeResponse("```json\n" + json.dumps(CANNED_QUIZ) + "\n```")
+
+
+def main() -> int:
+    keys = ["key-a", "key-b", "key-c", "key-bad"]
+    server = FakeGeminiServer(limit=3, window=1.0, latency=0.05, invalid_keys={"key-bad"})
+    # Local budget deliberately looser than the server's so 429s actually happen
+    pool = KeyPool(keys, rpm=600, tpm=10_000_000, quota_cooldown=1.0, auth_cooldown=3600)
+
+    requests = 40
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [
+            executor.submit(request_quiz_data, "harness prompt", pool, server.model_for_key)
+            for _ in range(requests)
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+    elapsed = time.perf_counter() - started
+
+    failures = [r for r in results if isinstance(r, Exception)]
+    print(f"\nRequests: {requests}, failures: {len(failures)}, wall time: {elapsed:.2f}s")
+    print(f"Server calls per key: {server.calls}")
+    print(f"Server 429s per key:  {server.rejections}")
+    for stats in pool.stats():
+        print(f"  key {stats['index']}: {stats}")
+
+    checks = {
+        "all requests succeeded": not failures,
+        "invalid key tried only once": server.calls.get("key-bad", 0) <= 1,
+        "quota errors were handled": sum(server.rejections.values()) > 0,
+        "429s stayed well below successes": sum(server.rejections.values()) < requests,
+    }
+    for name, passed in checks.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Hand-labeled quiz questions, ten per Bloom's level, for classifier parity
+checks. Labels are the level a teacher would assign, not what the
+classifier currently predicts.
+"""
+
+LABELED_QUESTIONS = [
+    # remembering
+    ("Define the term algorithm.", "remembering"),
+    ("List the four pillars of object-oriented programming.", "remembering"),
+    ("What is the capital of France?", "remembering"),
+    ("Name the data structure that follows last-in, first-out order.", "remembering"),
+    ("Identify the organelle known as the powerhouse of the cell.", "remembering"),
+    ("Recall the year the World Wide Web was invented.", "remembering"),
+    ("What does the acronym CPU stand for?", "remembering"),
+    ("State Newton's first law of motion.", "remembering"),
+    ("Which keyword declares a constant in JavaScript?", "remembering"),
+    ("Who proposed the theory of general relativity?", "remembering"),
+    # understanding
+    ("Explain why binary search requires a sorted array.", "understanding"),
+    ("Describe how photosynthesis converts light into chemical energy.", "understanding"),
+    ("Summarize the main idea of supply and demand.", "understanding"),
+    ("Interpret what a high p-value means in a hypothesis test.", "understanding"),
+    ("Explain the difference between a process and a thread.", "understanding"),
+    ("Describe what happens during the TCP three-way handshake.", "understanding"),
+    ("Paraphrase the purpose of database normalization.", "understanding"),
+    ("Explain how a hash table resolves collisions.", "understanding"),
+    ("Classify these animals as mammals or reptiles and explain your choice.", "understanding"),
+    ("Discuss why recursion needs a base case.", "understanding"),
+    # application
+    ("Calculate the time complexity of a nested loop over n items.", "application"),
+    ("Use Ohm's law to find the current through a 10 ohm resistor at 5 volts.", "application"),
+    ("Solve for x in the equation 3x + 7 = 22.", "application"),
+    ("Apply the quadratic formula to find the roots of x^2 - 5x + 6.", "application"),
+    ("Demonstrate how to insert the value 15 into this binary search tree.", "application"),
+    ("Compute the mean and median of the data set 4, 8, 15, 16, 23, 42.", "application"),
+    ("Implement a function that reverses a linked list.", "application"),
+    ("Use the Pythagorean theorem to find the hypotenuse of a 3-4 triangle.", "application"),
+    ("Apply Dijkstra's algorithm to find the shortest path from A to E.", "application"),
+    ("Convert the decimal number 45 to binary.", "application"),
+    # analysis
+    ("Compare and contrast merge sort and quicksort.", "analysis"),
+    ("Analyze why the Roman Empire declined in the fifth century.", "analysis"),
+    ("Differentiate between correlation and causation in this study.", "analysis"),
+    ("Examine the relationship between interest rates and inflation.", "analysis"),
+    ("Distinguish between the causes and the effects of the Industrial Revolution.", "analysis"),
+    ("Analyze the trade-offs of using a linked list instead of an array.", "analysis"),
+    ("Break down the components of this network architecture and how they interact.", "analysis"),
+    ("Investigate which factors contribute to the bottleneck in this pipeline.", "analysis"),
+    ("Contrast the themes of the two poems.", "analysis"),
+    ("Examine how the author's background shapes the argument of the essay.", "analysis"),
+    # evaluation
+    ("Evaluate whether a microservice architecture suits a small startup.", "evaluation"),
+    ("Justify your choice of database for a high-write workload.", "evaluation"),
+    ("Assess the effectiveness of the government's response to the crisis.", "evaluation"),
+    ("Critique the methodology used in this experiment.", "evaluation"),
+    ("Judge which of the two proposed solutions is more maintainable and defend your answer.", "evaluation"),
+    ("Argue for or against the use of nuclear energy.", "evaluation"),
+    ("Evaluate the strengths and weaknesses of this sorting algorithm for large inputs.", "evaluation"),
+    ("Defend the decision to refactor the legacy module before adding features.", "evaluation"),
+    ("Appraise the validity of the conclusions drawn from the survey.", "evaluation"),
+    ("Recommend the better caching strategy for this service and justify it.", "evaluation"),
+    # creating
+    ("Design a database schema for a library management system.", "creating"),
+    ("Create a lesson plan that teaches fractions through cooking.", "creating"),
+    ("Propose a new algorithm that improves on bubble sort.", "creating"),
+    ("Develop a marketing strategy for a new mobile app.", "creating"),
+    ("Compose a short story that illustrates the water cycle.", "creating"),
+    ("Formulate a hypothesis about the effect of sleep on memory and plan an experiment to test it.", "creating"),
+    ("Invent a game that teaches children basic programming concepts.", "creating"),
+    ("Design a REST API for an online voting system.", "creating"),
+    ("Construct a model that predicts housing prices from neighborhood data.", "creating"),
+    ("Plan a city park that reduces flooding while serving the community.", "creating"),
+]
@@ -0,0 +1,236 @@
+"""
+Load driver: concurrent POSTs to /api/quiz/generate-from-pdf, reporting
+p50/p95/p99 latency and requests/sec.
+
+Without --url the app is started in-process (uvicorn on a free local port)
+with LLM_PROVIDER=fake, so no network access or API quota is used; the
+FAKE_LLM_* settings shape the fake model (see --llm-latency and
+--llm-tokens-per-second). With --url an already running server is driven
+as-is, whatever provider it uses.
+
+Run from the backend directory:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --requests 200 --concurrency 16 --unique
+    python -m benchmarks.load_test --url http://localhost:8000 --pdf lecture.pdf
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.pdf_fixtures import make_text_pdf
+
+
+def configure_offline(llm_latency: float = 0.8, llm_tokens_per_second: float = 250,
+                      llm_error_rate: float = 0.0, llm_quota_error_rate: float = 0.0):
+    """
+    Point the app at the fake LLM with quotas that never throttle.
+    Must run before any app module is imported (settings are read once);
+    variables already set in the environment win.
+    """
+    defaults = {
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY": str(llm_latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(llm_tokens_per_second),
+        "FAKE_LLM_ERROR_RATE": str(llm_error_rate),
+        "FAKE_LLM_QUOTA_ERROR_RATE": str(llm_quota_error_rate),
+        "GEMINI_KEY_RPM": "100000",
+        "GEMINI_KEY_TPM": "1000000000",
+        "GEMINI_QUOTA_COOLDOWN": "1",
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+class LocalServer:
+    """The app served by uvicorn on a background thread."""
+    def __init__(self):
+        import uvicorn
+        import main
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Local server failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        self._thread.join(timeout=30)
+
+
+def wait_until_ready(url: str, timeout: float = 300):
+    """Block until /api/quiz/ready says the classifier is loaded."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/api/quiz/ready", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url} was not ready after {timeout:.0f}s")
+
+
+def encode_multipart(fields: dict, filename: str, pdf_bytes: bytes) -> tuple:
+    """(body, content type) for a form with text fields and one PDF file."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + pdf_bytes + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def post_quiz(url: str, fields: dict, pdf_bytes: bytes, timeout: float) -> tuple:
+    """(HTTP status or 0 on a connection error, seconds) for one request."""
+    body, content_type = encode_multipart(fields, "load-test.pdf", pdf_bytes)
+    request = urllib.request.Request(
+        f"{url}/api/quiz/generate-from-pdf", data=body, headers={"Content-Type": content_type}
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_load(url: str, pdf_bytes: bytes, requests: int, concurrency: int, fields: dict,
+             unique: bool = False, timeout: float = 300) -> dict:
+    """
+    Send `requests` uploads with `concurrency` in flight and summarize them.
+    unique=True makes every upload a different file (so the text and result
+    caches can't serve it); otherwise only the first request misses them.
+    """
+    def one(index: int):
+        body = pdf_bytes + f"\n% load test request {index}\n".encode() if unique else pdf_bytes
+        return post_quiz(url, fields, body, timeout)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "succeeded": len(latencies),
+        "statuses": statuses,
+        "wall_seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def print_report(report: dict):
+    print(f"\nRequests: {report['requests']} at concurrency {report['concurrency']}, "
+          f"wall time {report['wall_seconds']:.2f}s")
+    print(f"Statuses: {report['statuses']}")
+    print(f"Throughput: {report['rps']:.2f} requests/s")
+    print(f"Latency (successful requests): p50 {report['p50_ms']:.1f} ms | p95 {report['p95_ms']:.1f} ms | "
+          f"p99 {report['p99_ms']:.1f} ms | mean {report['mean_ms']:.1f} ms | max {report['max_ms']:.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="drive a running server instead of starting one in-process")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2, help="requests sent (and not counted) before measuring")
+    parser.add_argument("--pdf", help="PDF to upload (default: a synthetic lecture PDF)")
+    parser.add_argument("--pages", type=int, default=20, help="pages of the synthetic PDF")
+    parser.add_argument("--unique", action="store_true", help="make every upload a distinct file")
+    parser.add_argument("--full-document", action="store_true")
+    parser.add_argument("--cache-mode", default="bypass", choices=("prefer", "refresh", "bypass"))
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="fake LLM seconds to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=250, help="fake LLM output rate (0 = instant)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="exit non-zero when more than this fraction of requests fail")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args()
+
+    pdf_bytes = open(args.pdf, "rb").read() if args.pdf else make_text_pdf(args.pages)
+    fields = {
+        "title": "Load test",
+        "full_document": str(args.full_document).lower(),
+        "cache_mode": args.cache_mode,
+    }
+
+    def drive(url: str) -> dict:
+        wait_until_ready(url)
+        if args.warmup:
+            run_load(url, pdf_bytes, args.warmup, 1, fields, unique=True)
+        return run_load(url, pdf_bytes, args.requests, args.concurrency, fields, unique=args.unique)
+
+    if args.url:
+        report = drive(args.url.rstrip("/"))
+    else:
+        configure_offline(args.llm_latency, args.llm_tokens_per_second,
+                          args.llm_error_rate, args.llm_quota_error_rate)
+        with LocalServer() as server:
+            print(f"🚀 Serving the app with the fake LLM on {server.url}")
+            report = drive(server.url)
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    error_rate = 1 - report["succeeded"] / report["requests"] if report["requests"] else 0.0
+    if error_rate > args.max_error_rate:
+        print(f"❌ {error_rate:.1%} of requests failed")
+        return 1
+    print("✅ Load test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Parity check: centroid scoring vs the original per-keyword cosine scoring.
+
+The classifier used to score np.mean(cosine_similarity(q, level_embeddings))
+for every level; it now uses one product with the precomputed centroids.
+This script recomputes the original scores with sklearn and fails if any
+score or label differs beyond float tolerance.
+
+Run from the backend directory:
+    python -m benchmarks.parity_centroids
+"""
+
+import sys
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.services.model_registry import registry
+from app.services.bert_classifier import (
+    classify_multiple_questions, classify_multiple_questions_detailed
+)
+from benchmarks.bench_classifier import make_questions
+
+TOLERANCE = 1e-5
+
+
+def reference_scores(question_embeddings):
+    """Original implementation: mean cosine similarity against every keyword."""
+    levels = {
+        level: np.mean(cosine_similarity(question_embeddings, embeddings), axis=1)
+        for level, embeddings in registry.level_embeddings.items()
+    }
+    lots = np.mean(cosine_similarity(question_embeddings, registry.lots_embeddings), axis=1)
+    hots = np.mean(cosine_similarity(question_embeddings, registry.hots_embeddings), axis=1)
+    return levels, lots, hots
+
+
+def main() -> int:
+    registry.load()
+    questions = make_questions(500)
+    embeddings = registry.model.encode(questions, convert_to_numpy=True)
+    ref_levels, ref_lots, ref_hots = reference_scores(embeddings)
+
+    detailed = classify_multiple_questions_detailed(questions)
+    simple = classify_multiple_questions(questions)
+
+    worst = 0.0
+    mismatches = 0
+    for i, result in enumerate(detailed):
+        for level, score in result["all_scores"].items():
+            worst = max(worst, abs(score - ref_levels[level][i]))
+        expected_level = max(ref_levels, key=lambda lvl: ref_levels[lvl][i])
+        if expected_level != result["cognitive_level"]:
+            mismatches += 1
+
+        expected_label = "HOTS" if ref_hots[i] > ref_lots[i] else "LOTS"
+        expected_conf = ref_hots[i] if expected_label == "HOTS" else ref_lots[i]
+        label, confidence = simple[i]
+        worst = max(worst, abs(confidence - expected_conf))
+        if label != expected_label:
+            mismatches += 1
+
+    print(f"Questions checked: {len(questions)}")
+    print(f"Max score difference: {worst:.2e} (tolerance {TOLERANCE:.0e})")
+    print(f"Label mismatches: {mismatches}")
+    if worst > TOLERANCE or mismatches:
+        print("❌ Centroid scoring does not match the reference implementation")
+        return 1
+    print("✅ Centroid scoring matches the reference implementation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Parity check: ONNX Runtime (fp32 and int8) classifier backends vs the
+sentence-transformers/torch backend.
+
+Compares the pooled embeddings question by question (cosine similarity),
+the Bloom's level and LOTS/HOTS accuracy on a hand-labeled question set,
+and how often each backend agrees with torch on a larger generated set.
+Fails when embeddings drift past --min-cosine, accuracy drops by more than
+--max-accuracy-drop, or LOTS/HOTS agreement falls under --min-agreement.
+Missing ONNX exports are created first (which needs torch).
+
+Run from the backend directory:
+    python -m benchmarks.parity_onnx_encoder
+    python -m benchmarks.parity_onnx_encoder --backends onnx-int8 --questions 2000
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from app.services.model_registry import ModelRegistry, normalize_rows
+from app.utils.blooms_taxonomy import get_lots_hots_mapping
+from benchmarks.bench_classifier import make_questions
+from benchmarks.labeled_questions import LABELED_QUESTIONS
+
+# backend label -> (backend, quantized, default minimum per-question cosine)
+VARIANTS = {
+    "onnx": ("onnx", False, 0.999),
+    "onnx-int8": ("onnx", True, 0.97),
+}
+
+
+def predict(registry: ModelRegistry, embeddings: np.ndarray) -> tuple:
+    """(level, LOTS/HOTS) per row, scored the way bert_classifier does."""
+    level_scores = normalize_rows(embeddings) @ registry.level_centroids.T
+    lots_hots_scores = level_scores @ registry.lots_hots_weights
+    levels = [registry.levels[i] for i in np.argmax(level_scores, axis=1)]
+    lots_hots = ["HOTS" if hots > lots else "LOTS" for lots, hots in lots_hots_scores]
+    return levels, lots_hots
+
+
+def row_cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.sum(normalize_rows(a) * normalize_rows(b), axis=1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--questions", type=int, default=500, help="generated questions for the agreement check")
+    parser.add_argument("--min-cosine", type=float, help="override the per-backend minimum cosine")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.02)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    labeled = [question for question, _ in LABELED_QUESTIONS]
+    level_labels = [level for _, level in LABELED_QUESTIONS]
+    lots_hots_map = get_lots_hots_mapping()
+    lots_hots_labels = [lots_hots_map[level] for level in level_labels]
+    generated = make_questions(args.questions)
+
+    reference = ModelRegistry(backend="torch").load()
+    ref_labeled = reference.model.encode(labeled, convert_to_numpy=True)
+    ref_generated = reference.model.encode(generated, convert_to_numpy=True)
+    ref_levels, ref_lots_hots = predict(reference, ref_labeled)
+    _, ref_generated_lots_hots = predict(reference, ref_generated)
+
+    def accuracy(predicted, expected):
+        return sum(p == e for p, e in zip(predicted, expected)) / len(expected)
+
+    ref_level_accuracy = accuracy(ref_levels, level_labels)
+    ref_lots_hots_accuracy = accuracy(ref_lots_hots, lots_hots_labels)
+    print(f"Labeled questions: {len(labeled)}, generated questions: {len(generated)}")
+    print(f"\n{'backend':<10} | {'min cos':>8} | {'mean cos':>8} | {'level acc':>9} | {'L/H acc':>7} | {'L/H agree':>9}")
+    print("-" * 68)
+    print(f"{'torch':<10} | {'-':>8} | {'-':>8} | {ref_level_accuracy:>9.1%} | {ref_lots_hots_accuracy:>7.1%} | {'-':>9}")
+
+    failures = []
+    for label in args.backends:
+        backend, quantized, default_min_cosine = VARIANTS[label]
+        min_cosine = args.min_cosine if args.min_cosine is not None else default_min_cosine
+
+        candidate = ModelRegistry(backend=backend, quantized=quantized).load()
+        cand_labeled = candidate.model.encode(labeled, convert_to_numpy=True)
+        cand_generated = candidate.model.encode(generated, convert_to_numpy=True)
+        cosines = np.concatenate([row_cosines(ref_labeled, cand_labeled), row_cosines(ref_generated, cand_generated)])
+        levels, lots_hots = predict(candidate, cand_labeled)
+        _, generated_lots_hots = predict(candidate, cand_generated)
+
+        level_accuracy = accuracy(levels, level_labels)
+        lots_hots_accuracy = accuracy(lots_hots, lots_hots_labels)
+        agreement = accuracy(generated_lots_hots, ref_generated_lots_hots)
+        print(f"{label:<10} | {cosines.min():>8.4f} | {cosines.mean():>8.4f} | {level_accuracy:>9.1%} | "
+              f"{lots_hots_accuracy:>7.1%} | {agreement:>9.1%}")
+
+        if cosines.min() < min_cosine:
+            failures.append(f"{label}: embedding cosine {cosines.min():.4f} < {min_cosine}")
+        if ref_level_accuracy - level_accuracy > args.max_accuracy_drop:
+            failures.append(f"{label}: level accuracy dropped {ref_level_accuracy - level_accuracy:.1%}")
+        if ref_lots_hots_accuracy - lots_hots_accuracy > args.max_accuracy_drop:
+            failures.append(f"{label}: LOTS/HOTS accuracy dropped {ref_lots_hots_accuracy - lots_hots_accuracy:.1%}")
+        if agreement < args.min_agreement:
+            failures.append(f"{label}: LOTS/HOTS agreement {agreement:.1%} < {args.min_agreement:.0%}")
+
+    print()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print("✅ ONNX backends match the torch backend")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
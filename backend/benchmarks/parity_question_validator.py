@@ -0,0 +1,131 @@
+"""
+Parity check and benchmark: batch question validator vs the original
+validate_question_quality loop.
+
+The original ran ten re.search calls on raw pattern strings for the
+question and again for every choice, item by item. This script keeps it as
+the reference, checks that the compiled batch validator accepts and
+rejects exactly the same items with the same reasons on a generated
+question bank, and times both.
+
+Run from the backend directory:
+    python -m benchmarks.parity_question_validator
+    python -m benchmarks.parity_question_validator --items 20000 --repeat 5
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+
+from app.utils.question_validator import question_validator
+
+METADATA_PATTERNS = [
+    (r'\blesson\s+\d+\b', "References lesson number"),
+    (r'\bmodule\s+\d+\b', "References module number"),
+    (r'\bchapter\s+\d+\b', "References chapter number"),
+    (r'\bfigure\s+\d+', "References figure number"),
+    (r'\bsection\s+\d+', "References section number"),
+    (r'\btable\s+\d+', "References table number"),
+    (r'what.*covered in', "Asks about document structure"),
+    (r'according to (the )?(lesson|module|figure|chapter)', "References document structure"),
+    (r'in (lesson|module|chapter|section)\s+\d+', "References document structure"),
+    (r'(lesson|module|chapter).+discusses?', "Asks what section discusses"),
+]
+
+STEMS = [
+    "Which data structure gives O(1) average lookup by key?",
+    "What is the worst-case time complexity of quicksort?",
+    "Explain why a balanced tree keeps searches logarithmic.",
+    "Which traversal visits the root between its subtrees?",
+    "Design a schema for storing student grades.",
+    "Compare breadth-first and depth-first search on sparse graphs.",
+]
+METADATA = [
+    "as described in Lesson 3", "in module 2", "according to the figure", "shown in Figure 4.1",
+    "from Section 2", "using Table 1", "what was covered in the last unit", "which chapter discusses",
+    "from chapter 12", "in lesson\n4",
+]
+CHOICES = ["Hash table", "Linked list", "Binary heap", "Stack", "Queue", "Trie", "B-tree", "Graph"]
+
+
+def reference_validate(question: str, choices: list = None) -> tuple:
+    """Original implementation: ten re.search calls per text."""
+    question_lower = question.lower()
+    for pattern, reason in METADATA_PATTERNS:
+        if re.search(pattern, question_lower):
+            return False, f"Question: {reason}"
+    if choices:
+        for i, choice in enumerate(choices):
+            choice_lower = str(choice).lower()
+            for pattern, reason in METADATA_PATTERNS:
+                if re.search(pattern, choice_lower):
+                    return False, f"Choice {i+1}: {reason}"
+    return True, "Valid"
+
+
+def make_bank(rng: random.Random, count: int) -> list:
+    """Question bank items; about one in ten references document structure."""
+    items = []
+    for _ in range(count):
+        question = rng.choice(STEMS)
+        choices = rng.sample(CHOICES, 4) if rng.random() < 0.6 else None
+        if rng.random() < 0.07:
+            question = f"{question} ({rng.choice(METADATA)})"
+        if choices and rng.random() < 0.03:
+            choices[rng.randrange(4)] += f" {rng.choice(METADATA)}"
+        items.append({"question": question, "choices": choices})
+    return items
+
+
+def time_call(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = make_bank(random.Random(args.seed), args.items)
+    expected = [reference_validate(item["question"], item["choices"]) for item in items]
+    results = question_validator.validate_batch(items)
+
+    mismatches = 0
+    for item, (is_valid, reason), rejection in zip(items, expected, results):
+        actual = (True, "Valid") if rejection is None else (False, rejection["reason"])
+        if actual != (is_valid, reason):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  {item['question'][:60]!r}: expected {reason!r}, got {actual[1]!r}")
+
+    rejected = sum(1 for is_valid, _ in expected if not is_valid)
+    print(f"Items checked: {len(items)} ({rejected} rejected by the reference)")
+    print(f"Mismatches: {mismatches}")
+
+    reference = time_call(lambda: [reference_validate(i["question"], i["choices"]) for i in items], args.repeat)
+    single = time_call(lambda: [question_validator.check(i["question"], i["choices"]) for i in items], args.repeat)
+    batch = time_call(lambda: question_validator.validate_batch(items), args.repeat)
+    print(f"\nTiming on {len(items)} items:")
+    print(f"  reference (re.search per rule) {reference * 1000:>8.1f} ms")
+    print(f"  check() per item              {single * 1000:>8.1f} ms  {reference / single:.1f}x")
+    print(f"  validate_batch()              {batch * 1000:>8.1f} ms  {reference / batch:.1f}x\n")
+
+    if mismatches:
+        print("❌ Batch validator does not match the reference implementation")
+        return 1
+    print("✅ Batch validator matches the reference implementation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Parity check and benchmark: precompiled text cleaner vs the original clean_pdf_text.
+
+clean_pdf_text used to make ten re.sub passes with inline flags; it now
+delegates to app/utils/text_cleaner.py (fewer, guarded passes; streaming by page).
+This script keeps the original implementation as the reference and fails
+if the new cleaner - on whole strings or page streams with small segments
+forcing many cuts - gives different output on the fixture PDF text, on
+randomized lecture-like documents (headings, labels, page numbers, footers,
+cross-line labels, irregular whitespace) or on random fragment soups that
+chain rules across line breaks. It then times both on a large text.
+
+Run from the backend directory:
+    python -m benchmarks.parity_text_cleaner
+    python -m benchmarks.parity_text_cleaner --documents 2000 --repeat 5
+"""
+
+import argparse
+import io
+import random
+import re
+import statistics
+import sys
+import time
+
+from app.utils.pdf_extractor import extract_pages_from_pdf
+from app.utils.text_cleaner import TextCleaner, DEFAULT_STAGES, default_cleaner
+from benchmarks.pdf_fixtures import make_text_pdf
+
+# Small segments so page streams are cut many times
+STREAM_SEGMENT_CHARS = 20
+
+SENTENCES = [
+    "A binary search tree keeps smaller keys in the left subtree.",
+    "In practice, quicksort is faster than heap sort on most inputs.",
+    "Each node stores a key, a value and two child pointers.",
+    "We compare 12 items and swap 3 of them per pass.",
+    "The table below lists the time complexity of common operations.",
+    "Hashing spreads keys uniformly, as shown in figure 2.",
+    "Please refer to chapter 4 for the proof.",
+    "Given n = 1000, the algorithm needs about 10 comparisons.",
+    "Object-oriented design separates interface from implementation.",
+    "Unit testing checks each function in isolation.",
+    "Part of the data is kept in memory; the counterpart 2 is on disk.",
+    "Dynamic programming reuses the solutions of overlapping subproblems.",
+    "Vectors grow geometrically, so appends are amortized O(1).",
+    "Knowledge of graph theory helps with network routing.",
+]
+LABELS = [
+    "Lesson 3: Sorting Algorithms", "MODULE 2 - Data Structures", "Chapter 7.", "Unit 1",
+    "Figure 2.1 Bubble sort passes", "Fig. 3: Heap layout", "Table 4. Complexity", "Diagram 5",
+    "Section 2.3 Recursion", "Part 1: Foundations", "Page 12", "page 3 of 40", "17", "2024",
+    "© 2021 Example University", "Copyright 2019 Faculty of Computing", "(c) 2020 Notes",
+    "Chapter\n4", "Page\n12", "Lesson 2\n\n", "Figure 1\n",
+]
+WHITESPACE = ["", " ", "  ", "\t", "   \t ", "\n", "\n\n", " \n \n", "\n\t\n\n"]
+# Pieces of labels, footers and words; joined at random they put labels at
+# line ends and digits or keywords at line starts, so one rule's removal
+# lets a later rule match across the line break (Unicode digits and "ſ",
+# which IGNORECASE matches as "s", included)
+FRAGMENTS = [
+    "Chapter", "Fig.", "Page", "Part", "Section", "Unit", "Lesson", "Table", "©", "(c)", "Copyright",
+    "as shown in", "refer to", "figure", "Edition", "Heaps", "word", "Example", "x", "2021", "3", "12",
+    "3.", "4:", "-", ".", ":", ",", "١٢", "ſection", "\t", " ", "  ", "\n", "\n\n", " \n ",
+]
+
+
+def reference_clean(text: str) -> str:
+    """Original implementation: ten sequential re.sub passes."""
+    text = re.sub(r'(Lesson|Module|Chapter|Unit)\s+\d+[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'(Figure|Fig\.|Table|Diagram)\s+\d+\.?\d*[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'(Section|Part)\s+\d+\.?\d*[:\-\.]?\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bPage\s+\d+\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'^\d+$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'(Copyright|©|\(c\)).*?\d{4}', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'as (shown|discussed|mentioned) in (lesson|module|chapter|figure|section)\s+\d+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'refer to (lesson|module|chapter|figure|section)\s+\d+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+
+def make_document(rng: random.Random, pages: int = 4, lines_per_page: int = 12) -> list:
+    """Random lecture-like pages mixing sentences, labels and irregular whitespace."""
+    document = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            parts = [rng.choice(LABELS if rng.random() < 0.3 else SENTENCES) for _ in range(rng.randint(1, 3))]
+            lines.append(rng.choice(WHITESPACE) + rng.choice([" ", "  ", ""]).join(parts) + rng.choice(WHITESPACE))
+        document.append("\n".join(lines))
+    return document
+
+
+def make_fragment_document(rng: random.Random, pages: int = 3, fragments: int = 25) -> list:
+    """Random pages of FRAGMENTS separated by spaces and line breaks."""
+    return [
+        "".join(rng.choice(FRAGMENTS) + rng.choice(["", " ", "\n", " \n", "\n "]) for _ in range(rng.randint(1, fragments)))
+        for _ in range(rng.randint(1, pages))
+    ]
+
+
+def check_document(pages: list, stream_cleaner: TextCleaner) -> list:
+    """Names of the cleaner entry points whose output differs from the reference."""
+    expected = reference_clean("\n".join(pages).strip())
+    failures = []
+    if default_cleaner.clean("\n".join(pages).strip()) != expected:
+        failures.append("clean")
+    if default_cleaner.clean_pages(pages) != expected:
+        failures.append("clean_pages")
+    if stream_cleaner.clean_pages(pages) != expected:
+        failures.append(f"clean_pages (segment {STREAM_SEGMENT_CHARS})")
+    return failures
+
+
+def time_call(function, argument, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stream_cleaner = TextCleaner(DEFAULT_STAGES, segment_chars=STREAM_SEGMENT_CHARS)
+    rng = random.Random(args.seed)
+    corpus = [("fixture-pdf", extract_pages_from_pdf(io.BytesIO(make_text_pdf(50))))]
+    corpus += [(f"random-{i}", make_document(rng)) for i in range(args.documents)]
+    # Fragment soups are only checked: timing stays on lecture-like text
+    lecture_pages = [page for _, pages in corpus for page in pages]
+    corpus += [(f"fragments-{i}", make_fragment_document(rng)) for i in range(args.documents * 10)]
+
+    mismatches = 0
+    for name, pages in corpus:
+        failures = check_document(pages, stream_cleaner)
+        if failures:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  {name}: {', '.join(failures)} differ from the reference")
+
+    print(f"Documents checked: {len(corpus)}")
+    print(f"Mismatches: {mismatches}")
+
+    big_pages = lecture_pages * 4
+    big_text = "\n".join(big_pages).strip()
+    print(f"\nTiming on {len(big_text) / 1024 / 1024:.1f} MB of text ({len(big_pages)} pages):")
+    reference = time_call(reference_clean, big_text, args.repeat)
+    guarded = time_call(default_cleaner.clean, big_text, args.repeat)
+    streamed = time_call(default_cleaner.clean_pages, big_pages, args.repeat)
+    print(f"  reference (10 passes)  {reference * 1000:>8.1f} ms")
+    print(f"  clean (guarded stages) {guarded * 1000:>8.1f} ms  {reference / guarded:.2f}x")
+    print(f"  clean_pages (streamed) {streamed * 1000:>8.1f} ms  {reference / streamed:.2f}x\n")
+
+    if mismatches:
+        print("❌ Text cleaner does not match the reference implementation")
+        return 1
+    print("✅ Text cleaner matches the reference implementation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Synthetic text PDFs for the extraction benchmarks.
+Builds a minimal PDF by hand (Helvetica text, one content stream per page)
+so the benchmarks don't need a PDF writer library or checked-in fixtures.
+"""
+
+import io
+
+PARAGRAPH = (
+    "Lesson {page}: A hash table maps keys to buckets using a hash function. "
+    "Collisions are resolved by chaining or open addressing, and the load factor "
+    "determines when the table is resized. Line {line} explains why a good hash "
+    "spreads keys uniformly and how that keeps lookups close to constant time."
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """A `pages`-page PDF with `lines_per_page` lines of lecture-like text per page."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    content_ids = []
+    for page in range(pages):
+        lines = [
+            _escape(PARAGRAPH.format(page=page + 1, line=line)[:110])
+            for line in range(lines_per_page)
+        ]
+        stream = ("BT /F1 9 Tf 36 806 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET").encode()
+        content_ids.append(add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+
+    pages_id = len(objects) + pages + 1
+    page_ids = [
+        add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        )
+        for content_id in content_ids
+    ]
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % pages)
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref))
+    return out.getvalue()
@@ -1,11 +1,56 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.config.settings import settings
 from app.routes import quiz_routes
+from app.services.model_registry import registry
+from app.services.classifier_client import classifier_client
+from app.utils.upload_limit import UploadSizeLimitMiddleware
+from app.utils.pdf_extractor import shutdown_extraction_pool
+from app.utils.pdf_backends import check_backend_names
+from app.services.job_queue import job_queue
+from app.services.metrics import metrics, CONTENT_TYPE
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start loading the BERT model in the background so the port binds
+    immediately; /api/quiz/ready reports when it is usable. The job
+    workers start here too and pick up jobs queued before a restart.
+    With a classifier sidecar the model lives there, and a worker only
+    loads its own copy if the sidecar can't be reached.
+    """
+    # Refuse to start if the classifier was imported under a second name
+    registry.verify_single_load()
+    # Fail now, not on the first request, if the classifier backend can't load in this process
+    if not classifier_client.enabled or classifier_client.fallback:
+        registry.check_requirements()
+    missing_pdf_backends = check_backend_names(settings.PDF_BACKENDS)
+    if missing_pdf_backends:
+        print(f"⚠️ PDF backends not installed, skipped: {', '.join(missing_pdf_backends)} "
+              "(pip install -r requirements-optional.txt)")
+    if not classifier_client.enabled:
+        registry.start_background_load()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    shutdown_extraction_pool()
+
 
 app = FastAPI(
     title="Quiz Generator API",
     description="AI-powered quiz generation using Gemini",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Reject oversized PDF uploads while they stream in (added first so CORS wraps its 413s)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=settings.MAX_FILE_SIZE,
+    path_prefixes=("/api/quiz/generate-from-pdf", "/api/quiz/jobs")
 )
 
 # CORS Configuration - UPDATED FOR PRODUCTION
@@ -26,10 +71,21 @@ app.add_middleware(
 # Include routers
 app.include_router(quiz_routes.router, prefix="/api/quiz", tags=["Quiz"])
 
+
 @app.get("/")
 async def root():
     return {
         "message": "Quiz Generator API",
         "status": "running",
         "docs": "/docs"
-    }
\ No newline at end of file
+    }
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, Gemini
+    call/retry/key-rotation counters, rejected questions, classifier batch
+    sizes, and queue/cache gauges.
+    """
+    return Response(content=await asyncio.to_thread(metrics.render), media_type=CONTENT_TYPE)
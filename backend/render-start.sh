@@ -1,4 +1,25 @@
 #!/usr/bin/env bash
 
+# With CLASSIFIER_SIDECAR_SOCKET set, one shared process owns the BERT model
+# and the uvicorn workers (WEB_CONCURRENCY) classify through it
+if [ -n "$CLASSIFIER_SIDECAR_SOCKET" ]; then
+  rm -f "$CLASSIFIER_SIDECAR_SOCKET"
+  python -m app.services.classifier_server &
+  SIDECAR_PID=$!
+  # Don't start the workers until the sidecar accepts connections
+  for _ in $(seq 1 120); do
+    [ -S "$CLASSIFIER_SIDECAR_SOCKET" ] && break
+    if ! kill -0 "$SIDECAR_PID" 2>/dev/null; then
+      echo "❌ Classifier sidecar exited before opening $CLASSIFIER_SIDECAR_SOCKET" >&2
+      exit 1
+    fi
+    sleep 0.5
+  done
+  if [ ! -S "$CLASSIFIER_SIDECAR_SOCKET" ]; then
+    echo "❌ Classifier sidecar did not open $CLASSIFIER_SIDECAR_SOCKET within 60s" >&2
+    exit 1
+  fi
+fi
+
 # Start the FastAPI application with Uvicorn
-uvicorn main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
+uvicorn main:app --host 0.0.0.0 --port $PORT
@@ -0,0 +1,18 @@
+"""
+Test setup: run from the backend directory with `python -m pytest`.
+Settings are read at import time, so the environment is prepared here,
+before any app module is imported.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_cache_dir = tempfile.mkdtemp(prefix="iquiz-tests-")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("EMBEDDING_CACHE_DIR", _cache_dir)
+os.environ.setdefault("RESULT_CACHE_PATH", os.path.join(_cache_dir, "quiz_results.sqlite3"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(_cache_dir, "quiz_jobs.sqlite3"))
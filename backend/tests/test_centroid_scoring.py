@@ -0,0 +1,67 @@
+"""
+Centroid scoring must give the same scores and labels as the original
+per-keyword scoring: the mean cosine similarity against every keyword of
+a level (and of the LOTS / HOTS keyword lists). The property holds for any
+embeddings, so a deterministic hashing encoder stands in for the model.
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.config.settings import settings
+from app.services import bert_classifier, model_registry
+from app.services.embedding_cache import embedding_cache
+from app.services.model_registry import ModelRegistry
+from benchmarks.bench_classifier import make_questions
+
+TOLERANCE = 1e-5
+
+
+class HashingEncoder:
+    """Same text, same vector; unrelated texts get unrelated vectors."""
+    def encode(self, texts, convert_to_numpy=True):
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+            rows.append(np.random.default_rng(seed).normal(size=32))
+        return np.asarray(rows, dtype=np.float32)
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_registry, "encoder_factory", lambda *args: lambda name: HashingEncoder())
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path))
+    registry = ModelRegistry(model_name="hashing-encoder", backend="torch").load()
+    monkeypatch.setattr(bert_classifier, "registry", registry)
+    embedding_cache.clear()
+    yield registry
+    embedding_cache.clear()
+
+
+def test_level_scores_match_mean_keyword_cosine(registry):
+    questions = make_questions(300)
+    embeddings = registry.model.encode(questions)
+    expected = {
+        level: np.mean(cosine_similarity(embeddings, level_embeddings), axis=1)
+        for level, level_embeddings in registry.level_embeddings.items()
+    }
+
+    for i, result in enumerate(bert_classifier.classify_multiple_questions_detailed(questions)):
+        for level, score in result["all_scores"].items():
+            assert abs(score - expected[level][i]) < TOLERANCE
+        assert result["cognitive_level"] == max(expected, key=lambda level: expected[level][i])
+
+
+def test_lots_hots_scores_match_mean_keyword_cosine(registry):
+    questions = make_questions(300, seed=7)
+    embeddings = registry.model.encode(questions)
+    lots = np.mean(cosine_similarity(embeddings, registry.lots_embeddings), axis=1)
+    hots = np.mean(cosine_similarity(embeddings, registry.hots_embeddings), axis=1)
+
+    for i, (label, confidence) in enumerate(bert_classifier.classify_multiple_questions(questions)):
+        expected_label = "HOTS" if hots[i] > lots[i] else "LOTS"
+        assert label == expected_label
+        assert abs(confidence - (hots[i] if expected_label == "HOTS" else lots[i])) < TOLERANCE
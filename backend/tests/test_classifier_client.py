@@ -0,0 +1,136 @@
+import os
+import socket
+import socketserver
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import quiz_routes
+from app.services import bert_classifier
+from app.services.classifier_client import (
+    ClassifierClient, SidecarUnavailable, encode_frame, read_frame
+)
+from app.services.metrics import track_request
+from benchmarks.pdf_fixtures import make_text_pdf
+
+
+class FakeSidecar(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Answers every question with [text, len(text)] and records request sizes."""
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.sizes = []
+        self.connections = []
+
+        sidecar = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sidecar.connections.append(self.request)
+                while True:
+                    try:
+                        message = read_frame(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    sidecar.sizes.append(len(message["questions"]))
+                    results = [[text, len(text)] for text in message["questions"]]
+                    self.request.sendall(encode_frame({"results": results}))
+
+        super().__init__(path, Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def close(self):
+        """Stop like a killed process would: drop open connections and the socket file."""
+        self.shutdown()
+        for connection in self.connections:
+            connection.shutdown(socket.SHUT_RDWR)
+        self.server_close()
+        os.unlink(self.server_address)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "classifier.sock")
+
+
+def test_large_requests_are_sent_in_chunks(socket_path):
+    sidecar = FakeSidecar(socket_path)
+    client = ClassifierClient(socket_path, timeout=5, retry_seconds=5, chunk_size=4)
+    questions = [f"q{i}" for i in range(10)]
+    try:
+        assert client.classify("lots_hots", questions) == [[q, len(q)] for q in questions]
+    finally:
+        sidecar.close()
+    assert sidecar.sizes == [4, 4, 2]
+    assert client.stats()["calls"] == 3
+
+
+def test_disabled_client_does_not_count_fallbacks():
+    client = ClassifierClient("", timeout=5, retry_seconds=5, fallback=True)
+    assert client.classify("lots_hots", ["q"]) is None
+    stats = client.stats()
+    assert stats["fallbacks"] == 0 and stats["unavailable"] == 0 and stats["connection_errors"] == 0
+
+
+def test_unreachable_sidecar_raises_unless_fallback_enabled(socket_path):
+    strict = ClassifierClient(socket_path, timeout=1, retry_seconds=5, connect_attempts=2)
+    with pytest.raises(SidecarUnavailable):
+        strict.classify("lots_hots", ["q"])
+    assert strict.stats()["unavailable"] == 1
+    assert strict.stats()["connection_errors"] == 1
+
+    lenient = ClassifierClient(socket_path, timeout=1, retry_seconds=5, fallback=True, connect_attempts=2)
+    assert lenient.classify("lots_hots", ["q"]) is None
+    assert lenient.stats()["fallbacks"] == 1
+
+
+def test_reconnects_after_the_sidecar_restarts(socket_path):
+    client = ClassifierClient(socket_path, timeout=5, retry_seconds=5)
+    sidecar = FakeSidecar(socket_path)
+    assert client.classify("lots_hots", ["a"]) == [["a", 1]]
+    sidecar.close()
+
+    sidecar = FakeSidecar(socket_path)
+    try:
+        assert client.classify("lots_hots", ["bb"]) == [["bb", 2]]
+    finally:
+        sidecar.close()
+    assert client.stats()["connection_errors"] == 0
+
+
+def test_sidecar_classification_is_timed_as_the_classify_stage(socket_path, monkeypatch):
+    sidecar = FakeSidecar(socket_path)
+    monkeypatch.setattr(bert_classifier, "classifier_client", ClassifierClient(socket_path, timeout=5, retry_seconds=5))
+    try:
+        with track_request("test") as timings:
+            assert bert_classifier.classify_multiple_questions(["a", "bb"]) == [("a", 1), ("bb", 2)]
+    finally:
+        sidecar.close()
+    assert "classify_ms" in timings.breakdown()
+
+
+def test_sidecar_lost_after_the_readiness_check_answers_503(socket_path, monkeypatch):
+    async def sidecar_was_ready():
+        return None
+
+    # The sidecar passed wait_for_classifier, then went away before classification
+    monkeypatch.setattr(quiz_routes, "wait_for_classifier", sidecar_was_ready)
+    strict = ClassifierClient(socket_path, timeout=1, retry_seconds=5, connect_attempts=2)
+    monkeypatch.setattr(bert_classifier, "classifier_client", strict)
+
+    app = FastAPI()
+    app.include_router(quiz_routes.router, prefix="/api/quiz")
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/quiz/generate-from-pdf",
+        files={"file": ("notes.pdf", make_text_pdf(2), "application/pdf")},
+        data={"cache_mode": "bypass"},
+    )
+    assert response.status_code == 503
+    assert response.json() == {"detail": "BERT classifier sidecar is unavailable"}
+
+    response = client.post("/api/quiz/reclassify-question", json={"question": "Define a stack."})
+    assert response.status_code == 503
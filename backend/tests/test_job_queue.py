@@ -0,0 +1,100 @@
+import asyncio
+
+from app.services.job_queue import JobQueue, JobStore
+
+
+def make_queue(path, handler, lease_seconds=0.3):
+    queue = JobQueue(
+        JobStore(str(path)), workers=1, max_queued=10, max_queued_per_user=10,
+        max_attempts=3, retention_seconds=3600, lease_seconds=lease_seconds
+    )
+    queue.set_handler(handler)
+    return queue
+
+
+async def wait_for_status(queue, job_id, status, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while (await queue.get(job_id))["status"] != status:
+        assert asyncio.get_running_loop().time() < deadline, f"job never became {status}"
+        await asyncio.sleep(0.02)
+
+
+def test_second_process_does_not_requeue_a_live_job(tmp_path):
+    async def scenario():
+        release = asyncio.Event()
+        runs = []
+
+        async def handler(params, pdf_bytes, progress):
+            runs.append(params["n"])
+            await release.wait()
+            return {"n": params["n"]}
+
+        first = make_queue(tmp_path / "jobs.sqlite3", handler)
+        await first.start()
+        job_id = await first.submit("user", 1, {"n": 1}, b"%PDF")
+        await wait_for_status(first, job_id, "running")
+
+        # Another worker process starting up (and heartbeating) must leave it alone
+        second = make_queue(tmp_path / "jobs.sqlite3", handler)
+        await second.start()
+        await asyncio.sleep(1.0)
+        assert (await second.get(job_id))["status"] == "running"
+
+        release.set()
+        await wait_for_status(second, job_id, "done")
+        await first.stop()
+        await second.stop()
+        assert runs == [1]
+
+    asyncio.run(scenario())
+
+
+def test_cancel_reaches_a_job_running_in_another_process(tmp_path):
+    async def scenario():
+        stopped = asyncio.Event()
+
+        async def handler(params, pdf_bytes, progress):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        owner = make_queue(tmp_path / "jobs.sqlite3", handler)
+        await owner.start()
+        job_id = await owner.submit("user", 1, {}, b"%PDF")
+        await wait_for_status(owner, job_id, "running")
+
+        other = make_queue(tmp_path / "jobs.sqlite3", handler)
+        assert await other.cancel(job_id)
+        await asyncio.wait_for(stopped.wait(), timeout=2)
+        assert (await other.get(job_id))["status"] == "cancelled"
+        await owner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_job_of_a_dead_process_is_requeued_after_its_lease(tmp_path):
+    async def scenario():
+        async def hang(params, pdf_bytes, progress):
+            await asyncio.sleep(60)
+
+        async def finish(params, pdf_bytes, progress):
+            return {"ok": True}
+
+        dead = make_queue(tmp_path / "jobs.sqlite3", hang)
+        await dead.start()
+        job_id = await dead.submit("user", 1, {}, b"%PDF")
+        await wait_for_status(dead, job_id, "running")
+        # Stopping without finishing leaves the job "running", as a crash would
+        await dead.stop()
+
+        survivor = make_queue(tmp_path / "jobs.sqlite3", finish)
+        await survivor.start()
+        await wait_for_status(survivor, job_id, "done")
+        job = await survivor.get(job_id)
+        await survivor.stop()
+        assert job["attempts"] == 2
+        assert job["result"] == {"ok": True}
+
+    asyncio.run(scenario())
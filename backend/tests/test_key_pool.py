@@ -0,0 +1,54 @@
+"""
+Quota handling against the fake Gemini from benchmarks/key_pool_harness.py,
+which enforces its own per-key quota and answers 429 past it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.gemini_service import request_quiz_data
+from app.services.key_pool import KeyPool
+from benchmarks.key_pool_harness import FakeGeminiServer
+
+REQUESTS = 24
+
+
+@pytest.fixture
+def run_requests():
+    def run(pool, server, requests=REQUESTS):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(request_quiz_data, "harness prompt", pool, server.model_for_key)
+                for _ in range(requests)
+            ]
+            return [future.result() for future in futures]
+    return run
+
+
+def test_concurrent_requests_survive_quota_errors(run_requests):
+    server = FakeGeminiServer(limit=3, window=1.0, latency=0.02)
+    # Local budget looser than the server's so 429s actually happen
+    pool = KeyPool(["key-a", "key-b", "key-c"], rpm=600, tpm=10_000_000, quota_cooldown=1.0, auth_cooldown=3600)
+
+    results = run_requests(pool, server)
+
+    assert len(results) == REQUESTS
+    assert all(result["multiple_choice"] for result in results)
+    rejections = sum(server.rejections.values())
+    stats = pool.stats()
+    assert rejections > 0
+    assert sum(key["quota_errors"] for key in stats) == rejections
+    assert sum(key["successes"] for key in stats) == REQUESTS
+    # Keys that returned 429 were cooled down rather than hammered
+    assert rejections <= REQUESTS // 2
+
+
+def test_invalid_key_is_quarantined_after_one_failure(run_requests):
+    server = FakeGeminiServer(limit=100, window=1.0, latency=0.01, invalid_keys={"key-bad"})
+    pool = KeyPool(["key-bad", "key-a", "key-b"], rpm=600, tpm=10_000_000, quota_cooldown=1.0, auth_cooldown=3600)
+
+    results = run_requests(pool, server)
+
+    assert len(results) == REQUESTS
+    assert server.calls.get("key-bad", 0) <= 1
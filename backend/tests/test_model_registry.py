@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+
+from app.config.settings import settings
+from app.services import model_registry
+from app.services.model_registry import ModelRegistry
+
+
+class FakeEncoder:
+    def encode(self, texts, convert_to_numpy=True):
+        rng = np.random.default_rng(len(texts))
+        return rng.normal(size=(len(texts), 8)).astype(np.float32)
+
+
+def flaky_factory(failures: int):
+    calls = []
+
+    def factory(backend, quantized, model_dir, threads):
+        def load_model(name):
+            calls.append(name)
+            if len(calls) <= failures:
+                raise OSError("model download failed")
+            return FakeEncoder()
+        return load_model
+    return factory, calls
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_failed_background_load_is_retried(monkeypatch, tmp_path):
+    factory, calls = flaky_factory(failures=2)
+    monkeypatch.setattr(model_registry, "encoder_factory", factory)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "CLASSIFIER_LOAD_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "CLASSIFIER_LOAD_ATTEMPTS", 5)
+
+    registry = ModelRegistry(model_name="fake-model-retry", backend="torch")
+    registry.start_background_load()
+    wait_for(lambda: registry.state == "ready")
+    assert len(calls) == 3
+    assert registry.status()["attempts"] == 3
+    assert registry.status()["retry_in_seconds"] is None
+
+
+def test_background_load_gives_up_after_the_last_attempt(monkeypatch, tmp_path):
+    factory, calls = flaky_factory(failures=10)
+    monkeypatch.setattr(model_registry, "encoder_factory", factory)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "CLASSIFIER_LOAD_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "CLASSIFIER_LOAD_ATTEMPTS", 2)
+
+    registry = ModelRegistry(model_name="fake-model-fail", backend="torch")
+    registry.start_background_load()
+    registry._thread.join(5)
+    status = registry.status()
+    assert len(calls) == 2
+    assert status["state"] == "failed"
+    assert status["retry_in_seconds"] is None
+    assert "download failed" in status["error"]
+    assert not registry.wait_until_ready(0.1)
@@ -0,0 +1,70 @@
+"""
+Accuracy parity of the ONNX Runtime classifier backends (fp32 and int8)
+with the sentence-transformers/torch backend, on the hand-labeled question
+set - the same checks as benchmarks/parity_onnx_encoder.py. Skipped unless
+onnxruntime, tokenizers and the torch stack (needed for the export) are
+installed; the first run downloads the model and exports it.
+"""
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+import numpy as np  # noqa: E402
+
+from app.services.model_registry import ModelRegistry  # noqa: E402
+from app.utils.blooms_taxonomy import get_lots_hots_mapping  # noqa: E402
+from benchmarks.bench_classifier import make_questions  # noqa: E402
+from benchmarks.labeled_questions import LABELED_QUESTIONS  # noqa: E402
+from benchmarks.parity_onnx_encoder import VARIANTS, predict, row_cosines  # noqa: E402
+
+MAX_ACCURACY_DROP = 0.02
+MIN_AGREEMENT = 0.95
+
+QUESTIONS = [question for question, _ in LABELED_QUESTIONS]
+LEVEL_LABELS = [level for _, level in LABELED_QUESTIONS]
+LOTS_HOTS_LABELS = [get_lots_hots_mapping()[level] for level in LEVEL_LABELS]
+GENERATED = make_questions(300)
+
+
+def accuracy(predicted, expected):
+    return sum(p == e for p, e in zip(predicted, expected)) / len(expected)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    registry = ModelRegistry(backend="torch").load()
+    labeled = registry.model.encode(QUESTIONS, convert_to_numpy=True)
+    generated = registry.model.encode(GENERATED, convert_to_numpy=True)
+    levels, lots_hots = predict(registry, labeled)
+    _, generated_lots_hots = predict(registry, generated)
+    return {
+        "labeled": labeled,
+        "generated": generated,
+        "level_accuracy": accuracy(levels, LEVEL_LABELS),
+        "lots_hots_accuracy": accuracy(lots_hots, LOTS_HOTS_LABELS),
+        "generated_lots_hots": generated_lots_hots,
+    }
+
+
+@pytest.mark.parametrize("label", list(VARIANTS))
+def test_onnx_backend_matches_torch(label, reference):
+    backend, quantized, min_cosine = VARIANTS[label]
+    registry = ModelRegistry(backend=backend, quantized=quantized).load()
+    labeled = registry.model.encode(QUESTIONS, convert_to_numpy=True)
+    generated = registry.model.encode(GENERATED, convert_to_numpy=True)
+
+    cosines = np.concatenate([
+        row_cosines(reference["labeled"], labeled), row_cosines(reference["generated"], generated)
+    ])
+    assert cosines.min() >= min_cosine
+
+    levels, lots_hots = predict(registry, labeled)
+    assert reference["level_accuracy"] - accuracy(levels, LEVEL_LABELS) <= MAX_ACCURACY_DROP
+    assert reference["lots_hots_accuracy"] - accuracy(lots_hots, LOTS_HOTS_LABELS) <= MAX_ACCURACY_DROP
+
+    _, generated_lots_hots = predict(registry, generated)
+    assert accuracy(generated_lots_hots, reference["generated_lots_hots"]) >= MIN_AGREEMENT
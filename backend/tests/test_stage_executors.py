@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.stage_executors import StageExecutor
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_stream_yields_every_item():
+    stage = StageExecutor("test", 1)
+    assert asyncio.run(collect(stage.stream(lambda: iter(range(5))))) == [0, 1, 2, 3, 4]
+
+
+def test_stream_raises_producer_errors():
+    def produce():
+        yield 1
+        raise ValueError("boom")
+
+    stage = StageExecutor("test", 1)
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(collect(stage.stream(produce)))
+
+
+def test_stream_raises_when_the_producer_cannot_be_scheduled():
+    stage = StageExecutor("test", 1)
+    stage._pool.shutdown()
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(collect(stage.stream(lambda: iter(range(5)))), timeout=2))
+
+
+def test_producer_stops_and_is_released_when_the_consumer_stops_early():
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            stopped.set()
+
+    async def scenario():
+        stage = StageExecutor("test", 1)
+        stream = stage.stream(produce)
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+        await asyncio.to_thread(stopped.wait, 2)
+        for _ in range(50):
+            if not stage._pumps:
+                break
+            await asyncio.sleep(0.01)
+        return stage._pumps
+
+    assert asyncio.run(scenario()) == set()
+    assert stopped.is_set()
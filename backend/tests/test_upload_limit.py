@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.routes import quiz_routes
+from app.utils.upload_limit import UploadSizeLimitMiddleware, MULTIPART_OVERHEAD
+
+MAX_BYTES = 1024 * 1024
+BOUNDARY = "iquiz-test-boundary"
+
+
+def multipart_pdf(size: int) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="notes.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"%" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def test_oversized_uploads_get_the_same_413_body(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", MAX_BYTES)
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_BYTES, path_prefixes=("/api/quiz/generate-from-pdf",))
+    app.include_router(quiz_routes.router, prefix="/api/quiz")
+    client = TestClient(app)
+    url = "/api/quiz/generate-from-pdf"
+    content_type = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    # Declared Content-Length over the limit: refused before the body is read
+    declared = client.post(url, content=multipart_pdf(MAX_BYTES + 2 * MULTIPART_OVERHEAD), headers=content_type)
+
+    # No Content-Length: stopped while the body streams in
+    def chunks():
+        body = multipart_pdf(MAX_BYTES + 2 * MULTIPART_OVERHEAD)
+        for start in range(0, len(body), 8192):
+            yield body[start:start + 8192]
+    streamed = client.post(url, content=chunks(), headers=content_type)
+
+    # Within the multipart allowance: stopped by the route's own copy
+    spooled = client.post(url, content=multipart_pdf(MAX_BYTES + 1), headers=content_type)
+
+    expected = {"detail": "File too large (max 1MB)"}
+    for response in (declared, streamed, spooled):
+        assert response.status_code == 413
+        assert response.json() == expected